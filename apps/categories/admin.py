@@ -4,14 +4,12 @@ from .models import Category
 
 @admin.action(description="Soft Delete Selected Categories")
 def soft_delete_categories(modeladmin, request, queryset):
-    for category in queryset:
-        category.soft_delete()
+    queryset.soft_delete()
 
 
 @admin.action(description="Restore Selected Categories")
 def restore_categories(modeladmin, request, queryset):
-    for category in queryset:
-        category.restore()
+    queryset.restore()
 
 
 @admin.register(Category)
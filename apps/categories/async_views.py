@@ -0,0 +1,30 @@
+from apps.core.async_api import AsyncAPIView, AsyncPageNumberPagination, json_response
+from apps.core.timing import timed
+from .filters import CategoryFilter
+from .models import Category
+from .serializers import CategoryListSerializer
+
+
+class AsyncCategoryPagination(AsyncPageNumberPagination):
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 50
+
+
+class AsyncCategoryListView(AsyncAPIView):
+    """
+    GET (Public) - async CategoryListAPIView.get
+    """
+
+    async def get(self, request):
+        filterset = CategoryFilter(request.GET, queryset=Category.objects.order_by("id"))
+        queryset = filterset.qs
+
+        paginator = AsyncCategoryPagination()
+        page = await paginator.paginate_queryset(queryset, request)
+        serializer = CategoryListSerializer(page, many=True)
+
+        with timed("serialize"):
+            data = serializer.data
+
+        return json_response(paginator.get_paginated_data(data))
@@ -5,10 +5,14 @@ from .views import (
     CategoryCreateAPIView,
     CategoryUpdateDeleteAPIView,
 )
+from .async_views import AsyncCategoryListView
 
 urlpatterns = [
     path("categories/", CategoryListAPIView.as_view()),
     path("categories/create/", CategoryCreateAPIView.as_view()),
     path("categories/<slug:slug>/", CategoryDetailAPIView.as_view()),
     path("categories/<slug:slug>/manage/", CategoryUpdateDeleteAPIView.as_view()),
+
+    # Async (ASGI) read endpoints
+    path("async/categories/", AsyncCategoryListView.as_view()),
 ]
@@ -4,13 +4,11 @@ from .constants import MAX_COMMENT_DEPTH
 
 @admin.action(description="Soft Delete Selected Comments")
 def soft_delete_comments(modeladmin, request, queryset):
-    for comment in queryset:
-        comment.soft_delete()
+    queryset.soft_delete()
 
 @admin.action(description="Restore Selected Comments")
 def restore_comments(modeladmin, request, queryset):
-    for comment in queryset:
-        comment.restore()
+    queryset.restore()
 
 @admin.register(Comment)
 class CommentAdmin(admin.ModelAdmin):
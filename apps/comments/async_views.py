@@ -0,0 +1,60 @@
+from django.http import HttpResponse
+from rest_framework.renderers import JSONRenderer
+from apps.core.async_api import AsyncAPIView, AsyncPageNumberPagination, error_response
+from apps.core.timing import timed
+from apps.posts.models import Post
+from .cache import athread_page_key, aget_thread_page, aset_thread_page
+from .filters import CommentFilter
+from .models import Comment
+from .serializers import CommentListSerializer, reply_prefetches
+
+
+class AsyncCommentPagination(AsyncPageNumberPagination):
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 50
+
+
+class AsyncPostCommentListView(AsyncAPIView):
+    """
+    GET (Public) - async PostCommentListAPIView.get, sharing its page cache
+    """
+
+    async def get(self, request, slug):
+        post = await Post.objects.filter(slug=slug).afirst()
+        if post is None:
+            return error_response("Post not found", status=404)
+
+        if post.status == Post.Status.DRAFT:
+            if not request.user.is_authenticated:
+                return error_response(
+                    "Authentication required to view comments on draft posts",
+                    status=403,
+                )
+
+        cache_key = await athread_page_key(post.id, request)
+        content = await aget_thread_page(cache_key)
+        if content is not None:
+            return HttpResponse(content, content_type="application/json")
+
+        comments = (
+            Comment.objects
+            .filter(post=post, parent__isnull=True)
+            .select_related("author")
+            .prefetch_related(*reply_prefetches())
+            .order_by("id")
+        )
+
+        filterset = CommentFilter(request.GET, queryset=comments)
+        queryset = filterset.qs
+
+        paginator = AsyncCommentPagination()
+        page = await paginator.paginate_queryset(queryset, request)
+        serializer = CommentListSerializer(page, many=True)
+
+        with timed("serialize"):
+            data = serializer.data
+        with timed("render"):
+            content = JSONRenderer().render(paginator.get_paginated_data(data))
+        await aset_thread_page(cache_key, content)
+        return HttpResponse(content, content_type="application/json")
@@ -0,0 +1,99 @@
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from apps.metrics.registry import record_cache_lookup
+
+
+THREAD_VERSION_KEY = "comments:thread-version:{post_id}"
+THREAD_PAGE_KEY = "comments:thread:{post_id}:{version}:{digest}"
+
+
+def get_thread_version(post_id):
+    """
+    Current comment-thread version of a post.
+    A random token (not a counter) so an evicted version key can never
+    resurrect pages cached under an older version.
+    """
+    key = THREAD_VERSION_KEY.format(post_id=post_id)
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+async def aget_thread_version(post_id):
+    key = THREAD_VERSION_KEY.format(post_id=post_id)
+    version = await cache.aget(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not await cache.aadd(key, version, timeout=None):
+            version = await cache.aget(key, version)
+    return version
+
+
+def bump_thread_version(post_id):
+    cache.set(
+        THREAD_VERSION_KEY.format(post_id=post_id),
+        uuid.uuid4().hex,
+        timeout=None,
+    )
+
+
+def invalidate_threads(*post_ids):
+    """
+    Invalidate cached thread pages of the given posts once the current
+    transaction commits (immediately in autocommit mode).
+    """
+    for post_id in set(post_ids):
+        transaction.on_commit(
+            lambda post_id=post_id: bump_thread_version(post_id)
+        )
+
+
+def thread_page_key(post_id, request):
+    """
+    Cache key of one rendered thread page.
+    The absolute URI covers page, page_size, filters and the host used
+    in the pagination links.
+    """
+    return _page_key(post_id, get_thread_version(post_id), request)
+
+
+async def athread_page_key(post_id, request):
+    return _page_key(post_id, await aget_thread_version(post_id), request)
+
+
+def _page_key(post_id, version, request):
+    digest = hashlib.sha256(
+        request.build_absolute_uri().encode()
+    ).hexdigest()
+    return THREAD_PAGE_KEY.format(
+        post_id=post_id,
+        version=version,
+        digest=digest,
+    )
+
+
+def get_thread_page(key):
+    content = cache.get(key)
+    record_cache_lookup("comment_thread", content is not None)
+    return content
+
+
+async def aget_thread_page(key):
+    content = await cache.aget(key)
+    record_cache_lookup("comment_thread", content is not None)
+    return content
+
+
+def set_thread_page(key, content):
+    cache.set(key, content, timeout=settings.COMMENT_THREAD_CACHE_TIMEOUT)
+
+
+async def aset_thread_page(key, content):
+    await cache.aset(key, content, timeout=settings.COMMENT_THREAD_CACHE_TIMEOUT)
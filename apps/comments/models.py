@@ -1,10 +1,11 @@
 from django.conf import settings
-from django.db import models, transaction
+from django.db import models
 from apps.posts.models import Post
 from apps.core.base import BaseModel
 from django.core.exceptions import ValidationError
 from .constants import MAX_COMMENT_DEPTH
-from django.utils import timezone
+from .cache import invalidate_threads
+from apps.users.stats import apply_author_deltas, comment_deltas, counter_change
 
 User = settings.AUTH_USER_MODEL
 
@@ -51,36 +52,58 @@ class Comment(BaseModel):
         else:
             self.depth = 0
 
-    def soft_delete(self):
+    @classmethod
+    def soft_delete_rows(cls, pks, deleted_at):
         """
-        Soft delete this comment only.
+        Soft delete these comments only.
         """
-        with transaction.atomic():
-            if self.is_deleted:
-                return
-
-            self.is_deleted = True
-            self.deleted_at = timezone.now()
-            self.save(update_fields=["is_deleted", "deleted_at"])
-
-    def restore(self):
+        deltas = comment_deltas(cls._base_manager.filter(pk__in=pks, is_deleted=False), -1)
+        count = super().soft_delete_rows(pks, deleted_at)
+        invalidate_threads(*cls._post_ids(pks))
+        apply_author_deltas(deltas)
+        return count
+
+    @classmethod
+    def restore_rows(cls, pks):
         """
-        Restore this comment only.
+        Restore these comments only.
+        Comments of deleted posts stay deleted.
         """
-        with transaction.atomic():
-            if not self.is_deleted:
-                return
-
-            if self.post.is_deleted:
-                return  # or raise ValidationError
-
-            self.is_deleted = False
-            self.deleted_at = None
-            self.save(update_fields=["is_deleted", "deleted_at"])
+        restorable = cls._base_manager.filter(
+            pk__in=pks,
+            post__is_deleted=False,
+        )
+        deltas = comment_deltas(restorable.filter(is_deleted=True), 1)
+        count = restorable.update(
+            is_deleted=False,
+            deleted_at=None,
+        )
+        invalidate_threads(*cls._post_ids(pks))
+        apply_author_deltas(deltas)
+        return count
+
+    @classmethod
+    def _post_ids(cls, pks):
+        return (
+            cls._base_manager.filter(pk__in=pks)
+            .values_list("post_id", flat=True)
+            .distinct()
+        )
 
     def save(self, *args, **kwargs):
         self.full_clean()
+
+        # Counted in the rollup before the write: an existing live comment
+        before = None
+        if not self._state.adding:
+            was_deleted = Comment._base_manager.filter(pk=self.pk).values_list("is_deleted", flat=True).first()
+            if was_deleted is False:
+                before = "comments"
+
         super().save(*args, **kwargs)
+        invalidate_threads(self.post_id)
+        after = None if self.is_deleted else "comments"
+        apply_author_deltas(counter_change(self.author_id, before, after), active={self.author_id: self.updated_at})
 
 
     def __str__(self):
@@ -1,3 +1,4 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
 from .models import Comment
 from drf_spectacular.utils import extend_schema_field
@@ -34,6 +35,20 @@ class CommentListSerializer(serializers.ModelSerializer):
         return obj.replies.count()
 
 
+def reply_prefetches():
+    """
+    Replies of every level down to MAX_COMMENT_DEPTH, plus the (empty)
+    level below it that CommentListSerializer still looks up.
+    """
+    return [
+        Prefetch(
+            "__".join(["replies"] * level),
+            queryset=Comment.objects.select_related("author").order_by("id"),
+        )
+        for level in range(1, MAX_COMMENT_DEPTH + 2)
+    ]
+
+
 class CommentCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
@@ -1,3 +1,69 @@
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from apps.users.models import User
+from apps.posts.models import Post
+from .models import Comment
 
-# Create your tests here.
+
+class CommentThreadCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="author", email="author@example.com", password="Newx123!"
+        )
+        self.post = Post.objects.create(
+            title="Hot post",
+            content="...",
+            author=self.user,
+            status=Post.Status.PUBLISHED,
+        )
+        self.url = f"/api/posts/{self.post.slug}/comments/"
+
+    def add_comment(self, content):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Comment.objects.create(
+                post=self.post, author=self.user, content=content
+            )
+
+    def test_second_read_is_served_from_cache(self):
+        self.add_comment("first")
+        self.client.get(self.url)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+
+        self.assertFalse(
+            [q for q in queries.captured_queries if "comments_comment" in q["sql"]]
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["count"], 1)
+
+    def test_comment_writes_invalidate_the_post_thread(self):
+        comment = self.add_comment("first")
+        self.assertEqual(self.client.get(self.url).json()["count"], 1)
+
+        self.add_comment("second")
+        self.assertEqual(self.client.get(self.url).json()["count"], 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            comment.soft_delete()
+        self.assertEqual(self.client.get(self.url).json()["count"], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            comment.restore()
+        self.assertEqual(self.client.get(self.url).json()["count"], 2)
+
+    def test_post_restore_invalidates_thread(self):
+        self.add_comment("first")
+        self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.soft_delete()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.restore()
+        self.assertEqual(self.client.get(self.url).json()["count"], 1)
@@ -1,7 +1,11 @@
 from django.urls import path
 from .views import PostCommentListAPIView, CommentDetailAPIView
+from .async_views import AsyncPostCommentListView
 
 urlpatterns = [
     path("posts/<slug:slug>/comments/",PostCommentListAPIView.as_view(),name="post-comments",),
     path("comments/<int:id>/",CommentDetailAPIView.as_view(),name="comment-detail",),
+
+    # Async (ASGI) read endpoints
+    path("async/posts/<slug:slug>/comments/",AsyncPostCommentListView.as_view(),name="async-post-comments",),
 ]
@@ -9,12 +9,16 @@ from .serializers import (
     CommentListSerializer,
     CommentCreateSerializer,
     CommentDetailSerializer,
+    reply_prefetches,
 )
 from .permissions import IsAuthorOrAdmin
 from .throttles import CommentRateThrottle
-from rest_framework.pagination import PageNumberPagination
+from apps.core.pagination import PageNumberPagination
+from apps.core.timing import timed
 from .filters import CommentFilter
-from django.db.models import Prefetch
+from django.http import HttpResponse
+from rest_framework.renderers import JSONRenderer
+from .cache import thread_page_key, get_thread_page, set_thread_page
 
 
 class CommentPagination(PageNumberPagination):
@@ -82,18 +86,19 @@ class PostCommentListAPIView(APIView):
                     status=status.HTTP_403_FORBIDDEN
                 )
 
+        # Serve pre-rendered JSON pages (browsable API renders normally)
+        use_cache = request.accepted_renderer.format == "json"
+        if use_cache:
+            cache_key = thread_page_key(post.id, request)
+            content = get_thread_page(cache_key)
+            if content is not None:
+                return HttpResponse(content, content_type="application/json")
+
         comments = (
             Comment.objects
             .filter(post=post, parent__isnull=True)
             .select_related("author")
-            .prefetch_related(      # Prefetch to save N+1 Queries - Save DB hit.
-                Prefetch(
-                    "replies",
-                    queryset=Comment.objects
-                    .select_related("author")       # ForeignKey
-                    .order_by("id"),
-                )
-            )
+            .prefetch_related(*reply_prefetches())   # Every reply level - Save N+1 Queries.
             .order_by("id")
         )
 
@@ -103,8 +108,17 @@ class PostCommentListAPIView(APIView):
         paginator = CommentPagination()
         page = paginator.paginate_queryset(queryset, request)
         serializer = CommentListSerializer(page, many=True)
+        with timed("serialize"):
+            data = serializer.data
+        response = paginator.get_paginated_response(data)
+
+        if use_cache:
+            with timed("render"):
+                content = JSONRenderer().render(response.data)
+            set_thread_page(cache_key, content)
+            return HttpResponse(content, content_type="application/json")
 
-        return paginator.get_paginated_response(serializer.data)
+        return response
 
 
     @extend_schema(
@@ -0,0 +1,26 @@
+from django.contrib import admin
+from .archive import restore_archived
+from .models import ArchivedRecord
+
+
+@admin.action(description="Restore Selected Records")
+def restore_records(modeladmin, request, queryset):
+    for record in queryset.order_by("id"):
+        # Earlier records may have brought this one back as a dependency
+        if ArchivedRecord.objects.filter(pk=record.pk).exists():
+            restore_archived(record).restore()
+
+
+@admin.register(ArchivedRecord)
+class ArchivedRecordAdmin(admin.ModelAdmin):
+    list_display = ("id", "model_label", "object_id", "deleted_at", "archived_at")
+    list_filter = ("model_label",)
+    search_fields = ("object_id",)
+    ordering = ("id",)
+    readonly_fields = ("model_label", "object_id", "payload", "deleted_at", "archived_at")
+    actions = [restore_records]
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop("delete_selected", None)
+        return actions
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+class CoreConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "apps.core"
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from . import checks  # noqa: F401
+        from .timing import install_sql_timer
+
+        connection_created.connect(install_sql_timer, dispatch_uid="core_sql_timer")
@@ -0,0 +1,264 @@
+from collections import defaultdict
+from django.apps import apps
+from django.core import serializers
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import CASCADE, SET_NULL, Exists, OuterRef
+from django.utils.encoding import is_protected_type
+from .base import BaseModel
+from .models import ArchivedRecord
+
+
+# Children before parents, so references are archived before their targets.
+ARCHIVE_MODELS = (
+    "comments.Comment",
+    "posts.Post",
+    "tags.Tag",
+    "categories.Category",
+    "users.User",
+)
+
+# Archived rows brought back together with a restored parent
+# (mirrors the soft-delete cascades).
+RESTORE_CASCADES = {
+    "posts.post": (("comments.comment", "post"),),
+}
+
+
+def archive_candidates(model, cutoff):
+    """
+    Soft-deleted rows deleted before `cutoff` that no other soft-deletable
+    row (live or deleted) still depends on, so removing them cannot break
+    a foreign key. References that are nulled on delete (created_by,
+    updated_by) do not count, nor rows outside BaseModel deleted with
+    them: archive_deleted keeps both in the payload.
+    """
+    queryset = model._base_manager.filter(is_deleted=True, deleted_at__lt=cutoff)
+
+    for rel in model._meta.related_objects:
+        if rel.on_delete is SET_NULL:
+            continue
+        if rel.on_delete is CASCADE and not issubclass(rel.related_model, BaseModel):
+            continue
+
+        referencing = rel.related_model._base_manager.filter(
+            **{rel.field.name: OuterRef("pk")}
+        )
+        queryset = queryset.exclude(Exists(referencing))
+
+    return queryset.order_by("pk")
+
+
+def archive_deleted(model, cutoff, batch_size, purge=False):
+    """
+    Move (or purge) archivable rows of `model` in bounded batches.
+    Each batch is one transaction that skips rows locked by other writers.
+    Returns the number of rows removed from the live table.
+    """
+    total = 0
+
+    while True:
+        with transaction.atomic():
+            batch = list(
+                archive_candidates(model, cutoff)
+                .select_for_update(skip_locked=True)[:batch_size]
+            )
+            if not batch:
+                return total
+
+            pks = [obj.pk for obj in batch]
+            if not purge:
+                dependents = serialize_dependents(model, pks)
+                references = referencing_rows(model, pks)
+                payloads = serialize_rows(model, batch)
+                for payload in payloads:
+                    payload["dependents"] = dependents[payload["pk"]]
+                    payload["references"] = references[payload["pk"]]
+
+                ArchivedRecord.objects.bulk_create(
+                    [
+                        ArchivedRecord(
+                            model_label=model._meta.label_lower,
+                            object_id=str(obj.pk),
+                            payload=payload,
+                            deleted_at=obj.deleted_at,
+                        )
+                        for obj, payload in zip(batch, payloads)
+                    ]
+                )
+
+            # Real delete: QuerySet.delete() bypasses BaseModel.delete.
+            # It also deletes the dependents and nulls the references.
+            model._base_manager.filter(pk__in=pks).delete()
+
+        total += len(batch)
+
+
+def serialize_rows(model, objs):
+    """
+    Serialize rows in the "python" serializer layout with one query per
+    many-to-many field for the whole batch.
+    """
+    opts = model._meta
+    pks = [obj.pk for obj in objs]
+
+    m2m_values = {}
+    for field in opts.many_to_many:
+        through = field.remote_field.through
+        source = through._meta.get_field(field.m2m_field_name()).attname
+        target = through._meta.get_field(field.m2m_reverse_field_name()).attname
+
+        values = {pk: [] for pk in pks}
+        rows = through._base_manager.filter(**{f"{source}__in": pks}).values_list(
+            source, target
+        )
+        for source_pk, target_pk in rows:
+            values[source_pk].append(target_pk)
+        m2m_values[field.name] = values
+
+    payloads = []
+    for obj in objs:
+        fields = {}
+        for field in opts.concrete_fields:
+            if field.primary_key:
+                continue
+            if field.remote_field:
+                fields[field.name] = getattr(obj, field.attname)
+                continue
+
+            value = field.value_from_object(obj)
+            fields[field.name] = (
+                value if is_protected_type(value) else field.value_to_string(obj)
+            )
+
+        for name, values in m2m_values.items():
+            fields[name] = values[obj.pk]
+
+        payloads.append({"model": opts.label_lower, "pk": obj.pk, "fields": fields})
+
+    return payloads
+
+
+def serialize_dependents(model, pks):
+    """
+    {pk: [payload, ...]}: rows outside BaseModel that an on_delete
+    CASCADE removes with these rows (a user's revoked tokens, stats,
+    upload sessions, admin log), their own dependents after them.
+    """
+    dependents = defaultdict(list)
+
+    for rel in model._meta.related_objects:
+        if rel.on_delete is not CASCADE or issubclass(rel.related_model, BaseModel):
+            continue
+
+        rows = list(
+            rel.related_model._base_manager.filter(**{f"{rel.field.attname}__in": pks})
+            .order_by("pk")
+        )
+        children = serialize_dependents(rel.related_model, [row.pk for row in rows])
+        for row, payload in zip(rows, serializers.serialize("python", rows)):
+            dependents[getattr(row, rel.field.attname)] += [payload, *children[row.pk]]
+
+    return dependents
+
+
+def referencing_rows(model, pks):
+    """
+    {pk: {"<model label>.<field>": [row pks]}}: rows whose reference to
+    these rows is nulled on delete, to point them back on restore.
+    """
+    references = defaultdict(dict)
+
+    for rel in model._meta.related_objects:
+        if rel.on_delete is not SET_NULL:
+            continue
+
+        key = f"{rel.related_model._meta.label_lower}.{rel.field.name}"
+        rows = rel.related_model._base_manager.filter(
+            **{f"{rel.field.attname}__in": pks}
+        ).values_list("pk", rel.field.attname)
+        for row_pk, target in rows:
+            references[target].setdefault(key, []).append(row_pk)
+
+    return references
+
+
+def restore_archived(record):
+    """
+    Re-insert an archived row with its original primary key.
+    Archived rows it references are restored first, and archived children
+    listed in RESTORE_CASCADES follow it. Rows come back still soft-deleted;
+    call `.restore()` on the returned object to make them live again.
+    Its dependents are re-inserted and nulled references point back to it.
+    """
+    with transaction.atomic():
+        model = apps.get_model(record.model_label)
+        payload = dict(record.payload, fields=dict(record.payload["fields"]))
+        dependents = payload.pop("dependents", [])
+        references = payload.pop("references", {})
+
+        for field in model._meta.concrete_fields:
+            value = payload["fields"].get(field.name)
+            if field.remote_field and value is not None:
+                # Nullable references to purged rows are dropped
+                if not _ensure_exists(field.related_model, value, required=not field.null):
+                    payload["fields"][field.name] = None
+
+        for field in model._meta.many_to_many:
+            payload["fields"][field.name] = [
+                pk for pk in payload["fields"].get(field.name, [])
+                if _ensure_exists(field.related_model, pk, required=False)
+            ]
+
+        deserialized = next(serializers.deserialize("python", [payload]))
+        deserialized.save()
+        record.delete()
+
+        for dependent in serializers.deserialize("python", _new_ids(dependents)):
+            dependent.save()
+
+        for key, pks in references.items():
+            label, field_name = key.rsplit(".", 1)
+            apps.get_model(label)._base_manager.filter(
+                pk__in=pks, **{f"{field_name}__isnull": True}
+            ).update(**{field_name: deserialized.object.pk})
+
+        for child_label, field_name in RESTORE_CASCADES.get(record.model_label, ()):
+            children = ArchivedRecord.objects.filter(
+                model_label=child_label,
+                **{f"payload__fields__{field_name}": deserialized.object.pk},
+            ).order_by("payload__fields__depth", "id")
+            for child in children:
+                # Parents may already have come back as a dependency
+                if ArchivedRecord.objects.filter(pk=child.pk).exists():
+                    restore_archived(child)
+
+        return deserialized.object
+
+
+def _new_ids(payloads):
+    # Surrogate ids are reassigned: nothing references these rows, and a
+    # new id puts a restored RevokedToken in the revocation filter refresh
+    for payload in payloads:
+        if apps.get_model(payload["model"])._meta.pk.auto_created:
+            payload = dict(payload, pk=None)
+        yield payload
+
+
+def _ensure_exists(model, pk, required=True):
+    if model._base_manager.filter(pk=pk).exists():
+        return True
+
+    record = ArchivedRecord.objects.filter(
+        model_label=model._meta.label_lower,
+        object_id=str(pk),
+    ).first()
+    if record is not None:
+        restore_archived(record)
+        return True
+
+    if required:
+        raise ValidationError(
+            f"{model._meta.label} #{pk} no longer exists and is not archived."
+        )
+    return False
@@ -0,0 +1,140 @@
+import math
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from .timing import timed
+
+
+def json_response(data, status=200):
+    """
+    Same bytes as the DRF JSON renderer used by the sync views.
+    """
+    with timed("render"):
+        content = JSONRenderer().render(data)
+    return HttpResponse(content, content_type="application/json", status=status)
+
+
+def error_response(detail, status):
+    if not isinstance(detail, dict):
+        detail = {"detail": str(detail)}
+    return json_response(detail, status=status)
+
+
+class AsyncAPIView(View):
+    """
+    Base of the async read endpoints (`/api/async/...`), served without
+    thread adapters under ASGI.
+    Authenticates and throttles like the APIView endpoints do. Handlers
+    fetch with the async ORM and select/prefetch every relation their
+    serializer reads, so serializing never touches the database
+    (a missed relation raises SynchronousOnlyOperation).
+    """
+
+    http_method_names = ["get", "options"]
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    throttle_classes = api_settings.DEFAULT_THROTTLE_CLASSES
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            request.user = await self.authenticate(request)
+        except exceptions.AuthenticationFailed as exc:
+            response = error_response(exc.detail, status=401)
+            response["WWW-Authenticate"] = self.authenticate_header(request)
+            return response
+
+        for throttle in [throttle() for throttle in self.throttle_classes]:
+            if not await sync_to_async(throttle.allow_request)(request, self):
+                wait = int(throttle.wait() or 0) + 1
+                response = error_response(
+                    f"Request was throttled. Expected available in {wait} seconds.",
+                    status=429,
+                )
+                response["Retry-After"] = str(wait)
+                return response
+
+        try:
+            return await super().dispatch(request, *args, **kwargs)
+        except exceptions.NotFound as exc:
+            return error_response(exc.detail, status=404)
+
+    async def authenticate(self, request):
+        # One thread hop: token checks use the (sync) cache backend
+        for authenticator in [auth() for auth in self.authentication_classes]:
+            result = await sync_to_async(authenticator.authenticate)(request)
+            if result is not None:
+                return result[0]
+        return AnonymousUser()
+
+    def authenticate_header(self, request):
+        return self.authentication_classes[0]().authenticate_header(request)
+
+
+class AsyncPageNumberPagination:
+    """
+    PageNumberPagination for async querysets: same parameters, limits,
+    links and response body.
+    """
+
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 50
+    page_query_param = "page"
+
+    async def paginate_queryset(self, queryset, request):
+        with timed("paginate"):
+            return await self._paginate_queryset(queryset, request)
+
+    async def _paginate_queryset(self, queryset, request):
+        self.request = request
+        self.count = await queryset.acount()
+        size = self.get_page_size(request)
+        self.num_pages = max(1, math.ceil(self.count / size))
+
+        number = request.GET.get(self.page_query_param) or 1
+        if number == "last":
+            number = self.num_pages
+        try:
+            self.number = int(number)
+        except (TypeError, ValueError):
+            raise exceptions.NotFound("Invalid page.")
+        if not 1 <= self.number <= self.num_pages:
+            raise exceptions.NotFound("Invalid page.")
+
+        offset = (self.number - 1) * size
+        return [obj async for obj in queryset[offset:offset + size]]
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.GET[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_paginated_data(self, results):
+        return {
+            "count": self.count,
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": results,
+        }
+
+    def get_next_link(self):
+        if self.number >= self.num_pages:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.page_query_param, self.number + 1)
+
+    def get_previous_link(self):
+        if self.number <= 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.number - 1)
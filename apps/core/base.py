@@ -1,13 +1,67 @@
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from django.contrib.auth.models import UserManager
 
-class ActiveManager(models.Manager):
+# Rows per UPDATE when soft deleting / restoring large sets.
+SOFT_DELETE_CHUNK_SIZE = 1000
+
+
+class SoftDeleteQuerySet(models.QuerySet):
+    """
+    Set-based soft delete / restore.
+    Rows are processed in primary-key chunks, each chunk being one
+    transaction with one UPDATE per table (plus the model's cascades).
+    """
+
+    def soft_delete(self):
+        deleted_at = timezone.now()
+        count = 0
+        for pks in self.filter(is_deleted=False).pk_chunks():
+            with transaction.atomic():
+                count += self.model.soft_delete_rows(pks, deleted_at)
+        return count
+
+    def restore(self):
+        count = 0
+        for pks in self.filter(is_deleted=True).pk_chunks():
+            with transaction.atomic():
+                count += self.model.restore_rows(pks)
+        return count
+
+    def pk_chunks(self, chunk_size=None):
+        """
+        Yield lists of primary keys using keyset pagination, so every
+        chunk is an indexed range scan regardless of the set size.
+        """
+        chunk_size = chunk_size or SOFT_DELETE_CHUNK_SIZE
+        queryset = self.order_by("pk").values_list("pk", flat=True)
+        last_pk = None
+
+        while True:
+            chunk = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            pks = list(chunk[:chunk_size])
+            if not pks:
+                return
+
+            yield pks
+            last_pk = pks[-1]
+
+
+class SoftDeleteManager(models.Manager.from_queryset(SoftDeleteQuerySet)):
+    pass
+
+
+class ActiveManager(SoftDeleteManager):
     def get_queryset(self):
         return super().get_queryset().filter(is_deleted=False)
 
-class ActiveUserManager(UserManager):
+
+class SoftDeleteUserManager(UserManager.from_queryset(SoftDeleteQuerySet)):
+    pass
+
+
+class ActiveUserManager(SoftDeleteUserManager):
     def get_queryset(self):
         return super().get_queryset().filter(is_deleted=False)
 
@@ -36,12 +90,60 @@ class BaseModel(models.Model):
     deleted_at = models.DateTimeField(null=True, blank=True)
 
     objects = ActiveManager()
-    all_objects = models.Manager()
+    all_objects = SoftDeleteManager()
 
     def delete(self, using=None, keep_parents=False):
         self.is_deleted = True
         self.deleted_at = timezone.now()
         self.save(update_fields=["is_deleted", "deleted_at"])
 
+    @classmethod
+    def soft_delete_rows(cls, pks, deleted_at):
+        """
+        Soft delete the given primary keys with a single UPDATE.
+        Models override this to add set-based cascades.
+        Returns the number of rows deleted.
+        """
+        return cls._base_manager.filter(pk__in=pks).update(
+            is_deleted=True,
+            deleted_at=deleted_at,
+        )
+
+    @classmethod
+    def restore_rows(cls, pks):
+        """
+        Restore the given primary keys with a single UPDATE.
+        Returns the number of rows restored.
+        """
+        return cls._base_manager.filter(pk__in=pks).update(
+            is_deleted=False,
+            deleted_at=None,
+        )
+
+    def soft_delete(self):
+        """
+        Soft delete this object through the set-based path.
+        """
+        with transaction.atomic():
+            if self.is_deleted:
+                return
+
+            deleted_at = timezone.now()
+            if type(self).soft_delete_rows([self.pk], deleted_at):
+                self.is_deleted = True
+                self.deleted_at = deleted_at
+
+    def restore(self):
+        """
+        Restore this object through the set-based path.
+        """
+        with transaction.atomic():
+            if not self.is_deleted:
+                return
+
+            if type(self).restore_rows([self.pk]):
+                self.is_deleted = False
+                self.deleted_at = None
+
     class Meta:
         abstract = True
@@ -0,0 +1,411 @@
+import json
+import random
+import time
+from contextlib import ExitStack
+from io import BytesIO
+from urllib.parse import urlsplit
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.test import Client
+from django.urls import URLResolver, get_resolver, resolve
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from apps.categories.models import Category
+from apps.comments.constants import MAX_COMMENT_DEPTH
+from apps.comments.models import Comment
+from apps.posts.images import ensure_variants
+from apps.posts.models import ImageUpload, Post
+from apps.posts.uploads import create_upload_session
+from apps.tags.models import Tag
+from apps.users.models import User
+from apps.users.stats import compute_author_stats
+
+
+PASSWORD = "Bench123!"
+
+WORDS = (
+    "django query index cache thread latency request serializer middleware "
+    "database replica token upload image worker schema route page draft"
+).split()
+
+PERCENTILES = {"p50": 0.50, "p95": 0.95, "p99": 0.99}
+
+# Periodic work (e.g. the token revocation index refresh) adds a query
+# to the odd request; an N+1 adds at least one to every request
+QUERY_TOLERANCE = 0.5
+
+# Statements of the savepoints each benchmarked request runs in
+SAVEPOINTS = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+class Scenario:
+    """
+    One request, repeated. `user` sends a Bearer token for that user.
+    `prepare`, if given, runs untimed before each request and returns
+    overrides of `path`, `data` or `token` (e.g. a fresh object to act on).
+    `limit` caps the timed requests of slow scenarios.
+    """
+
+    def __init__(
+        self, name, method, path, status=200, user=None, data=None,
+        content_type="application/json", headers=None, prepare=None, limit=None,
+    ):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.status = status
+        self.data = data
+        self.content_type = content_type
+        self.headers = headers or {}
+        self.prepare = prepare
+        self.limit = limit
+        self.token = str(AccessToken.for_user(user)) if user is not None else None
+
+    def request(self):
+        overrides = self.prepare() if self.prepare is not None else {}
+        data = overrides.get("data", self.data)
+        token = overrides.get("token", self.token)
+
+        headers = dict(self.headers)
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        if data is None:
+            body = ""
+        elif isinstance(data, bytes):
+            body = data
+        else:
+            body = json.dumps(data)
+        return overrides.get("path", self.path), body, headers
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # Savepoints stand in for the transactions of a real request
+        if not sql.startswith(SAVEPOINTS):
+            self.count += 1
+        return execute(sql, params, many, context)
+
+
+def seed(users=200, posts=500, comments=20, seed=0):
+    """
+    A reproducible dataset: `users` authors and a staff user, `posts`
+    posts with three tags each (one in five a draft), and under each
+    published post about `comments` comments in threads nested
+    MAX_COMMENT_DEPTH deep. The first post has an image with its
+    variants. Returns the objects the scenarios act on.
+    """
+    rng = random.Random(seed)
+    password = make_password(PASSWORD)  # Hashed once for every user
+
+    User.objects.bulk_create(
+        [User(username=f"user{i}", email=f"user{i}@example.com", password=password) for i in range(users)]
+        + [User(username="admin", email="admin@example.com", password=password, is_staff=True, is_superuser=True)]
+    )
+    authors = list(User.objects.filter(is_staff=False).order_by("id"))
+    admin = User.objects.get(username="admin")
+
+    categories = Category.objects.bulk_create(
+        [Category(name=f"Category {i}", slug=f"category-{i}") for i in range(10)]
+    )
+    tags = Tag.objects.bulk_create([Tag(name=f"Tag {i}", slug=f"tag-{i}") for i in range(30)])
+
+    # Posts 0 and 1 share an author: a published post and a draft
+    created = Post.objects.bulk_create([
+        Post(
+            title=f"Post {i}",
+            slug=f"post-{i}",
+            content=" ".join(rng.choice(WORDS) for _ in range(300)),
+            author=authors[(i // 2) % len(authors)],
+            status=Post.Status.DRAFT if i % 5 == 1 else Post.Status.PUBLISHED,
+            category=categories[i % len(categories)],
+        )
+        for i in range(posts)
+    ])
+    Post.tags.through.objects.bulk_create([
+        Post.tags.through(post_id=post.pk, tag_id=tag.pk)
+        for post in created
+        for tag in rng.sample(tags, 3)
+    ])
+
+    # One reply per comment of the level above, down to MAX_COMMENT_DEPTH
+    roots = max(1, comments // (MAX_COMMENT_DEPTH + 1))
+    level = Comment.objects.bulk_create([
+        Comment(
+            post=post,
+            author=post.author if i == 0 else rng.choice(authors),
+            content=" ".join(rng.choice(WORDS) for _ in range(30)),
+        )
+        for post in created if post.status == Post.Status.PUBLISHED
+        for i in range(roots)
+    ])
+    for depth in range(1, MAX_COMMENT_DEPTH + 1):
+        level = Comment.objects.bulk_create([
+            Comment(
+                post_id=parent.post_id,
+                parent=parent,
+                depth=depth,
+                author=rng.choice(authors),
+                content=" ".join(rng.choice(WORDS) for _ in range(30)),
+            )
+            for parent in level
+        ])
+
+    compute_author_stats([user.pk for user in authors] + [admin.pk])
+
+    post, draft = created[0], created[1]
+    image = png(1600, 900)
+    name = default_storage.save("posts/images/hero.png", ContentFile(image))
+    Post.objects.filter(pk=post.pk).update(image=name)
+    ensure_variants(post.pk)
+
+    return {
+        "admin": admin,
+        "author": post.author,
+        "reader": authors[-1],
+        "post": post,
+        "draft": draft,
+        "comment": Comment.objects.filter(post=post, author=post.author).first(),
+        "category": categories[0],
+        "tag": tags[0],
+        "image": image,
+        "upload": create_upload_session(post.author, "hero.png", len(image)),
+    }
+
+
+def png(width, height):
+    from PIL import Image  #local import - Pillow is only needed here
+
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), "teal").save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def scenarios(data):
+    """
+    Every route: anonymous, authenticated and staff access, draft
+    visibility and the main writes.
+    """
+    admin, author, reader = data["admin"], data["author"], data["reader"]
+    post, draft, comment = data["post"], data["draft"], data["comment"]
+    category, tag, upload, image = data["category"], data["tag"], data["upload"], data["image"]
+    metrics_headers = {"Authorization": f"Bearer {settings.METRICS_TOKEN}"} if settings.METRICS_TOKEN else {}
+
+    return [
+        # Auth (password hashing makes login and sign-up slow by design)
+        Scenario(
+            "auth: login", "POST", "/api/auth/login/", limit=10,
+            data={"username": author.username, "password": PASSWORD},
+        ),
+        Scenario("auth: refresh", "POST", "/api/auth/refresh/", data={"refresh": str(RefreshToken.for_user(author))}),
+        Scenario("auth: logout", "POST", "/api/auth/logout/", status=204, prepare=fresh_session(author)),
+
+        # Users
+        Scenario("users: list", "GET", "/api/users/"),
+        Scenario("users: register", "POST", "/api/users/", status=201, limit=10, data={
+            "username": "newcomer", "email": "newcomer@example.com", "password": PASSWORD,
+        }),
+        Scenario("users: bulk create (staff)", "POST", "/api/users/bulk/", user=admin, limit=5, data=[
+            {"username": f"bulk{i}", "email": f"bulk{i}@example.com", "password": PASSWORD} for i in range(10)
+        ]),
+        Scenario("users: detail", "GET", f"/api/users/{author.pk}/"),
+        Scenario("users: profile", "GET", f"/api/users/{author.pk}/profile/"),
+
+        # Posts
+        Scenario("posts: list", "GET", "/api/posts/"),
+        Scenario("posts: list, page 2", "GET", "/api/posts/?page=2"),
+        Scenario("posts: list by tag", "GET", f"/api/posts/?tag={tag.slug}"),
+        Scenario("posts: search", "GET", "/api/posts/?search=replica&ordering=-created_at"),
+        Scenario("posts: drafts (anonymous)", "GET", "/api/posts/?status=draft", status=403),
+        Scenario("posts: drafts (user)", "GET", "/api/posts/?status=draft", user=author),
+        Scenario("posts: create", "POST", "/api/posts/", status=201, user=author, data={
+            "title": "Benchmark post", "content": "...", "status": Post.Status.PUBLISHED,
+            "category": category.slug, "tags": [tag.slug],
+        }),
+        Scenario("posts: detail by id", "GET", f"/api/posts/{post.pk}/"),
+        Scenario("posts: detail by slug", "GET", f"/api/posts/{post.slug}/"),
+        Scenario("posts: draft (anonymous)", "GET", f"/api/posts/{draft.slug}/", status=403),
+        Scenario("posts: draft (other user)", "GET", f"/api/posts/{draft.slug}/", status=403, user=reader),
+        Scenario("posts: draft (author)", "GET", f"/api/posts/{draft.slug}/", user=author),
+        Scenario("posts: update", "PATCH", f"/api/posts/{post.pk}/", user=author, data={"title": "Edited"}),
+        Scenario("posts: image variant", "GET", f"/api/posts/{post.pk}/image/640/", status=302),
+
+        # Resumable uploads
+        Scenario("uploads: start", "POST", "/api/uploads/images/", status=201, user=author, data={
+            "filename": "hero.png", "size": len(image),
+        }),
+        Scenario("uploads: status", "GET", f"/api/uploads/images/{upload.pk}/", user=author),
+        Scenario(
+            "uploads: chunk", "PATCH", f"/api/uploads/images/{upload.pk}/", user=author, data=image,
+            content_type="application/offset+octet-stream", headers={"Upload-Offset": "0"},
+        ),
+        Scenario(
+            "uploads: complete", "POST", f"/api/uploads/images/{upload.pk}/complete/", user=author,
+            prepare=uploaded(author, image),
+        ),
+
+        # Comments
+        Scenario("comments: thread", "GET", f"/api/posts/{post.slug}/comments/"),
+        Scenario("comments: create", "POST", f"/api/posts/{post.slug}/comments/", status=201, user=reader, data={
+            "content": "Nice post", "parent": comment.pk,
+        }),
+        Scenario("comments: update", "PATCH", f"/api/comments/{comment.pk}/", user=author, data={"content": "Edited"}),
+
+        # Categories and tags
+        Scenario("categories: list", "GET", "/api/categories/"),
+        Scenario("categories: detail", "GET", f"/api/categories/{category.slug}/"),
+        Scenario("categories: create (staff)", "POST", "/api/categories/create/", status=201, user=admin, data={
+            "name": "Benchmarks", "slug": "benchmarks",
+        }),
+        Scenario("categories: update (staff)", "PATCH", f"/api/categories/{category.slug}/manage/", user=admin, data={
+            "name": "Renamed",
+        }),
+        Scenario("tags: list", "GET", "/api/tags/"),
+        Scenario("tags: detail", "GET", f"/api/tags/{tag.slug}/"),
+        Scenario("tags: create (staff)", "POST", "/api/tags/create/", status=201, user=admin, data={
+            "name": "Benchmarks", "slug": "benchmarks",
+        }),
+        Scenario("tags: update (staff)", "PATCH", f"/api/tags/{tag.slug}/manage/", user=admin, data={"name": "Renamed"}),
+
+        # Async (ASGI) read endpoints
+        Scenario("async: posts list", "GET", "/api/async/posts/"),
+        Scenario("async: post by id", "GET", f"/api/async/posts/{post.pk}/"),
+        Scenario("async: post by slug", "GET", f"/api/async/posts/{post.slug}/"),
+        Scenario("async: comments thread", "GET", f"/api/async/posts/{post.slug}/comments/"),
+        Scenario("async: categories", "GET", "/api/async/categories/"),
+        Scenario("async: tags", "GET", "/api/async/tags/"),
+
+        # Operations and docs
+        Scenario("core: db pool stats (staff)", "GET", "/api/core/db-pool/", user=admin),
+        Scenario("metrics", "GET", "/metrics", headers=metrics_headers),
+        Scenario("schema", "GET", "/api/schema/"),
+        Scenario("docs: swagger", "GET", "/api/docs/"),
+        Scenario("docs: redoc", "GET", "/api/redoc/"),
+        Scenario("admin (anonymous)", "GET", "/admin/", status=302),
+    ]
+
+
+def fresh_session(user):
+    # Logout revokes its tokens: a new pair for every request
+    def prepare():
+        refresh = RefreshToken.for_user(user)
+        return {"data": {"refresh": str(refresh)}, "token": str(refresh.access_token)}
+    return prepare
+
+
+def uploaded(owner, content):
+    # Completing consumes the part file: a new, fully received upload per request
+    def prepare():
+        upload = create_upload_session(owner, "hero.png", len(content))
+        upload.part_path.write_bytes(content)
+        ImageUpload.objects.filter(pk=upload.pk).update(offset=len(content))
+        return {"path": f"/api/uploads/images/{upload.pk}/complete/"}
+    return prepare
+
+
+def run(scenario, requests=50, warmup=5):
+    """
+    Time `requests` requests after `warmup` untimed ones. Each request
+    runs in a transaction rolled back afterwards, so writes and throttle
+    state never accumulate: every request sees the seeded data.
+    """
+    if scenario.limit is not None:
+        requests = min(requests, scenario.limit)
+    client = Client()
+    durations = []
+    queries = 0
+
+    for i in range(warmup + requests):
+        counter = QueryCounter()
+        with transaction.atomic():
+            path, body, headers = scenario.request()
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(counter))
+                start = time.perf_counter()
+                response = client.generic(
+                    scenario.method, path, body, content_type=scenario.content_type, headers=headers
+                )
+                duration = time.perf_counter() - start
+            transaction.set_rollback(True)
+
+        if response.status_code != scenario.status:
+            raise BenchmarkError(
+                f"{scenario.name}: {scenario.method} {path} returned {response.status_code}, "
+                f"expected {scenario.status}"
+            )
+        if i >= warmup:
+            durations.append(duration)
+            queries += counter.count
+
+    durations.sort()
+    result = {
+        name: round(percentile(durations, fraction) * 1000, 3)
+        for name, fraction in PERCENTILES.items()
+    }
+    result["rps"] = round(len(durations) / sum(durations), 1)
+    result["queries"] = round(queries / len(durations), 2)
+    return result
+
+
+def percentile(ordered, fraction):
+    # Linear interpolation between the closest ranks
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def compare(results, baseline, tolerance):
+    """
+    Per scenario, the p95 change against `baseline` and any change in
+    queries per request. A scenario regresses when its p95 grows by
+    more than `tolerance` (a fraction) or it runs more queries.
+    Returns ({name: note}, [regressed names]).
+    """
+    notes, regressions = {}, []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            notes[name] = "new"
+            continue
+
+        change = result["p95"] / base["p95"] - 1 if base["p95"] else 0.0
+        note = f"p95 {change:+.0%}"
+        queries = result["queries"] - base["queries"]
+        if abs(queries) > QUERY_TOLERANCE:
+            note += f", queries {base['queries']:g} -> {result['queries']:g}"
+        if change > tolerance or queries > QUERY_TOLERANCE:
+            note += "  REGRESSION"
+            regressions.append(name)
+        notes[name] = note
+    return notes, regressions
+
+
+def routes(patterns=None, prefix=""):
+    """
+    Every route of the URLconf; the admin site counts as one.
+    """
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    found = []
+    for pattern in patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLResolver) and pattern.namespace != "admin":
+            found.extend(routes(pattern.url_patterns, route))
+        else:
+            found.append(route)
+    return found
+
+
+def uncovered_routes(scenarios):
+    covered = {resolve(urlsplit(scenario.path).path).route for scenario in scenarios}
+    return [route for route in routes() if route not in covered]
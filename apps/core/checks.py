@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+
+ADMIN_MIDDLEWARE = [
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+]
+
+
+@register(Tags.admin)
+def check_admin_middleware(app_configs, **kwargs):
+    """
+    admin.E408-E410 for the chain MIDDLEWARE_BY_PATH runs under /admin/.
+    """
+    for prefix, middleware in settings.MIDDLEWARE_BY_PATH:
+        if "/admin/".startswith(prefix):
+            break
+    else:
+        middleware = []
+
+    return [
+        Error(
+            f"'{path}' must be in the MIDDLEWARE_BY_PATH entry matching /admin/.",
+            id="core.E001",
+        )
+        for path in ADMIN_MIDDLEWARE
+        if path not in middleware
+    ]
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    core.E002 (check --deploy): cache invalidations must reach every
+    worker process.
+    """
+    backend = settings.CACHES["default"]["BACKEND"]
+    if settings.DEBUG or backend != "django.core.cache.backends.locmem.LocMemCache":
+        return []
+
+    return [
+        Error(
+            "The default cache is per process (LocMemCache) with DEBUG off: "
+            "other worker processes keep an invalidated authentication user "
+            "for up to AUTH_USER_CACHE_TIMEOUT and a stale comment thread "
+            "for up to COMMENT_THREAD_CACHE_TIMEOUT.",
+            hint="Set CACHE_URL to a cache shared by all workers (Redis, Memcached or dbcache://).",
+            id="core.E002",
+        )
+    ]
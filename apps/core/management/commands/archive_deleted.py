@@ -0,0 +1,53 @@
+from datetime import timedelta
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from apps.core.archive import ARCHIVE_MODELS, archive_deleted
+
+
+class Command(BaseCommand):
+    help = (
+        "Move rows soft-deleted more than N days ago into the archive table "
+        "(or purge them) in bounded batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.ARCHIVE_AFTER_DAYS,
+            help="Only rows deleted more than this many days ago.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.ARCHIVE_BATCH_SIZE,
+            help="Rows per transaction.",
+        )
+        parser.add_argument(
+            "--purge",
+            action="store_true",
+            help="Delete rows permanently instead of archiving them.",
+        )
+        parser.add_argument(
+            "--model",
+            action="append",
+            choices=ARCHIVE_MODELS,
+            help="Limit to these models (repeatable). Defaults to all.",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["days"])
+        labels = options["model"] or ARCHIVE_MODELS
+        action = "Purged" if options["purge"] else "Archived"
+
+        # Keep dependency order whatever order --model was given in
+        for label in [label for label in ARCHIVE_MODELS if label in labels]:
+            count = archive_deleted(
+                apps.get_model(label),
+                cutoff,
+                options["batch_size"],
+                purge=options["purge"],
+            )
+            self.stdout.write(f"{action} {count} {label} rows")
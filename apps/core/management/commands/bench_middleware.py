@@ -0,0 +1,87 @@
+import time
+from django.conf import settings
+from django.core.handlers.base import BaseHandler
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.views.decorators.csrf import csrf_exempt
+
+
+DISPATCHER = "apps.core.middleware.PathMiddlewareDispatcher"
+
+
+@csrf_exempt
+def stub_view(request):
+    # csrf_exempt like every DRF APIView
+    return HttpResponse(b"{}", content_type="application/json")
+
+
+class StubHandler(BaseHandler):
+    """
+    The middleware chain around a stub view: no URL resolution or view
+    work, so the timings are the middleware overhead alone.
+    """
+
+    def _get_response(self, request):
+        for process_view in self._view_middleware:
+            response = process_view(request, stub_view, (), {})
+            if response is not None:
+                return response
+        return stub_view(request)
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the middleware overhead per request with the path-scoped "
+        "stack (MIDDLEWARE_BY_PATH) against the full stack on every path."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/api/posts/")
+        parser.add_argument("--requests", type=int, default=20000)
+        parser.add_argument("--rounds", type=int, default=5, help="Best round is reported.")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        full = [m for m in settings.MIDDLEWARE if m != DISPATCHER] + _full_scope()
+        stacks = [
+            ("full stack", full),
+            ("path-scoped", settings.MIDDLEWARE),
+        ]
+
+        factory = RequestFactory(HTTP_HOST="localhost", HTTP_AUTHORIZATION="Bearer benchmark")
+        self.stdout.write(f"GET {path}, {options['requests']} requests, best of {options['rounds']}")
+
+        timings = {}
+        for name, middleware in stacks:
+            with override_settings(MIDDLEWARE=middleware):
+                handler = StubHandler()
+                handler.load_middleware()
+                best = min(
+                    _run(handler, factory, path, options["requests"])
+                    for _ in range(options["rounds"])
+                )
+            timings[name] = best
+            self.stdout.write(f"  {name:<12} {best * 1e6:8.1f} µs/request")
+
+        saved = timings["full stack"] - timings["path-scoped"]
+        self.stdout.write(
+            f"  saved        {saved * 1e6:8.1f} µs/request "
+            f"({saved / timings['full stack']:.0%})"
+        )
+
+
+def _full_scope():
+    # The chain of the catch-all prefix, i.e. the one the admin runs
+    for prefix, middleware in settings.MIDDLEWARE_BY_PATH:
+        if prefix == "/":
+            return middleware
+    return []
+
+
+def _run(handler, factory, path, count):
+    requests = [factory.get(path) for _ in range(count)]
+    start = time.perf_counter()
+    for request in requests:
+        handler.get_response(request)
+    return (time.perf_counter() - start) / count
@@ -0,0 +1,46 @@
+import difflib
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from apps.core.openapi import generate_schema
+
+
+class Command(BaseCommand):
+    help = "Fail when the committed OpenAPI schema differs from the live code."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--write",
+            action="store_true",
+            help="Regenerate the schema file instead of checking it.",
+        )
+
+    def handle(self, *args, **options):
+        path = settings.OPENAPI_SCHEMA_FILE
+        generated = generate_schema()
+
+        if options["write"]:
+            with open(path, "wb") as schema_file:
+                schema_file.write(generated)
+            self.stdout.write(f"Wrote {path}")
+            return
+
+        try:
+            with open(path, "rb") as schema_file:
+                committed = schema_file.read()
+        except FileNotFoundError:
+            committed = b""
+
+        if committed == generated:
+            self.stdout.write(f"{path} is up to date")
+            return
+
+        diff = difflib.unified_diff(
+            committed.decode().splitlines(keepends=True),
+            generated.decode().splitlines(keepends=True),
+            fromfile=f"{path} (committed)",
+            tofile=f"{path} (generated)",
+        )
+        self.stderr.write("".join(diff))
+        raise CommandError(
+            f"{path} is out of date: run `manage.py check_openapi_schema --write`."
+        )
@@ -0,0 +1,33 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from apps.core.storage import ContentAddressedStorage, gc_blobs
+
+
+class Command(BaseCommand):
+    help = "Delete content-addressed media blobs that no row references anymore."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-hours",
+            type=int,
+            default=settings.MEDIA_BLOB_GRACE_HOURS,
+            help="Keep blobs uploaded within this many hours (uploads not yet attached).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report what would be deleted.",
+        )
+
+    def handle(self, *args, **options):
+        if not isinstance(default_storage, ContentAddressedStorage):
+            raise CommandError("The default storage is not content-addressed.")
+
+        cutoff = timezone.now() - timedelta(hours=options["grace_hours"])
+        count, size = gc_blobs(cutoff, dry_run=options["dry_run"])
+
+        verb = "Would delete" if options["dry_run"] else "Deleted"
+        self.stdout.write(f"{verb} {count} blobs ({size} bytes)")
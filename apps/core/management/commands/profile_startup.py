@@ -0,0 +1,142 @@
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Run in a fresh interpreter under `python -X importtime`: boots the WSGI
+# application like a new worker would, timing each AppConfig.ready() and
+# each phase up to the first response. Results go to stdout as JSON.
+BOOTSTRAP = r"""
+import io, json, sys, time
+start = time.perf_counter()
+wsgi_path, path, host = sys.argv[1:4]
+
+from django.apps.config import AppConfig
+
+ready_times = {}
+create = AppConfig.create.__func__
+
+
+def timed_create(cls, entry):
+    config = create(cls, entry)
+    ready = config.ready
+
+    def timed_ready():
+        began = time.perf_counter()
+        ready()
+        ready_times[config.label] = time.perf_counter() - began
+
+    config.ready = timed_ready
+    return config
+
+
+AppConfig.create = classmethod(timed_create)
+
+phases = []
+from django.utils.module_loading import import_string
+application = import_string(wsgi_path)
+phases.append(("django.setup() and WSGI application", time.perf_counter() - start))
+
+from django.urls import get_resolver
+get_resolver().url_patterns
+phases.append(("URLconf import", time.perf_counter() - start))
+
+status = {}
+warm = None
+if path:
+    def request():
+        environ = {
+            "REQUEST_METHOD": "GET", "PATH_INFO": path, "QUERY_STRING": "",
+            "SERVER_NAME": host, "SERVER_PORT": "80", "HTTP_HOST": host,
+            "wsgi.input": io.BytesIO(), "wsgi.errors": sys.stderr,
+            "wsgi.url_scheme": "http",
+        }
+        body = application(environ, lambda code, headers: status.setdefault("code", code))
+        b"".join(body)
+        body.close()
+
+    request()
+    phases.append((f"first GET {path}", time.perf_counter() - start))
+    began = time.perf_counter()
+    request()
+    warm = (f"second GET {path}", time.perf_counter() - began)
+
+print(json.dumps({"phases": phases, "warm": warm, "ready": ready_times, "status": status.get("code")}))
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Profile a cold process start: slowest imports, app ready() hooks "
+        "and the time until the first response."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/api/posts/", help="URL of the first request.")
+        parser.add_argument("--host", default="localhost", help="Host header (must be in ALLOWED_HOSTS).")
+        parser.add_argument("--no-request", action="store_true", help="Stop after the URLconf import.")
+        parser.add_argument("--top", type=int, default=20, help="Rows per report.")
+
+    def handle(self, *args, **options):
+        process = subprocess.run(
+            [
+                sys.executable, "-X", "importtime", "-c", BOOTSTRAP,
+                settings.WSGI_APPLICATION,
+                "" if options["no_request"] else options["path"],
+                options["host"],
+            ],
+            capture_output=True,
+            text=True,
+            cwd=settings.BASE_DIR,
+            env=os.environ.copy(),
+        )
+        if process.returncode:
+            raise CommandError(process.stderr[-3000:])
+
+        result = json.loads(process.stdout.strip().splitlines()[-1])
+        modules = parse_importtime(process.stderr)
+        top = options["top"]
+
+        self.stdout.write("Phases (ms since interpreter start)")
+        for name, seconds in result["phases"]:
+            self.stdout.write(f"  {seconds * 1000:9.1f}  {name}")
+        if result["status"]:
+            self.stdout.write(f"  status: {result['status']}")
+        if result["warm"]:
+            name, seconds = result["warm"]
+            self.stdout.write("\nWarm request (ms, duration of the request alone)")
+            self.stdout.write(f"  {seconds * 1000:9.1f}  {name}")
+
+        self.stdout.write(f"\nImports: {len(modules)} modules, {sum(m[1] for m in modules) / 1000:.1f} ms")
+
+        self.stdout.write("\nSlowest packages (self time, ms)")
+        packages = defaultdict(int)
+        for name, self_us, _ in modules:
+            packages[name.split(".")[0]] += self_us
+        for name, self_us in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+            self.stdout.write(f"  {self_us / 1000:9.1f}  {name}")
+
+        self.stdout.write("\nSlowest imports (cumulative, ms)")
+        for name, _, cumulative_us in sorted(modules, key=lambda m: -m[2])[:top]:
+            self.stdout.write(f"  {cumulative_us / 1000:9.1f}  {name}")
+
+        self.stdout.write("\nApp ready() hooks (ms)")
+        for label, seconds in sorted(result["ready"].items(), key=lambda item: -item[1])[:top]:
+            self.stdout.write(f"  {seconds * 1000:9.1f}  {label}")
+
+
+def parse_importtime(output):
+    """
+    (module, self µs, cumulative µs) for each line of -X importtime output.
+    """
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return modules
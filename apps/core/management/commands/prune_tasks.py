@@ -0,0 +1,21 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from apps.core.tasks import prune_tasks
+
+
+class Command(BaseCommand):
+    help = "Delete finished tasks of the database task backend."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.TASK_RESULT_RETENTION_DAYS,
+            help="Keep tasks finished more recently than this.",
+        )
+
+    def handle(self, *args, **options):
+        count = prune_tasks(timezone.now() - timedelta(days=options["days"]))
+        self.stdout.write(f"Pruned {count} finished tasks")
@@ -0,0 +1,11 @@
+import time
+from django.core.management.base import BaseCommand
+from apps.core.throttling import prune_throttle_state
+
+
+class Command(BaseCommand):
+    help = "Delete expired throttle state rows."
+
+    def handle(self, *args, **options):
+        count = prune_throttle_state(time.time())
+        self.stdout.write(f"Pruned {count} throttle keys")
@@ -0,0 +1,38 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from apps.core.archive import ARCHIVE_MODELS, restore_archived
+from apps.core.models import ArchivedRecord
+
+
+class Command(BaseCommand):
+    help = "Bring archived rows back into their live tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument("model", choices=ARCHIVE_MODELS)
+        parser.add_argument("ids", nargs="+")
+        parser.add_argument(
+            "--keep-deleted",
+            action="store_true",
+            help="Re-insert the rows but leave them soft-deleted.",
+        )
+
+    def handle(self, *args, **options):
+        label = options["model"].lower()
+
+        for object_id in options["ids"]:
+            try:
+                record = ArchivedRecord.objects.get(
+                    model_label=label, object_id=object_id
+                )
+            except ArchivedRecord.DoesNotExist:
+                raise CommandError(f"{label} #{object_id} is not archived.")
+
+            try:
+                obj = restore_archived(record)
+            except ValidationError as exc:
+                raise CommandError(exc.messages[0])
+
+            if not options["keep_deleted"]:
+                obj.restore()
+
+            self.stdout.write(f"Restored {label} #{object_id}")
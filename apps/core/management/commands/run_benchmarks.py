@@ -0,0 +1,136 @@
+import json
+import platform
+import shutil
+import tempfile
+import time
+from pathlib import Path
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import setup_test_environment, teardown_test_environment
+from apps.core.benchmark import BenchmarkError, compare, run, scenarios, seed, uncovered_routes
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a test database and time every route in-process: p50/p95/p99 "
+        "latency, throughput and queries per request, compared with the "
+        "stored baseline (benchmarks/baseline.json)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=200)
+        parser.add_argument("--posts", type=int, default=500)
+        parser.add_argument("--comments", type=int, default=20, help="Comments per published post.")
+        parser.add_argument("--requests", type=int, default=50, help="Timed requests per scenario.")
+        parser.add_argument("--warmup", type=int, default=5, help="Untimed requests per scenario.")
+        parser.add_argument("--only", help="Run the scenarios whose name contains this text.")
+        parser.add_argument("--baseline", default=str(settings.BASE_DIR / "benchmarks" / "baseline.json"))
+        parser.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline.")
+        parser.add_argument(
+            "--tolerance", type=float, default=0.25,
+            help="p95 growth (fraction) tolerated before a scenario counts as a regression.",
+        )
+        parser.add_argument("--fail-on-regression", action="store_true")
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1:
+            raise CommandError("--requests must be at least 1.")
+
+        # Latencies from another database engine are not comparable
+        path = Path(options["baseline"])
+        if path.exists() and not options["save_baseline"]:
+            recorded = json.loads(path.read_text())["environment"].get("database")
+            if recorded != connection.vendor:
+                raise CommandError(
+                    f"The baseline was recorded on {recorded}, this database is "
+                    f"{connection.vendor}: record one with --save-baseline."
+                )
+
+        # Plain DiscoverRunner: the test runner would fail requests on N+1s
+        setup_test_environment(debug=False)
+        runner = DiscoverRunner(verbosity=0, interactive=False)
+        old_config = runner.setup_databases()
+        scratch = Path(tempfile.mkdtemp())
+        try:
+            # No sampled Server-Timing: every request does the same work
+            with override_settings(
+                SERVER_TIMING_SAMPLE_RATE=0,
+                MEDIA_ROOT=scratch / "media",
+                IMAGE_UPLOAD_SESSION_DIR=str(scratch / "uploads"),
+                METRICS_DIR=str(scratch / "metrics"),
+            ):
+                results = self.benchmark(options)
+            environment = {
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": connection.vendor,
+                **{key: options[key] for key in ("users", "posts", "comments", "requests")},
+            }
+        finally:
+            runner.teardown_databases(old_config)
+            teardown_test_environment()
+            shutil.rmtree(scratch, ignore_errors=True)
+
+        self.report(results, environment, options)
+
+    def benchmark(self, options):
+        start = time.perf_counter()
+        data = seed(options["users"], options["posts"], options["comments"])
+        self.stdout.write(
+            f"Seeded {options['users']} users, {options['posts']} posts, "
+            f"{options['comments']} comments per post in {time.perf_counter() - start:.1f}s"
+        )
+
+        selected = scenarios(data)
+        if options["only"]:
+            selected = [scenario for scenario in selected if options["only"] in scenario.name]
+        else:
+            for route in uncovered_routes(selected):
+                self.stderr.write(f"No scenario for route {route}")
+
+        results = {}
+        for scenario in selected:
+            try:
+                results[scenario.name] = run(scenario, options["requests"], options["warmup"])
+            except BenchmarkError as exc:
+                raise CommandError(str(exc))
+        return results
+
+    def report(self, results, environment, options):
+        path = Path(options["baseline"])
+        baseline = json.loads(path.read_text()) if path.exists() else None
+        notes, regressions = {}, []
+        if baseline is not None:
+            notes, regressions = compare(results, baseline["scenarios"], options["tolerance"])
+            differences = [
+                f"{key} {baseline['environment'].get(key)} -> {value}"
+                for key, value in environment.items()
+                if baseline["environment"].get(key) != value
+            ]
+            if differences:
+                self.stderr.write(f"Baseline recorded with other settings: {', '.join(differences)}")
+
+        self.stdout.write(
+            f"\n{'scenario':<32} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8} {'queries':>8}"
+            + ("   vs baseline" if baseline is not None else "")
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<32} {result['p50']:>8.2f} {result['p95']:>8.2f} {result['p99']:>8.2f} "
+                f"{result['rps']:>8.1f} {result['queries']:>8.2f}   {notes.get(name, '')}".rstrip()
+            )
+
+        if options["save_baseline"]:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps({"environment": environment, "scenarios": results}, indent=2) + "\n")
+            self.stdout.write(f"\nBaseline written to {path}")
+
+        if regressions:
+            message = f"{len(regressions)} scenario(s) regressed: {', '.join(regressions)}"
+            if options["fail_on_regression"]:
+                raise CommandError(message)
+            self.stderr.write(message)
@@ -0,0 +1,98 @@
+import multiprocessing
+import signal
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.tasks import DEFAULT_TASK_BACKEND_ALIAS
+
+# apps.core.tasks is imported lazily: spawned worker processes import
+# this module before django.setup() has loaded the models
+
+
+def _run_worker_process(options):
+    django.setup()
+    _run_worker(options)
+
+
+def _run_worker(options):
+    from apps.core.tasks import Worker
+
+    worker = Worker(**options)
+    previous = {
+        signum: signal.signal(signum, lambda *args: worker.stop())
+        for signum in (signal.SIGINT, signal.SIGTERM)
+    }
+    try:
+        worker.run()
+    finally:
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+
+
+class Command(BaseCommand):
+    help = "Run tasks queued on the database task backend."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--backend",
+            default=DEFAULT_TASK_BACKEND_ALIAS,
+            help="TASKS alias to run (must use apps.core.tasks.DatabaseBackend).",
+        )
+        parser.add_argument(
+            "--queue",
+            action="append",
+            dest="queues",
+            help="Queue to run (repeatable). Defaults to every queue of the backend.",
+        )
+        parser.add_argument("--threads", type=int, default=1, help="Worker threads per process.")
+        parser.add_argument("--processes", type=int, default=1, help="Worker processes.")
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait when no task is ready.",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once no task is ready instead of polling.",
+        )
+
+    def handle(self, *args, **options):
+        from apps.core.tasks import Worker
+
+        worker_options = {
+            "backend": options["backend"],
+            "queues": options["queues"],
+            "threads": options["threads"],
+            "poll_interval": options["poll_interval"],
+            "burst": options["burst"],
+        }
+        try:
+            Worker(**worker_options)
+        except ValueError as exc:
+            raise CommandError(exc)
+
+        if options["processes"] == 1:
+            _run_worker(worker_options)
+            return
+
+        # Connections must not be shared with the child processes
+        connections.close_all()
+        context = multiprocessing.get_context("spawn")
+        processes = [
+            context.Process(target=_run_worker_process, args=(worker_options,))
+            for _ in range(options["processes"])
+        ]
+        for process in processes:
+            process.start()
+
+        # Children stop gracefully on SIGTERM: forward ours
+        def stop(*args):
+            for process in processes:
+                process.terminate()
+
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, stop)
+        for process in processes:
+            process.join()
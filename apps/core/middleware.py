@@ -0,0 +1,355 @@
+import logging
+import mimetypes
+import os
+import random
+import time
+from urllib.parse import quote
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed, SuspiciousFileOperation
+from django.core.handlers.base import BaseHandler
+from django.core.handlers.exception import convert_exception_to_response
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.utils.module_loading import import_string
+from django.views.static import was_modified_since
+from .routers import use_read_alias
+from .storage import BLOB_NAME
+from .timing import collect_timings, current_timings
+
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Content-addressed media never changes under its name
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+timing_logger = logging.getLogger("apps.core.timing")
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Send safe-method requests to the read replica.
+    A client that just wrote is pinned to the primary for
+    PRIMARY_PIN_SECONDS (via a cookie holding the pin expiry), so it
+    reads its own writes despite replication lag.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        with use_read_alias(self.get_read_alias(request)):
+            response = self.get_response(request)
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        with use_read_alias(self.get_read_alias(request)):
+            response = await self.get_response(request)
+        return self.process_response(request, response)
+
+    def process_response(self, request, response):
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            self.pin(response)
+        return response
+
+    def get_read_alias(self, request):
+        if not settings.READ_REPLICA or request.method not in SAFE_METHODS:
+            return None
+        if self.is_pinned(request):
+            return None
+        return settings.READ_REPLICA
+
+    def is_pinned(self, request):
+        try:
+            pinned_until = float(request.COOKIES.get(settings.PRIMARY_PIN_COOKIE, 0))
+        except ValueError:
+            return False
+        return pinned_until > time.time()
+
+    def pin(self, response):
+        seconds = settings.PRIMARY_PIN_SECONDS
+        response.set_cookie(
+            settings.PRIMARY_PIN_COOKIE,
+            str(time.time() + seconds),
+            max_age=seconds,
+            httponly=True,
+            samesite="Lax",
+        )
+
+
+class MediaMiddleware:
+    """
+    Answer MEDIA_URL requests (Post.image files) before the rest of the
+    middleware stack and URL resolution run.
+    With MEDIA_ACCEL_REDIRECT set, nginx sends the bytes from an
+    internal location (X-Accel-Redirect); otherwise the file is streamed
+    with FileResponse, which uses sendfile where the server supports it.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        if request.path.startswith(settings.MEDIA_URL):
+            return self.serve(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        if request.path.startswith(settings.MEDIA_URL):
+            return self.serve(request)
+        return await self.get_response(request)
+
+    def serve(self, request):
+        if request.method not in ("GET", "HEAD"):
+            return HttpResponse(status=405, headers={"Allow": "GET, HEAD"})
+
+        path = request.path[len(settings.MEDIA_URL):]
+        try:
+            full_path = safe_join(settings.MEDIA_ROOT, path)
+            stat = os.stat(full_path)
+        except (SuspiciousFileOperation, OSError):
+            return HttpResponse(status=404)
+
+        if not os.path.isfile(full_path):
+            return HttpResponse(status=404)
+
+        if not was_modified_since(request.META.get("HTTP_IF_MODIFIED_SINCE"), stat.st_mtime):
+            response = HttpResponseNotModified()
+        elif settings.MEDIA_ACCEL_REDIRECT:
+            content_type, _ = mimetypes.guess_type(full_path)
+            response = HttpResponse(content_type=content_type or "application/octet-stream")
+            response["X-Accel-Redirect"] = settings.MEDIA_ACCEL_REDIRECT + quote(path)
+        else:
+            response = FileResponse(open(full_path, "rb"))
+
+        response["Last-Modified"] = http_date(stat.st_mtime)
+        if BLOB_NAME.search(path):
+            response["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        else:
+            response["Cache-Control"] = f"public, max-age={settings.MEDIA_MAX_AGE}"
+        return response
+
+
+class ServerTimingMiddleware:
+    """
+    Time a sample of requests (SERVER_TIMING_SAMPLE_RATE): SQL query
+    count and time, pagination, serialization, rendering and the total,
+    sent as a Server-Timing header (SERVER_TIMING_HEADER) and logged
+    as one line per request on the "apps.core.timing" logger.
+    Unsampled requests cost one random() call, plus one context
+    variable lookup per query and per timed() block.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+            # Async hook, so the handler does not adapt it to a thread
+            self.process_template_response = self._aprocess_template_response
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        if random.random() >= settings.SERVER_TIMING_SAMPLE_RATE:
+            return self.get_response(request)
+        with collect_timings() as timings:
+            start = time.perf_counter()
+            response = self.get_response(request)
+        return self.report(request, response, timings, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        if random.random() >= settings.SERVER_TIMING_SAMPLE_RATE:
+            return await self.get_response(request)
+        with collect_timings() as timings:
+            start = time.perf_counter()
+            response = await self.get_response(request)
+        return self.report(request, response, timings, time.perf_counter() - start)
+
+    def process_template_response(self, request, response):
+        return self.time_render(response)
+
+    async def _aprocess_template_response(self, request, response):
+        return self.time_render(response)
+
+    def time_render(self, response):
+        # Called right before the handler renders the (DRF) response
+        timings = current_timings()
+        if timings is not None:
+            start = time.perf_counter()
+            response.add_post_render_callback(
+                lambda rendered: timings.add("render", time.perf_counter() - start)
+            )
+        return response
+
+    def report(self, request, response, timings, total):
+        milliseconds = {name: seconds * 1000 for name, seconds in timings.durations.items()}
+        db = milliseconds.pop("db", 0.0)
+        milliseconds["total"] = total * 1000
+
+        if settings.SERVER_TIMING_HEADER:
+            response["Server-Timing"] = ", ".join(
+                [f'db;dur={db:.1f};desc="{timings.queries} queries"']
+                + [f"{name};dur={value:.1f}" for name, value in milliseconds.items()]
+            )
+
+        timing_logger.info(
+            "method=%s path=%s status=%s queries=%d db_ms=%.1f %s",
+            request.method,
+            request.path,
+            response.status_code,
+            timings.queries,
+            db,
+            " ".join(f"{name}_ms={value:.1f}" for name, value in milliseconds.items()),
+            extra={"queries": timings.queries, "timings_ms": {"db": db, **milliseconds}},
+        )
+        return response
+
+
+class PathMiddlewareDispatcher:
+    """
+    Run the rest of the middleware per URL prefix: MIDDLEWARE_BY_PATH is
+    a list of (prefix, middleware paths), the first matching prefix of
+    request.path_info wins and no match runs no further middleware.
+    The JWT API skips the session, CSRF, auth and messages middleware
+    that only the admin and the docs need.
+
+    Must be last in MIDDLEWARE. process_view, process_template_response
+    and process_exception of the scoped middleware are forwarded.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+            # Async hooks, so the handler does not adapt them to threads
+            self.process_view = self._aprocess_view
+            self.process_template_response = self._aprocess_template_response
+
+        self.scopes = [
+            (prefix, MiddlewareChain(middleware, get_response, self.async_mode))
+            for prefix, middleware in settings.MIDDLEWARE_BY_PATH
+        ]
+        self.no_middleware = MiddlewareChain([], get_response, self.async_mode)
+
+    def chain_for(self, request):
+        try:
+            return request._middleware_chain
+        except AttributeError:
+            pass
+        chain = self.no_middleware
+        for prefix, scope_chain in self.scopes:
+            if request.path_info.startswith(prefix):
+                chain = scope_chain
+                break
+        request._middleware_chain = chain
+        return chain
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.chain_for(request).handler(request)
+
+    async def __acall__(self, request):
+        return await self.chain_for(request).handler(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        for hook in self.chain_for(request).view_middleware:
+            response = hook(request, view_func, view_args, view_kwargs)
+            if response is not None:
+                return response
+        return None
+
+    async def _aprocess_view(self, request, view_func, view_args, view_kwargs):
+        for hook in self.chain_for(request).view_middleware:
+            response = await hook(request, view_func, view_args, view_kwargs)
+            if response is not None:
+                return response
+        return None
+
+    def process_template_response(self, request, response):
+        for hook in self.chain_for(request).template_response_middleware:
+            response = hook(request, response)
+        return response
+
+    async def _aprocess_template_response(self, request, response):
+        for hook in self.chain_for(request).template_response_middleware:
+            response = await hook(request, response)
+        return response
+
+    def process_exception(self, request, exception):
+        for hook in self.chain_for(request).exception_middleware:
+            response = hook(request, exception)
+            if response is not None:
+                return response
+        return None
+
+
+class MiddlewareChain:
+    """
+    `middleware_paths` wrapped around `get_response`, built and adapted
+    to sync/async like BaseHandler.load_middleware does for MIDDLEWARE.
+    """
+
+    def __init__(self, middleware_paths, get_response, is_async):
+        adapt = BaseHandler().adapt_method_mode
+        self.view_middleware = []
+        self.template_response_middleware = []
+        self.exception_middleware = []
+
+        handler = get_response
+        handler_is_async = is_async
+        for middleware_path in reversed(middleware_paths):
+            middleware = import_string(middleware_path)
+            if not handler_is_async and getattr(middleware, "sync_capable", True):
+                middleware_is_async = False
+            else:
+                middleware_is_async = getattr(middleware, "async_capable", False)
+            try:
+                adapted_handler = adapt(middleware_is_async, handler, handler_is_async)
+                instance = middleware(adapted_handler)
+            except MiddlewareNotUsed:
+                continue
+            if instance is None:
+                raise ImproperlyConfigured(f"Middleware factory {middleware_path} returned None.")
+
+            if hasattr(instance, "process_view"):
+                self.view_middleware.insert(0, adapt(is_async, instance.process_view))
+            if hasattr(instance, "process_template_response"):
+                self.template_response_middleware.append(
+                    adapt(is_async, instance.process_template_response)
+                )
+            if hasattr(instance, "process_exception"):
+                self.exception_middleware.append(adapt(False, instance.process_exception))
+
+            handler = convert_exception_to_response(instance)
+            handler_is_async = middleware_is_async
+
+        self.handler = adapt(is_async, handler, handler_is_async)
@@ -0,0 +1,39 @@
+# Generated by Django 6.0 on 2026-10-19 03:48
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_mediablob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueuedTask',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('backend', models.CharField(max_length=32)),
+                ('queue_name', models.CharField(max_length=32)),
+                ('priority', models.SmallIntegerField(default=0)),
+                ('task_path', models.CharField(max_length=255)),
+                ('args', models.JSONField(default=list)),
+                ('kwargs', models.JSONField(default=dict)),
+                ('status', models.CharField(choices=[('READY', 'Ready'), ('RUNNING', 'Running'), ('FAILED', 'Failed'), ('SUCCESSFUL', 'Successful')], default='READY', max_length=10)),
+                ('run_after', models.DateTimeField()),
+                ('enqueued_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('last_attempted_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('worker_ids', models.JSONField(default=list)),
+                ('errors', models.JSONField(default=list)),
+                ('return_value', models.JSONField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ('enqueued_at',),
+                'indexes': [models.Index(condition=models.Q(('status', 'READY')), fields=['backend', 'queue_name', '-priority', 'run_after'], name='queuedtask_ready_idx'), models.Index(fields=['status', 'finished_at'], name='queuedtask_finished_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-19 04:52
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_queuedtask'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediablob',
+            name='last_uploaded_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
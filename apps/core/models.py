@@ -0,0 +1,111 @@
+import uuid
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.tasks import TaskResultStatus
+from django.utils import timezone
+
+
+class ArchivedRecord(models.Model):
+    """
+    A soft-deleted row moved out of its live table by `archive_deleted`.
+    `payload` uses the Django "python" serializer layout, so the row can
+    be re-inserted with the same primary key.
+    """
+
+    model_label = models.CharField(max_length=100)
+    object_id = models.CharField(max_length=64)
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    deleted_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ("id",)
+        constraints = [
+            models.UniqueConstraint(
+                fields=["model_label", "object_id"],
+                name="unique_archived_record",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.model_label} #{self.object_id}"
+
+
+class ThrottleState(models.Model):
+    """
+    GCRA state of one throttle key: its theoretical arrival time.
+    Constant size per key, shared by every worker process.
+    """
+
+    key = models.CharField(max_length=255, primary_key=True)
+    tat = models.FloatField()
+
+    def __str__(self):
+        return self.key
+
+
+class MediaBlob(models.Model):
+    """
+    A file stored by ContentAddressedStorage. `uploads` counts the saves
+    that resolved to it (deduplicated re-uploads included), the latest
+    at `last_uploaded_at`, which starts the gc_media_blobs grace period.
+    """
+
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField()
+    uploads = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_uploaded_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ("id",)
+
+    def __str__(self):
+        return self.name
+
+
+class QueuedTask(models.Model):
+    """
+    A django.tasks task enqueued on the database backend
+    (apps.core.tasks.DatabaseBackend) and run by `run_task_worker`.
+    Failed attempts are retried with exponential backoff by moving
+    `run_after` forward.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    backend = models.CharField(max_length=32)
+    queue_name = models.CharField(max_length=32)
+    priority = models.SmallIntegerField(default=0)
+    task_path = models.CharField(max_length=255)
+    args = models.JSONField(default=list)
+    kwargs = models.JSONField(default=dict)
+
+    status = models.CharField(
+        max_length=10,
+        choices=TaskResultStatus.choices,
+        default=TaskResultStatus.READY
+    )
+    run_after = models.DateTimeField()
+    enqueued_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    last_attempted_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    worker_ids = models.JSONField(default=list)
+    errors = models.JSONField(default=list)
+    return_value = models.JSONField(null=True, blank=True)
+
+    class Meta:
+        ordering = ("enqueued_at",)
+        indexes = [
+            # Claim query: ready rows of a queue, highest priority first
+            models.Index(
+                fields=["backend", "queue_name", "-priority", "run_after"],
+                condition=models.Q(status=TaskResultStatus.READY),
+                name="queuedtask_ready_idx",
+            ),
+            models.Index(fields=["status", "finished_at"], name="queuedtask_finished_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.task_path} ({self.status})"
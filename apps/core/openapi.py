@@ -0,0 +1,21 @@
+from drf_spectacular.generators import SchemaGenerator as BaseSchemaGenerator
+from drf_spectacular.renderers import OpenApiYamlRenderer
+
+# OpenAPI extensions register themselves on import. They are imported
+# here, by the generator, so that serving requests never loads them
+import apps.users.schema  # noqa: F401
+
+
+class SchemaGenerator(BaseSchemaGenerator):
+    """
+    drf-spectacular's generator, with the project's extensions loaded.
+    """
+
+
+def generate_schema():
+    """
+    The schema of the live code as YAML, exactly as
+    `manage.py spectacular` writes it.
+    """
+    schema = SchemaGenerator().get_schema(request=None, public=True)
+    return OpenApiYamlRenderer().render(schema, renderer_context={})
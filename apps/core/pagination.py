@@ -0,0 +1,17 @@
+from rest_framework import pagination
+from .timing import timed
+
+
+class PageNumberPagination(pagination.PageNumberPagination):
+    """
+    Base of the API paginators: DRF's PageNumberPagination, with the
+    count and page queries timed as the "paginate" phase.
+    """
+
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 50
+
+    def paginate_queryset(self, queryset, request, view=None):
+        with timed("paginate"):
+            return super().paginate_queryset(queryset, request, view)
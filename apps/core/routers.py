@@ -0,0 +1,50 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+# Alias reads should use for the current request (None: primary).
+# Set by apps.core.middleware.ReplicaRoutingMiddleware.
+_read_alias = ContextVar("read_alias", default=None)
+
+
+def get_read_alias():
+    return _read_alias.get()
+
+
+@contextmanager
+def use_read_alias(alias):
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Reads go to the alias chosen for the current request, writes always
+    go to the primary. Every queryset is routed here, including the ones
+    behind serializer relation fields and filtersets.
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = get_read_alias()
+
+        # Inside a transaction on the primary, read what it just wrote
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == settings.READ_REPLICA:
+            return False
+        return None
@@ -0,0 +1,20 @@
+import hashlib
+import json
+from functools import lru_cache
+import yaml
+
+
+@lru_cache(maxsize=None)
+def load_schema(path):
+    """
+    The pre-generated schema at `path`, read once per process.
+    Returns {"yaml": bytes, "json": bytes, "etag": str}.
+    """
+    with open(path, "rb") as schema_file:
+        yaml_body = schema_file.read()
+
+    json_body = json.dumps(
+        yaml.safe_load(yaml_body), ensure_ascii=False, separators=(",", ":")
+    ).encode()
+    digest = hashlib.sha256(yaml_body).hexdigest()[:32]
+    return {"yaml": yaml_body, "json": json_body, "etag": digest}
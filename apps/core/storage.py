@@ -0,0 +1,171 @@
+import hashlib
+import os
+import posixpath
+import re
+from collections import defaultdict
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import models, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+
+# <dir>/ab/cd/abcd<60 more hex digits><ext>: the name fixes the content
+BLOB_NAME = re.compile(r"(?:^|/)([0-9a-f]{2})/([0-9a-f]{2})/\1\2[0-9a-f]{60}(?:\.\w+)?$")
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    FileSystemStorage that names files by the SHA-256 of their content,
+    sharded as <upload dir>/ab/cd/<digest><ext>.
+    Saving content that is already stored returns the existing name
+    without writing. Blobs can be shared, so delete() is a no-op:
+    unreferenced blobs are removed by `manage.py gc_media_blobs`.
+    """
+
+    def _save(self, name, content):
+        from .models import MediaBlob  #local import - Avoid Circular Import
+
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        digest = digest.hexdigest()
+
+        directory, filename = posixpath.split(name)
+        ext = os.path.splitext(filename)[1].lower()
+        name = posixpath.join(directory, digest[:2], digest[2:4], digest + ext)
+
+        # Row first: gc_blobs locks the row before removing the file, so
+        # a blob matched here is not collected within the grace period
+        if self._reuploaded(name):
+            return name
+
+        if not self.exists(name):
+            saved = super()._save(name, content)
+            if saved != name:
+                # Lost a race with an identical upload: keep the first copy
+                super().delete(saved)
+
+        blob, created = MediaBlob.objects.get_or_create(
+            name=name,
+            defaults={"size": content.size},
+        )
+        if not created:
+            self._reuploaded(name)
+        return name
+
+    def _reuploaded(self, name):
+        from .models import MediaBlob  #local import - Avoid Circular Import
+
+        return MediaBlob.objects.filter(name=name).update(
+            uploads=models.F("uploads") + 1,
+            last_uploaded_at=timezone.now(),
+        )
+
+    def delete(self, name):
+        pass
+
+    def purge(self, name):
+        super().delete(name)
+
+
+def content_addressed_fields():
+    """
+    (model, field) pairs of every FileField stored content-addressed.
+    """
+    for model in apps.get_models():
+        for field in model._meta.concrete_fields:
+            if isinstance(field, models.FileField) and isinstance(field.storage, ContentAddressedStorage):
+                yield model, field
+
+
+def referenced_blob_names(names=None):
+    """
+    Blob names still referenced by any row, soft-deleted rows and
+    archived (restorable) rows included, plus MEDIA_BLOB_REFERENCES.
+    With `names`, only those of them that are referenced.
+    """
+    from .models import ArchivedRecord  #local import - Avoid Circular Import
+
+    referenced = set()
+    dependent_fields = defaultdict(list)
+    for model, field in content_addressed_fields():
+        dependent_fields[model._meta.label_lower].append(field.name)
+        rows = model._base_manager.exclude(**{field.attname: ""}).exclude(
+            **{f"{field.attname}__isnull": True}
+        )
+        archived = ArchivedRecord.objects.filter(model_label=model._meta.label_lower)
+        if names is not None:
+            rows = rows.filter(**{f"{field.attname}__in": names})
+            archived = archived.filter(**{f"payload__fields__{field.name}__in": names})
+
+        referenced.update(rows.values_list(field.attname, flat=True).iterator())
+        archived = archived.values_list(f"payload__fields__{field.name}", flat=True)
+        referenced.update(name for name in archived.iterator() if name)
+
+    # Rows archived as dependents of another row (e.g. a user's uploads)
+    dependents = ArchivedRecord.objects.filter(payload__has_key="dependents").values_list(
+        "payload__dependents", flat=True
+    )
+    for rows in dependents.iterator():
+        for row in rows or ():
+            for name in dependent_fields.get(row["model"], ()):
+                if row["fields"].get(name):
+                    referenced.add(row["fields"][name])
+
+    for path in settings.MEDIA_BLOB_REFERENCES:
+        referenced.update(import_string(path)())
+
+    if names is not None:
+        referenced.intersection_update(names)
+    return referenced
+
+
+def gc_blobs(cutoff, dry_run=False, batch_size=1000):
+    """
+    Remove blobs last uploaded before `cutoff` that nothing references.
+    Returns (count, bytes) removed, or that would be with dry_run.
+    """
+    from .models import MediaBlob  #local import - Avoid Circular Import
+
+    referenced = referenced_blob_names()
+    count = size = 0
+    last_id = 0
+
+    while True:
+        batch = list(
+            MediaBlob.objects.filter(id__gt=last_id, last_uploaded_at__lt=cutoff)
+            .order_by("id")[:batch_size]
+        )
+        if not batch:
+            break
+        last_id = batch[-1].id
+
+        unused = [blob for blob in batch if blob.name not in referenced]
+        if not unused:
+            continue
+        if dry_run:
+            count += len(unused)
+            size += sum(blob.size for blob in unused)
+            continue
+
+        with transaction.atomic():
+            # Locked and re-checked: the references above may be stale, and
+            # a re-upload of a locked blob waits, then stores it again
+            unused = list(
+                MediaBlob.objects.select_for_update()
+                .filter(pk__in=[blob.pk for blob in unused], last_uploaded_at__lt=cutoff)
+                .order_by("id")
+            )
+            still_referenced = referenced_blob_names([blob.name for blob in unused])
+            unused = [blob for blob in unused if blob.name not in still_referenced]
+
+            for blob in unused:
+                default_storage.purge(blob.name)
+            MediaBlob.objects.filter(pk__in=[blob.pk for blob in unused]).delete()
+
+        count += len(unused)
+        size += sum(blob.size for blob in unused)
+
+    return count, size
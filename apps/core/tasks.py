@@ -0,0 +1,284 @@
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import timedelta
+from traceback import format_exception
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, close_old_connections, connection, connections, transaction
+from django.tasks import TaskContext, TaskResult, TaskResultStatus, task_backends
+from django.tasks.backends.base import BaseTaskBackend
+from django.tasks.base import TaskError
+from django.tasks.exceptions import TaskResultDoesNotExist
+from django.tasks.signals import task_enqueued, task_finished, task_started
+from django.utils import timezone
+from django.utils.json import normalize_json
+from django.utils.module_loading import import_string
+from .models import QueuedTask
+
+
+logger = logging.getLogger(__name__)
+
+
+class DatabaseBackend(BaseTaskBackend):
+    """
+    django.tasks backend storing tasks in core.QueuedTask.
+    Enqueueing is one INSERT in the caller's transaction, so workers
+    only see a task once the enqueueing transaction has committed.
+
+    OPTIONS:
+        MAX_ATTEMPTS   runs before a task is marked FAILED (default 3)
+        RETRY_BACKOFF  seconds before the first retry, doubled for each
+                       further attempt (default 10)
+        STALE_AFTER    seconds after which a RUNNING task whose worker
+                       died is made READY again (default 3600)
+    """
+
+    supports_defer = True
+    supports_async_task = True
+    supports_get_result = True
+    supports_priority = True
+
+    def __init__(self, alias, params):
+        super().__init__(alias, params)
+        self.max_attempts = self.options.get("MAX_ATTEMPTS", 3)
+        self.retry_backoff = self.options.get("RETRY_BACKOFF", 10)
+        self.stale_after = self.options.get("STALE_AFTER", 3600)
+
+    def enqueue(self, task, args, kwargs):
+        self.validate_task(task)
+
+        row = QueuedTask.objects.create(
+            backend=self.alias,
+            queue_name=task.queue_name,
+            priority=task.priority,
+            task_path=task.module_path,
+            args=normalize_json(args),
+            kwargs=normalize_json(kwargs),
+            run_after=task.run_after or timezone.now(),
+        )
+        result = self.to_result(row, task)
+        task_enqueued.send(type(self), task_result=result)
+        return result
+
+    def get_result(self, result_id):
+        try:
+            row = QueuedTask.objects.get(pk=result_id, backend=self.alias)
+        except (QueuedTask.DoesNotExist, ValidationError):
+            raise TaskResultDoesNotExist(result_id) from None
+        return self.to_result(row)
+
+    def to_result(self, row, task=None):
+        task = (task or import_string(row.task_path)).using(
+            priority=row.priority,
+            queue_name=row.queue_name,
+            backend=row.backend,
+        )
+        result = TaskResult(
+            task=task,
+            id=str(row.pk),
+            status=row.status,
+            enqueued_at=row.enqueued_at,
+            started_at=row.started_at,
+            finished_at=row.finished_at,
+            last_attempted_at=row.last_attempted_at,
+            args=row.args,
+            kwargs=row.kwargs,
+            backend=row.backend,
+            errors=[TaskError(**error) for error in row.errors],
+            worker_ids=list(row.worker_ids),
+        )
+        if row.status == TaskResultStatus.SUCCESSFUL:
+            object.__setattr__(result, "_return_value", row.return_value)
+        return result
+
+    def retry_delay(self, attempts):
+        return timedelta(seconds=self.retry_backoff * 2 ** (attempts - 1))
+
+
+class Worker:
+    """
+    Runs tasks of a DatabaseBackend in `threads` threads. Each thread
+    claims one READY task at a time, highest priority first, with
+    SELECT ... FOR UPDATE SKIP LOCKED, so any number of workers (threads,
+    processes or hosts) can poll the same table without blocking each
+    other or running a task twice.
+    With `burst`, a thread exits as soon as nothing is ready.
+    """
+
+    def __init__(self, backend="default", queues=None, threads=1, poll_interval=1.0, burst=False):
+        self.backend = task_backends[backend]
+        if not isinstance(self.backend, DatabaseBackend):
+            raise ValueError(f"Task backend '{backend}' is not a DatabaseBackend.")
+
+        self.queues = sorted(queues or self.backend.queues)
+        self.threads = threads
+        self.poll_interval = poll_interval
+        self.burst = burst
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.stopping = threading.Event()
+        # Stale tasks are looked for at start, then this often (seconds)
+        self.requeue_interval = max(poll_interval, self.backend.stale_after / 4)
+        self._requeue_lock = threading.Lock()
+        self._requeue_at = 0.0
+
+    def stop(self):
+        """
+        Finish the running tasks, then exit.
+        """
+        self.stopping.set()
+
+    def run(self):
+        if self.threads == 1:
+            self._loop()
+            return
+
+        threads = [
+            threading.Thread(target=self._thread_main, name=f"task-worker-{i}")
+            for i in range(self.threads)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def _thread_main(self):
+        try:
+            self._loop()
+        finally:
+            # Connections are per thread, so this closes only this thread's connections
+            connections.close_all()
+
+    def _loop(self):
+        while not self.stopping.is_set():
+            _close_old_connections()
+            try:
+                self._requeue_stale_when_due()
+                row = self.claim()
+            except DatabaseError:
+                logger.exception("Claiming a task failed")
+                self.stopping.wait(self.poll_interval)
+                continue
+            if row is None:
+                if self.burst:
+                    return
+                self.stopping.wait(self.poll_interval)
+                continue
+            self.execute(row)
+
+    def _requeue_stale_when_due(self):
+        # Shared by the threads: one of them requeues per interval
+        with self._requeue_lock:
+            now = time.monotonic()
+            if now < self._requeue_at:
+                return
+            self._requeue_at = now + self.requeue_interval
+        self.requeue_stale()
+
+    def requeue_stale(self):
+        """
+        Make READY again tasks left RUNNING by a worker that died.
+        """
+        now = timezone.now()
+        return QueuedTask.objects.filter(
+            backend=self.backend.alias,
+            status=TaskResultStatus.RUNNING,
+            last_attempted_at__lt=now - timedelta(seconds=self.backend.stale_after),
+        ).update(status=TaskResultStatus.READY, run_after=now)
+
+    def claim(self):
+        now = timezone.now()
+        with transaction.atomic():
+            row = (
+                QueuedTask.objects.select_for_update(skip_locked=True)
+                .filter(
+                    backend=self.backend.alias,
+                    queue_name__in=self.queues,
+                    status=TaskResultStatus.READY,
+                    run_after__lte=now,
+                )
+                .order_by("-priority", "run_after")
+                .first()
+            )
+            if row is None:
+                return None
+
+            row.status = TaskResultStatus.RUNNING
+            row.started_at = row.started_at or now
+            row.last_attempted_at = now
+            row.worker_ids = row.worker_ids + [f"{self.worker_id}:{threading.current_thread().name}"]
+            row.save(update_fields=["status", "started_at", "last_attempted_at", "worker_ids"])
+        return row
+
+    def execute(self, row):
+        task = None
+        try:
+            task = import_string(row.task_path)
+            result = self.backend.to_result(row, task)
+            task_started.send(type(self.backend), task_result=result)
+
+            if task.takes_context:
+                value = task.call(TaskContext(task_result=result), *row.args, **row.kwargs)
+            else:
+                value = task.call(*row.args, **row.kwargs)
+            return_value = normalize_json(value)
+        except KeyboardInterrupt:
+            raise
+        except BaseException as exc:
+            self._failed(row, task, exc)
+            return
+
+        row.status = TaskResultStatus.SUCCESSFUL
+        row.finished_at = timezone.now()
+        row.return_value = return_value
+        row.save(update_fields=["status", "finished_at", "return_value"])
+        task_finished.send(type(self.backend), task_result=self.backend.to_result(row, task))
+
+    def _failed(self, row, task, exc):
+        # Called from the except block: task_finished logs the traceback
+        now = timezone.now()
+        error_class = type(exc)
+        row.errors = row.errors + [{
+            "exception_class_path": f"{error_class.__module__}.{error_class.__qualname__}",
+            "traceback": "".join(format_exception(exc)),
+        }]
+
+        attempts = len(row.worker_ids)
+        if task is not None and attempts < self.backend.max_attempts:
+            row.status = TaskResultStatus.READY
+            row.run_after = now + self.backend.retry_delay(attempts)
+            logger.warning(
+                "Task id=%s path=%s failed (attempt %s), retrying after %s",
+                row.pk, row.task_path, attempts, row.run_after,
+            )
+        else:
+            row.status = TaskResultStatus.FAILED
+            row.finished_at = now
+
+        # A failed task may have left the connection unusable
+        _close_old_connections()
+        row.save(update_fields=["errors", "status", "run_after", "finished_at"])
+
+        if row.status == TaskResultStatus.FAILED:
+            if task is None:
+                logger.error("Task id=%s path=%s could not be loaded", row.pk, row.task_path, exc_info=exc)
+            else:
+                task_finished.send(type(self.backend), task_result=self.backend.to_result(row, task))
+
+
+def _close_old_connections():
+    # Not inside an atomic block, e.g. a worker run from a test case
+    if not connection.in_atomic_block:
+        close_old_connections()
+
+
+def prune_tasks(cutoff):
+    """
+    Delete finished tasks (successful or failed) older than `cutoff`.
+    """
+    deleted, _ = QueuedTask.objects.filter(
+        status__in=[TaskResultStatus.SUCCESSFUL, TaskResultStatus.FAILED],
+        finished_at__lt=cutoff,
+    ).delete()
+    return deleted
@@ -0,0 +1,580 @@
+import json
+import subprocess
+import sys
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+from datetime import timedelta
+from importlib import import_module
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth.models import AnonymousUser
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import CommandError, call_command
+from django.http import HttpResponse
+from django.tasks import TaskResultStatus, task
+from django.test import Client, SimpleTestCase, TestCase, RequestFactory, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+from apps.users.models import AuthorStats, RevokedToken, User
+from apps.tags.models import Tag
+from apps.posts.models import Post
+from apps.comments.models import Comment
+from . import benchmark, storage
+from .archive import restore_archived
+from .checks import check_shared_cache
+from .middleware import ReplicaRoutingMiddleware
+from .models import ArchivedRecord, MediaBlob, QueuedTask, ThrottleState
+from .routers import ReplicaRouter
+from .throttling import AnonRateThrottle
+from .storage import gc_blobs
+from .tasks import Worker
+from .schema import load_schema
+from .views import OpenAPISchemaView, pool_stats
+
+
+class ArchiveDeletedTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="author", email="author@example.com", password="Newx123!"
+        )
+        self.tag = Tag.objects.create(name="Django", slug="django")
+        self.post = Post.objects.create(title="Old", content="...", author=self.user)
+        self.post.tags.add(self.tag)
+        self.comment = Comment.objects.create(
+            post=self.post, author=self.user, content="hi"
+        )
+        self.reply = Comment.objects.create(
+            post=self.post, author=self.user, content="re", parent=self.comment
+        )
+
+        self.post.soft_delete()
+        Post.all_objects.update(deleted_at=timezone.now() - timedelta(days=40))
+        Comment.all_objects.update(deleted_at=timezone.now() - timedelta(days=40))
+
+    def test_archive_moves_old_rows_out_of_live_tables(self):
+        call_command("archive_deleted", days=30, stdout=StringIO())
+
+        self.assertFalse(Post.all_objects.exists())
+        self.assertFalse(Comment.all_objects.exists())
+        self.assertEqual(ArchivedRecord.objects.count(), 3)
+        # Referenced by nothing deleted, but still live
+        self.assertTrue(Tag.objects.filter(pk=self.tag.pk).exists())
+        self.assertTrue(User.objects.filter(pk=self.user.pk).exists())
+
+    def test_recent_rows_are_kept(self):
+        call_command("archive_deleted", days=60, stdout=StringIO())
+
+        self.assertTrue(Post.all_objects.exists())
+        self.assertFalse(ArchivedRecord.objects.exists())
+
+    def test_restore_brings_post_comments_and_tags_back(self):
+        call_command("archive_deleted", days=30, stdout=StringIO())
+
+        record = ArchivedRecord.objects.get(model_label="posts.post")
+        restore_archived(record).restore()
+
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual(list(post.tags.all()), [self.tag])
+        self.assertEqual(Comment.objects.filter(post=post).count(), 2)
+        self.assertFalse(ArchivedRecord.objects.exists())
+
+    def test_user_with_posts_and_revoked_tokens_round_trips(self):
+        created = Tag.objects.create(name="Python", slug="python", created_by=self.user)
+        self.user.soft_delete()
+        User.all_objects.filter(pk=self.user.pk).update(
+            deleted_at=timezone.now() - timedelta(days=40)
+        )
+        self.assertEqual(RevokedToken.objects.filter(user=self.user).count(), 1)
+
+        call_command("archive_deleted", days=30, stdout=StringIO())
+
+        # Archived despite the live tag it created
+        self.assertFalse(User.all_objects.filter(pk=self.user.pk).exists())
+        self.assertFalse(RevokedToken.objects.exists())
+        self.assertFalse(AuthorStats.objects.exists())
+        created.refresh_from_db()
+        self.assertIsNone(created.created_by_id)
+
+        # The post brings its author back first
+        restore_archived(ArchivedRecord.objects.get(model_label="posts.post"))
+
+        self.assertTrue(User.all_objects.get(pk=self.user.pk).is_deleted)
+        self.assertEqual(RevokedToken.objects.filter(user=self.user).count(), 1)
+        self.assertTrue(AuthorStats.objects.filter(user=self.user).exists())
+        created.refresh_from_db()
+        self.assertEqual(created.created_by_id, self.user.pk)
+
+    def test_purge_deletes_without_archiving(self):
+        call_command("archive_deleted", days=30, purge=True, stdout=StringIO())
+
+        self.assertFalse(Post.all_objects.exists())
+        self.assertFalse(ArchivedRecord.objects.exists())
+
+
+class GCRARateThrottleTests(TestCase):
+    def make_throttle(self, now):
+        throttle = AnonRateThrottle()
+        throttle.rate = "2/min"
+        throttle.num_requests, throttle.duration = 2, 60
+        throttle.timer = lambda: now
+        return throttle
+
+    def test_limit_is_shared_between_instances(self):
+        request = RequestFactory().get("/api/posts/", REMOTE_ADDR="10.0.0.1")
+        request.user = AnonymousUser()
+
+        self.assertTrue(self.make_throttle(1000).allow_request(request, None))
+        self.assertTrue(self.make_throttle(1000).allow_request(request, None))
+
+        throttle = self.make_throttle(1000)
+        self.assertFalse(throttle.allow_request(request, None))
+        self.assertEqual(throttle.wait(), 30)
+
+        # One emission interval later a request is allowed again
+        self.assertTrue(self.make_throttle(1030).allow_request(request, None))
+        self.assertEqual(ThrottleState.objects.count(), 1)
+
+
+@override_settings(READ_REPLICA="replica")
+class ReplicaRoutingTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.middleware = ReplicaRoutingMiddleware(self.read_alias)
+
+    def read_alias(self, request):
+        response = HttpResponse()
+        response.alias = ReplicaRouter().db_for_read(Post)
+        return response
+
+    def test_safe_requests_read_from_replica(self):
+        response = self.middleware(self.factory.get("/api/posts/"))
+
+        self.assertEqual(response.alias, "replica")
+        self.assertEqual(ReplicaRouter().db_for_read(Post), "default")
+
+    def test_writes_pin_client_to_primary(self):
+        response = self.middleware(self.factory.post("/api/posts/"))
+        self.assertEqual(response.alias, "default")
+
+        pin = response.cookies["primary_pin"].value
+        request = self.factory.get("/api/posts/")
+        request.COOKIES["primary_pin"] = pin
+
+        self.assertEqual(self.middleware(request).alias, "default")
+
+    @override_settings(READ_REPLICA=None)
+    def test_without_replica_everything_reads_primary(self):
+        response = self.middleware(self.factory.get("/api/posts/"))
+
+        self.assertEqual(response.alias, "default")
+
+
+class DatabasePoolStatsTests(TestCase):
+    url = "/api/core/db-pool/"
+
+    def test_staff_only(self):
+        user = User.objects.create_user(
+            username="user", email="user@example.com", password="Newx123!"
+        )
+        token = AccessToken.for_user(user)
+
+        response = self.client.get(self.url, HTTP_AUTHORIZATION=f"Bearer {token}")
+        self.assertEqual(response.status_code, 403)
+
+    def test_reports_checkout_latency(self):
+        connection = mock.Mock()
+        connection.pool.get_stats.return_value = {
+            "pool_size": 4,
+            "pool_available": 1,
+            "requests_num": 4,
+            "requests_wait_ms": 10,
+            "requests_errors": 1,
+        }
+
+        stats = pool_stats(connection)
+
+        self.assertEqual(stats["size"], 4)
+        self.assertEqual(stats["avg_checkout_wait_ms"], 2.5)
+        self.assertEqual(stats["request_errors"], 1)
+
+
+class MediaMiddlewareTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        (Path(media_root.name) / "posts").mkdir()
+        (Path(media_root.name) / "posts" / "a.png").write_bytes(b"png")
+
+        override = self.settings(MEDIA_ROOT=media_root.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_media_is_streamed_with_cache_headers(self):
+        response = self.client.get("/media/posts/a.png")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"png")
+        self.assertIn("max-age", response["Cache-Control"])
+
+        response = self.client.get(
+            "/media/posts/a.png",
+            HTTP_IF_MODIFIED_SINCE=response["Last-Modified"],
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_content_addressed_media_is_immutable(self):
+        response = self.client.get("/media/posts/a.png")
+        self.assertNotIn("immutable", response["Cache-Control"])
+
+        name = default_storage.save("posts/b.png", ContentFile(b"blob"))
+        response = self.client.get(f"/media/{name}")
+
+        self.assertEqual(response["Cache-Control"], "public, max-age=31536000, immutable")
+
+    def test_accel_redirect_hands_the_file_to_nginx(self):
+        with self.settings(MEDIA_ACCEL_REDIRECT="/_media/"):
+            response = self.client.get("/media/posts/a.png")
+
+        self.assertEqual(response["X-Accel-Redirect"], "/_media/posts/a.png")
+        self.assertEqual(response["Content-Type"], "image/png")
+        self.assertEqual(response.content, b"")
+
+    def test_paths_outside_media_root_are_not_found(self):
+        self.assertEqual(self.client.get("/media/../manage.py").status_code, 404)
+        self.assertEqual(self.client.get("/media/posts/missing.png").status_code, 404)
+
+
+class ContentAddressedStorageTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        override = self.settings(MEDIA_ROOT=media_root.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.user = User.objects.create_user(
+            username="author", email="author@example.com", password="Newx123!"
+        )
+
+    def test_duplicate_uploads_share_one_blob(self):
+        first = default_storage.save("posts/images/a.png", ContentFile(b"same"))
+        second = default_storage.save("posts/images/b.PNG", ContentFile(b"same"))
+
+        self.assertEqual(first, second)
+        self.assertRegex(first, r"^posts/images/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.png$")
+        self.assertEqual(MediaBlob.objects.get().uploads, 2)
+
+    def test_gc_frees_blobs_of_purged_posts_only(self):
+        post = Post.objects.create(title="a", content="...", author=self.user)
+        post.image.save("a.png", ContentFile(b"kept"))
+        post.soft_delete()
+
+        purged = Post.objects.create(title="b", content="...", author=self.user)
+        purged.image.save("b.png", ContentFile(b"freed"))
+        freed = purged.image.name
+        Post.all_objects.filter(pk=purged.pk).delete()
+
+        count, size = gc_blobs(timezone.now() + timedelta(seconds=1))
+
+        self.assertEqual((count, size), (1, 5))
+        self.assertFalse(default_storage.exists(freed))
+        self.assertTrue(default_storage.exists(post.image.name))
+
+    def test_gc_keeps_blobs_inside_the_grace_period(self):
+        default_storage.save("posts/images/a.png", ContentFile(b"fresh"))
+
+        self.assertEqual(gc_blobs(timezone.now() - timedelta(hours=1)), (0, 0))
+
+    def test_deduplicated_reupload_restarts_the_grace_period(self):
+        name = default_storage.save("posts/images/a.png", ContentFile(b"again"))
+        MediaBlob.objects.update(last_uploaded_at=timezone.now() - timedelta(days=2))
+        default_storage.save("posts/images/b.png", ContentFile(b"again"))
+
+        self.assertEqual(gc_blobs(timezone.now() - timedelta(hours=1)), (0, 0))
+        self.assertTrue(default_storage.exists(name))
+
+    def test_gc_rechecks_references_before_deleting(self):
+        name = default_storage.save("posts/images/a.png", ContentFile(b"attached"))
+        scan = storage.referenced_blob_names
+
+        def attach_after_scan(names=None):
+            referenced = scan(names)
+            # The blob gets attached right after the initial scan missed it
+            if names is None:
+                Post.objects.create(title="a", content="...", author=self.user, image=name)
+            return referenced
+
+        with mock.patch("apps.core.storage.referenced_blob_names", side_effect=attach_after_scan):
+            self.assertEqual(gc_blobs(timezone.now() + timedelta(seconds=1)), (0, 0))
+        self.assertTrue(default_storage.exists(name))
+
+
+class OpenAPISchemaTests(SimpleTestCase):
+    def setUp(self):
+        schema_file = tempfile.NamedTemporaryFile(suffix=".yaml", delete=False)
+        schema_file.write(b"openapi: 3.0.3\ninfo:\n  title: ET Blog API\npaths: {}\n")
+        schema_file.close()
+        self.addCleanup(Path(schema_file.name).unlink)
+
+        override = override_settings(OPENAPI_SCHEMA_FILE=schema_file.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        load_schema.cache_clear()
+        self.addCleanup(load_schema.cache_clear)
+
+        self.view = OpenAPISchemaView.as_view()
+        self.factory = RequestFactory()
+
+    def test_yaml_and_json_are_served_with_etags(self):
+        response = self.view(self.factory.get("/api/schema/"))
+        self.assertEqual(response["Content-Type"], "application/vnd.oai.openapi; charset=utf-8")
+        self.assertTrue(response.content.startswith(b"openapi: 3.0.3"))
+
+        response_json = self.view(self.factory.get("/api/schema/", HTTP_ACCEPT="application/json"))
+        self.assertEqual(json.loads(response_json.content)["info"]["title"], "ET Blog API")
+        self.assertNotEqual(response["ETag"], response_json["ETag"])
+
+    def test_matching_etag_returns_not_modified(self):
+        etag = self.view(self.factory.get("/api/schema/?format=json"))["ETag"]
+
+        response = self.view(self.factory.get("/api/schema/?format=json", HTTP_IF_NONE_MATCH=etag))
+
+        self.assertEqual(response.status_code, 304)
+
+
+class CommittedOpenAPISchemaTests(TestCase):
+    def test_committed_schema_matches_the_code(self):
+        # Fails when an endpoint changes without `check_openapi_schema --write`
+        call_command("check_openapi_schema", stdout=StringIO(), stderr=StringIO())
+
+
+class StartupTests(SimpleTestCase):
+    def test_heavy_modules_load_on_first_use(self):
+        loaded = subprocess.run(
+            [
+                sys.executable, "-c",
+                "import django, sys; django.setup();"
+                "from django.urls import get_resolver; get_resolver().url_patterns;"
+                "print(' '.join(sys.modules))",
+            ],
+            capture_output=True, text=True, check=True, cwd=settings.BASE_DIR,
+        ).stdout.split()
+
+        for module in ["PIL.Image", "drf_spectacular.generators", "drf_spectacular.views", "apps.posts.admin"]:
+            self.assertNotIn(module, loaded)
+
+    def test_admin_modules_pass_the_admin_checks(self):
+        # SimpleAdminConfig: `check` runs before the admin modules are imported
+        import_module("et_blog.admin_urls")
+
+        self.assertTrue(admin.site._registry)
+        self.assertEqual(admin.site.check(None), [])
+
+    def test_profile_startup_reports(self):
+        out = StringIO()
+        call_command("profile_startup", "--no-request", "--top", "3", stdout=out)
+
+        self.assertIn("URLconf import", out.getvalue())
+        self.assertIn("Slowest imports", out.getvalue())
+        self.assertIn("App ready() hooks", out.getvalue())
+
+
+class MiddlewareByPathTests(TestCase):
+    def test_api_runs_the_lean_stack(self):
+        response = self.client.get("/api/posts/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("X-Frame-Options", response)
+        self.assertNotIn("Cookie", response.get("Vary", ""))
+
+    def test_admin_runs_the_full_stack(self):
+        response = self.client.get("/admin/")
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response["X-Frame-Options"], "DENY")
+
+        csrf_client = Client(enforce_csrf_checks=True)
+        response = csrf_client.post("/admin/login/", {"username": "x", "password": "y"})
+        self.assertEqual(response.status_code, 403)
+
+    def test_bench_middleware(self):
+        out = StringIO()
+        call_command("bench_middleware", "--requests", "20", "--rounds", "1", stdout=out)
+        self.assertIn("saved", out.getvalue())
+
+
+class ServerTimingTests(TestCase):
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=1.0)
+    def test_sampled_request_reports_its_phases(self):
+        with self.assertLogs("apps.core.timing", "INFO") as logs:
+            response = self.client.get("/api/posts/")
+
+        metrics = [metric.split(";")[0] for metric in response["Server-Timing"].split(", ")]
+        self.assertEqual(metrics, ["db", "paginate", "serialize", "render", "total"])
+        self.assertIn("path=/api/posts/ status=200", logs.output[0])
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=0.0)
+    def test_unsampled_request_is_not_timed(self):
+        response = self.client.get("/api/posts/")
+        self.assertNotIn("Server-Timing", response)
+
+
+class BenchmarkTests(TestCase):
+    def setUp(self):
+        scratch = tempfile.TemporaryDirectory()
+        self.addCleanup(scratch.cleanup)
+        override = self.settings(
+            MEDIA_ROOT=scratch.name, IMAGE_UPLOAD_SESSION_DIR=scratch.name, METRICS_DIR=scratch.name,
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_every_route_has_a_passing_scenario(self):
+        selected = benchmark.scenarios(benchmark.seed(users=4, posts=20, comments=8))
+        self.assertEqual(benchmark.uncovered_routes(selected), [])
+
+        # Slow (password hashing) scenarios aside
+        for scenario in selected:
+            if scenario.limit is None:
+                with self.subTest(scenario=scenario.name):
+                    result = benchmark.run(scenario, requests=2, warmup=0)
+                    self.assertLessEqual(result["p50"], result["p99"])
+
+    def test_regressions_against_the_baseline(self):
+        base = {"p50": 1.0, "p95": 2.0, "p99": 3.0, "rps": 900.0, "queries": 4.0}
+        results = {
+            "steady": dict(base, p95=2.2),
+            "slower": dict(base, p95=3.0),
+            "n+1": dict(base, queries=14.0),
+            "added": base,
+        }
+        notes, regressions = benchmark.compare(
+            results, {name: base for name in ("steady", "slower", "n+1")}, tolerance=0.25
+        )
+
+        self.assertEqual(regressions, ["slower", "n+1"])
+        self.assertEqual(notes["steady"], "p95 +10%")
+        self.assertIn("queries 4 -> 14", notes["n+1"])
+        self.assertEqual(notes["added"], "new")
+
+    def test_baseline_from_another_database_is_refused(self):
+        baseline = Path(self.enterContext(tempfile.TemporaryDirectory())) / "baseline.json"
+        baseline.write_text(json.dumps({"environment": {"database": "oracle"}, "scenarios": {}}))
+
+        with self.assertRaisesMessage(CommandError, "recorded on oracle"):
+            call_command("run_benchmarks", baseline=str(baseline), stdout=StringIO())
+
+
+executed = []
+
+
+@task
+def record(value):
+    executed.append(value)
+    return value
+
+
+@task
+def always_fails():
+    raise RuntimeError("boom")
+
+
+class DatabaseTaskBackendTests(TestCase):
+    def setUp(self):
+        executed.clear()
+
+    def test_tasks_run_by_priority_and_store_results(self):
+        low = record.using(priority=-10).enqueue("low")
+        high = record.using(priority=10).enqueue("high")
+        self.assertEqual(high.status, TaskResultStatus.READY)
+
+        Worker(burst=True).run()
+
+        self.assertEqual(executed, ["high", "low"])
+        result = record.get_result(low.id)
+        self.assertEqual(result.status, TaskResultStatus.SUCCESSFUL)
+        self.assertEqual(result.return_value, "low")
+        self.assertEqual(result.attempts, 1)
+
+    def test_deferred_task_waits_for_run_after(self):
+        record.using(run_after=timezone.now() + timedelta(hours=1)).enqueue("later")
+
+        Worker(burst=True).run()
+
+        self.assertEqual(executed, [])
+
+    def test_failures_are_retried_with_backoff_then_failed(self):
+        result = always_fails.enqueue()
+        worker = Worker(burst=True)
+
+        with self.assertLogs("apps.core.tasks", "WARNING"):
+            worker.run()
+        row = QueuedTask.objects.get(pk=result.id)
+        self.assertEqual(row.status, TaskResultStatus.READY)
+        self.assertGreater(row.run_after, timezone.now())
+
+        with self.assertLogs("django.tasks", "ERROR"):
+            for _ in range(2):
+                QueuedTask.objects.update(run_after=timezone.now())
+                worker.run()
+
+        result.refresh()
+        self.assertEqual(result.status, TaskResultStatus.FAILED)
+        self.assertEqual(len(result.errors), 3)
+        self.assertEqual(result.errors[0].exception_class, RuntimeError)
+
+    def test_stale_running_tasks_are_requeued(self):
+        result = record.enqueue("orphan")
+        QueuedTask.objects.update(
+            status=TaskResultStatus.RUNNING,
+            last_attempted_at=timezone.now() - timedelta(days=1),
+        )
+
+        call_command("run_task_worker", "--burst")
+
+        self.assertEqual(executed, ["orphan"])
+        self.assertEqual(record.get_result(result.id).status, TaskResultStatus.SUCCESSFUL)
+
+    def test_running_worker_requeues_tasks_that_go_stale(self):
+        worker = Worker(poll_interval=0.01)
+        worker.requeue_interval = 0
+        claim, execute = worker.claim, worker.execute
+        claims = []
+
+        def claim_after_orphaning():
+            claims.append(None)
+            if len(claims) == 1:
+                # A task is left RUNNING by a dead worker after this one started
+                claims[0] = record.enqueue("orphan")
+                QueuedTask.objects.update(
+                    status=TaskResultStatus.RUNNING,
+                    last_attempted_at=timezone.now() - timedelta(days=1),
+                )
+            elif len(claims) > 100:
+                worker.stop()
+            return claim()
+
+        def execute_then_stop(row):
+            execute(row)
+            worker.stop()
+
+        with mock.patch.object(worker, "claim", claim_after_orphaning), \
+                mock.patch.object(worker, "execute", execute_then_stop):
+            worker.run()
+
+        self.assertEqual(executed, ["orphan"])
+        self.assertEqual(record.get_result(claims[0].id).status, TaskResultStatus.SUCCESSFUL)
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    locmem = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+    @override_settings(DEBUG=False, CACHES=locmem)
+    def test_per_process_cache_is_rejected_outside_debug(self):
+        self.assertEqual([error.id for error in check_shared_cache(None)], ["core.E002"])
+
+    @override_settings(DEBUG=True, CACHES=locmem)
+    def test_per_process_cache_is_allowed_in_debug(self):
+        self.assertEqual(check_shared_cache(None), [])
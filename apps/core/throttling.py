@@ -0,0 +1,71 @@
+from django.db import transaction
+from rest_framework import throttling
+from apps.metrics.registry import record_throttled
+from .models import ThrottleState
+
+
+class GCRARateThrottle(throttling.SimpleRateThrottle):
+    """
+    SimpleRateThrottle with the per-key timestamp list replaced by GCRA
+    (Generic Cell Rate Algorithm) state in the ThrottleState table.
+
+    Each key stores a single theoretical arrival time (TAT) updated under
+    a row lock, so limits are global across workers and the cost per
+    request does not depend on the configured rate.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        interval = self.duration / self.num_requests
+
+        with transaction.atomic():
+            state, _ = (
+                ThrottleState.objects
+                .select_for_update()
+                .get_or_create(key=self.key, defaults={"tat": self.now})
+            )
+
+            tat = max(state.tat, self.now) + interval
+            allowed_at = tat - self.duration
+
+            if allowed_at > self.now:
+                self.wait_time = allowed_at - self.now
+                return self.throttle_failure()
+
+            state.tat = tat
+            state.save(update_fields=["tat"])
+
+        return True
+
+    def throttle_failure(self):
+        record_throttled(self.scope)
+        return super().throttle_failure()
+
+    def wait(self):
+        return self.wait_time
+
+
+class AnonRateThrottle(throttling.AnonRateThrottle, GCRARateThrottle):
+    pass
+
+
+class UserRateThrottle(throttling.UserRateThrottle, GCRARateThrottle):
+    pass
+
+
+class ScopedRateThrottle(throttling.ScopedRateThrottle, GCRARateThrottle):
+    pass
+
+
+def prune_throttle_state(now):
+    """
+    Delete keys whose TAT has passed; they are equivalent to a missing row.
+    """
+    return ThrottleState.objects.filter(tat__lt=now).delete()[0]
@@ -0,0 +1,76 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+# Timings of the current request, None when it is not sampled.
+# Set by apps.core.middleware.ServerTimingMiddleware.
+_timings = ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    """
+    Seconds spent per named phase of one request, plus the SQL
+    query count. Phases may overlap: "paginate" includes its queries.
+    """
+
+    def __init__(self):
+        self.durations = {}
+        self.queries = 0
+
+    def add(self, name, seconds):
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+
+def current_timings():
+    return _timings.get()
+
+
+@contextmanager
+def collect_timings():
+    timings = RequestTimings()
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+@contextmanager
+def timed(name):
+    """
+    Add the block's duration to phase `name` of the current request.
+    A no-op on requests that are not sampled.
+    """
+    timings = _timings.get()
+    if timings is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start)
+
+
+def sql_timer(execute, sql, params, many, context):
+    timings = _timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.add("db", time.perf_counter() - start)
+        timings.queries += 1
+
+
+def install_sql_timer(sender, connection, **kwargs):
+    """
+    connection_created receiver: time the queries of every connection.
+    Wrappers outlive reconnects, so each is installed once.
+    """
+    if sql_timer not in connection.execute_wrappers:
+        connection.execute_wrappers.append(sql_timer)
@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import DatabasePoolStatsAPIView
+
+urlpatterns = [
+    path("core/db-pool/", DatabasePoolStatsAPIView.as_view(), name="db-pool-stats"),
+]
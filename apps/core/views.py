@@ -0,0 +1,116 @@
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.module_loading import import_string
+from django.views import View
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from drf_spectacular.utils import extend_schema, OpenApiResponse
+from .schema import load_schema
+
+
+class DatabasePoolStatsAPIView(APIView):
+    """
+    GET (Admin)
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(
+        summary="Database pool stats",
+        description=(
+            "Connection pool counters of the worker process serving this request, "
+            "per database alias. Aliases without a pool report null."
+        ),
+        responses={
+            200: OpenApiResponse(description="Pool stats per database alias"),
+            403: OpenApiResponse(description="Admin privileges required"),
+        },
+    )
+
+    def get(self, request):
+        return Response({
+            alias: pool_stats(connections[alias])
+            for alias in connections
+        })
+
+
+def lazy_view(view_class_path, **initkwargs):
+    """
+    A view whose class, and everything it imports, is loaded on the
+    first request it serves instead of when the URLconf is imported.
+    """
+    view = None
+
+    def dispatch(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            view = import_string(view_class_path).as_view(**initkwargs)
+        return view(request, *args, **kwargs)
+
+    return dispatch
+
+
+class OpenAPISchemaView(View):
+    """
+    GET (Public)
+    The schema generated at build time (OPENAPI_SCHEMA_FILE), served
+    from memory instead of introspecting every view per request.
+    JSON with ?format=json or a JSON Accept header, YAML otherwise.
+    """
+
+    media_types = {
+        "yaml": "application/vnd.oai.openapi; charset=utf-8",
+        "json": "application/vnd.oai.openapi+json",
+    }
+
+    def get(self, request):
+        schema = load_schema(str(settings.OPENAPI_SCHEMA_FILE))
+
+        wants_json = (
+            request.GET.get("format") in ("json", "openapi-json")
+            or "json" in request.headers.get("Accept", "")
+        )
+        fmt = "json" if wants_json else "yaml"
+        etag = f'"{schema["etag"]}-{fmt}"'
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(schema[fmt], content_type=self.media_types[fmt])
+
+        response["ETag"] = etag
+        patch_vary_headers(response, ["Accept"])
+        # Revalidate on every load: a redeploy changes the ETag
+        patch_cache_control(response, public=True, no_cache=True)
+        return response
+
+
+def pool_stats(connection):
+    pool = getattr(connection, "pool", None)
+    if pool is None:
+        return None
+
+    stats = pool.get_stats()
+    requests = stats.get("requests_num", 0)
+    return {
+        "size": stats.get("pool_size", 0),
+        "available": stats.get("pool_available", 0),
+        "min_size": stats.get("pool_min", 0),
+        "max_size": stats.get("pool_max", 0),
+        "requests": requests,
+        "requests_waiting": stats.get("requests_waiting", 0),
+        "requests_queued": stats.get("requests_queued", 0),
+        "avg_checkout_wait_ms": (
+            round(stats.get("requests_wait_ms", 0) / requests, 2) if requests else 0
+        ),
+        "avg_usage_ms": (
+            round(stats.get("usage_ms", 0) / requests, 2) if requests else 0
+        ),
+        "request_errors": stats.get("requests_errors", 0),
+        "connections_opened": stats.get("connections_num", 0),
+        "connection_errors": stats.get("connections_errors", 0),
+        "connections_lost": stats.get("connections_lost", 0),
+        "bad_returns": stats.get("returns_bad", 0),
+    }
@@ -0,0 +1,146 @@
+import logging
+import os
+import re
+import time
+import traceback
+from django.conf import settings
+from django.db import connections, transaction
+
+
+logger = logging.getLogger("apps.metrics.queries")
+
+# "IN (%s, %s, %s)" and inlined literals do not change a query's shape
+IN_LIST = re.compile(r"\(\s*%s(?:\s*,\s*%s)+\s*\)")
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+EXPLAINABLE = ("SELECT", "WITH")
+
+# Execute wrappers, left out of reported stacks
+INSTRUMENTATION = {
+    os.path.join("apps", "core", "timing.py"),
+    os.path.join("apps", "metrics", "inspection.py"),
+    os.path.join("apps", "metrics", "registry.py"),
+}
+
+
+class RepeatedQueries(AssertionError):
+    """
+    Raised under the test runner when a request repeats a query shape
+    more than QUERY_REPEAT_THRESHOLD times (an N+1).
+    """
+
+
+def fingerprint(sql):
+    return LITERALS.sub("?", IN_LIST.sub("(%s, ...)", sql))
+
+
+def project_stack():
+    """
+    The project's own frames of the current stack, innermost last,
+    without the query instrumentation itself.
+    """
+    base = str(settings.BASE_DIR)
+    stack = []
+    for frame in traceback.extract_stack():
+        if not frame.filename.startswith(base) or "site-packages" in frame.filename:
+            continue
+        filename = os.path.relpath(frame.filename, base)
+        if filename not in INSTRUMENTATION:
+            stack.append(f"{filename}:{frame.lineno} in {frame.name}")
+    return stack
+
+
+class QueryInspector:
+    """
+    Watches the queries of one request. Queries slower than
+    SLOW_QUERY_MS are kept and logged once the response is ready; with
+    `explain`, the slowest one is logged with its EXPLAIN plan. With
+    `track_repeats`, each query is fingerprinted and shapes run more
+    than QUERY_REPEAT_THRESHOLD times are logged with the stack of the
+    call that crossed the threshold.
+    """
+
+    def __init__(self, track_repeats, explain=False):
+        self.track_repeats = track_repeats
+        self.explain = explain
+        self.shapes = {}
+        self.slow = []
+
+    def execute(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            milliseconds = (time.perf_counter() - start) * 1000
+            if self.track_repeats:
+                self.track(sql)
+            if settings.SLOW_QUERY_MS and milliseconds >= settings.SLOW_QUERY_MS and not many:
+                alias = context["connection"].alias
+                self.slow.append((alias, sql, params, milliseconds, project_stack()))
+
+    def track(self, sql):
+        shape = fingerprint(sql)
+        entry = self.shapes.get(shape)
+        if entry is None:
+            self.shapes[shape] = [1, None]
+            return
+        entry[0] += 1
+        if entry[0] == settings.QUERY_REPEAT_THRESHOLD + 1:
+            entry[1] = project_stack()
+
+    def repeated(self):
+        return [
+            (shape, count, stack)
+            for shape, (count, stack) in self.shapes.items()
+            if count > settings.QUERY_REPEAT_THRESHOLD
+        ]
+
+    @property
+    def has_findings(self):
+        return bool(self.slow) or any(
+            count > settings.QUERY_REPEAT_THRESHOLD for count, _ in self.shapes.values()
+        )
+
+    def report(self, request):
+        """
+        Log the findings; may run EXPLAIN, so call it outside the
+        request's measurement and, under ASGI, from a thread.
+        """
+        # One EXPLAIN per sampled request: it costs about as much as the query
+        slowest = max(self.slow, key=lambda query: query[3], default=None) if self.explain else None
+        for query in self.slow:
+            alias, sql, params, milliseconds, stack = query
+            plan = explain(alias, sql, params) if query is slowest else "(not sampled)"
+            logger.warning(
+                "Slow query (%.1f ms) on %s %s\n%s\nPlan:\n%s\nStack:\n  %s",
+                milliseconds, request.method, request.path, sql,
+                plan, "\n  ".join(stack),
+            )
+
+        repeated = self.repeated()
+        for shape, count, stack in repeated:
+            logger.warning(
+                "Repeated query shape (%d times) on %s %s\n%s\nStack:\n  %s",
+                count, request.method, request.path, shape, "\n  ".join(stack),
+            )
+
+        if repeated and settings.QUERY_INSPECTION_RAISE:
+            shape, count, stack = repeated[0]
+            raise RepeatedQueries(
+                f"{request.method} {request.path} ran this query {count} times "
+                f"(QUERY_REPEAT_THRESHOLD={settings.QUERY_REPEAT_THRESHOLD}):\n{shape}\n"
+                + "\n".join(stack)
+            )
+
+
+def explain(alias, sql, params):
+    if not sql.lstrip().upper().startswith(EXPLAINABLE):
+        return "(not a SELECT)"
+    connection = connections[alias]
+    try:
+        # In a savepoint: a failed EXPLAIN must not break a transaction
+        with transaction.atomic(using=alias), connection.cursor() as cursor:
+            cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}", params)
+            return "\n".join(" ".join(str(column) for column in row) for row in cursor.fetchall())
+    except Exception as exc:
+        return f"(EXPLAIN failed: {exc})"
@@ -0,0 +1,42 @@
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from .registry import measure, record_request
+
+
+class MetricsMiddleware:
+    """
+    Count every request and its latency and SQL queries per resolved
+    URL pattern, into this process' metrics file (see /metrics).
+    Slow and repeated (N+1) queries are logged once the response is
+    ready, see inspection.QueryInspector.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        with measure(request) as metrics:
+            start = time.perf_counter()
+            response = self.get_response(request)
+        record_request(metrics, response.status_code, time.perf_counter() - start)
+        if metrics.inspector.has_findings:
+            metrics.inspector.report(request)
+        return response
+
+    async def __acall__(self, request):
+        with measure(request) as metrics:
+            start = time.perf_counter()
+            response = await self.get_response(request)
+        record_request(metrics, response.status_code, time.perf_counter() - start)
+        if metrics.inspector.has_findings:
+            await sync_to_async(metrics.inspector.report)(request)
+        return response
@@ -0,0 +1,189 @@
+import json
+import os
+import random
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from django.conf import settings
+from .inspection import QueryInspector
+from .store import MetricsFile, read_file
+
+
+REQUESTS = "http_requests_total"
+DURATION = "http_request_duration_seconds"
+QUERIES = "http_request_queries_total"
+CACHE = "cache_requests_total"
+THROTTLED = "throttled_requests_total"
+
+METRICS = {
+    REQUESTS: ("counter", "Requests by route, method and status."),
+    DURATION: ("histogram", "Request latency in seconds by route and method."),
+    QUERIES: ("counter", "SQL queries run by requests, by route and method."),
+    CACHE: ("counter", "Cache lookups by route, cache and result (hit/miss)."),
+    THROTTLED: ("counter", "Requests rejected by a throttle, by route and scope."),
+}
+
+METHODS = {"GET", "HEAD", "OPTIONS", "POST", "PUT", "PATCH", "DELETE"}
+
+# Request being measured, None outside MetricsMiddleware.
+_current = ContextVar("metrics_request", default=None)
+
+_store_lock = threading.Lock()
+_store = None
+
+
+class RequestMetrics:
+    def __init__(self, request):
+        self.request = request
+        self.queries = 0
+        self.inspector = QueryInspector(
+            track_repeats=random.random() < settings.QUERY_INSPECTION_SAMPLE_RATE,
+            explain=random.random() < settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE,
+        )
+
+    @property
+    def route(self):
+        match = getattr(self.request, "resolver_match", None)
+        return match.route if match is not None else "unmatched"
+
+
+@contextmanager
+def measure(request):
+    metrics = RequestMetrics(request)
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+def get_store():
+    """
+    This process' MetricsFile, reopened after a fork.
+    """
+    global _store
+    pid, directory = os.getpid(), str(settings.METRICS_DIR)
+    with _store_lock:
+        if _store is None or _store[:2] != (pid, directory):
+            Path(directory).mkdir(parents=True, exist_ok=True)
+            _store = (pid, directory, MetricsFile(os.path.join(directory, f"{pid}.db")))
+        return _store[2]
+
+
+def sample_key(metric, suffix, labels):
+    return json.dumps([metric, suffix, labels], separators=(",", ":"))
+
+
+def record_request(metrics, status, duration):
+    request = metrics.request
+    method = request.method if request.method in METHODS else "other"
+    labels = [["route", metrics.route], ["method", method]]
+    store = get_store()
+
+    store.inc(sample_key(REQUESTS, "", labels + [["status", str(status)]]))
+    store.inc(sample_key(QUERIES, "", labels), metrics.queries)
+    store.inc(sample_key(DURATION, "_count", labels))
+    store.inc(sample_key(DURATION, "_sum", labels), duration)
+    for bound in settings.METRICS_LATENCY_BUCKETS:
+        if duration <= bound:
+            # Per bucket, made cumulative when rendered
+            store.inc(sample_key(DURATION, "_bucket", labels + [["le", str(float(bound))]]))
+            break
+
+
+def record_cache_lookup(cache_name, hit):
+    metrics = _current.get()
+    route = metrics.route if metrics is not None else "none"
+    labels = [["route", route], ["cache", cache_name], ["result", "hit" if hit else "miss"]]
+    get_store().inc(sample_key(CACHE, "", labels))
+
+
+def record_throttled(scope):
+    metrics = _current.get()
+    route = metrics.route if metrics is not None else "none"
+    get_store().inc(sample_key(THROTTLED, "", [["route", route], ["scope", str(scope)]]))
+
+
+def count_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    metrics.queries += 1
+    return metrics.inspector.execute(execute, sql, params, many, context)
+
+
+def install_query_counter(sender, connection, **kwargs):
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_query)
+
+
+def collect():
+    """
+    Samples summed over the files of every process, live or exited, so
+    counters never go back while the directory is kept.
+    """
+    totals = defaultdict(float)
+    for path in Path(settings.METRICS_DIR).glob("*.db"):
+        for key, value in read_file(path).items():
+            totals[key] += value
+    return totals
+
+
+def render():
+    """
+    All metrics in the Prometheus text exposition format (0.0.4).
+    """
+    samples = defaultdict(list)
+    for key, value in collect().items():
+        metric, suffix, labels = json.loads(key)
+        samples[metric].append((suffix, labels, value))
+
+    lines = []
+    for metric, (kind, help_text) in METRICS.items():
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        if kind == "histogram":
+            lines.extend(_histogram_lines(metric, samples[metric]))
+        else:
+            for suffix, labels, value in sorted(samples[metric], key=lambda s: s[1]):
+                lines.append(_line(metric + suffix, labels, value))
+    return "\n".join(lines) + "\n"
+
+
+def _histogram_lines(metric, samples):
+    series = defaultdict(lambda: {"_bucket": {}, "_sum": 0.0, "_count": 0.0})
+    for suffix, labels, value in samples:
+        if suffix == "_bucket":
+            bound = labels.pop()[1]
+            series[_label_key(labels)]["_bucket"][float(bound)] = value
+        else:
+            series[_label_key(labels)][suffix] = value
+
+    lines = []
+    for label_key in sorted(series):
+        labels = [list(pair) for pair in label_key]
+        values = series[label_key]
+        cumulative = 0.0
+        for bound in settings.METRICS_LATENCY_BUCKETS:
+            cumulative += values["_bucket"].get(float(bound), 0.0)
+            lines.append(_line(f"{metric}_bucket", labels + [["le", str(float(bound))]], cumulative))
+        lines.append(_line(f"{metric}_bucket", labels + [["le", "+Inf"]], values["_count"]))
+        lines.append(_line(f"{metric}_sum", labels, values["_sum"]))
+        lines.append(_line(f"{metric}_count", labels, values["_count"]))
+    return lines
+
+
+def _label_key(labels):
+    return tuple(tuple(pair) for pair in labels)
+
+
+def _line(name, labels, value):
+    value = str(int(value)) if value.is_integer() else repr(value)
+    label_text = ",".join(f'{label}="{_escape(text)}"' for label, text in labels)
+    return f"{name}{{{label_text}}} {value}" if labels else f"{name} {value}"
+
+
+def _escape(text):
+    return text.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
@@ -0,0 +1,21 @@
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class QueryInspectionRunner(DiscoverRunner):
+    """
+    Test runner inspecting every request's queries: a repeated query
+    shape (an N+1) fails the test that made the request.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.inspection_settings = override_settings(
+            QUERY_INSPECTION_SAMPLE_RATE=1.0,
+            QUERY_INSPECTION_RAISE=True,
+        )
+        self.inspection_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.inspection_settings.disable()
+        super().teardown_test_environment(**kwargs)
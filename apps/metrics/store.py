@@ -0,0 +1,87 @@
+import mmap
+import os
+import struct
+import threading
+
+
+HEADER_SIZE = 8
+INITIAL_SIZE = 64 * 1024
+
+
+class MetricsFile:
+    """
+    Float values by string key in a memory-mapped file. Each process
+    writes its own file (METRICS_DIR/<pid>.db); /metrics reads them all.
+    An increment is an in-place write to the mapping: no syscall.
+
+    Layout: bytes used (uint32, padded to 8), then one entry per key:
+    key length (uint32), UTF-8 key padded to 8 bytes, value (float64).
+    The byte count is written after each new entry, so readers only see
+    complete entries.
+    """
+
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        self.file = open(path, "a+b")
+        size = os.fstat(self.file.fileno()).st_size
+        if size == 0:
+            size = INITIAL_SIZE
+            self.file.truncate(size)
+        self.map = mmap.mmap(self.file.fileno(), size)
+
+        self.used = struct.unpack_from("<I", self.map, 0)[0] or HEADER_SIZE
+        self.positions = {key: position for key, _, position in entries(self.map, self.used)}
+
+    def inc(self, key, amount=1.0):
+        with self.lock:
+            position = self.positions.get(key)
+            if position is None:
+                position = self._add(key)
+            value = struct.unpack_from("<d", self.map, position)[0]
+            struct.pack_into("<d", self.map, position, value + amount)
+
+    def _add(self, key):
+        encoded = key.encode()
+        padded = len(encoded) + (-(4 + len(encoded)) % 8)
+        entry = struct.pack(f"<I{padded}sd", len(encoded), encoded, 0.0)
+
+        if self.used + len(entry) > len(self.map):
+            size = len(self.map)
+            while self.used + len(entry) > size:
+                size *= 2
+            self.map.close()
+            self.file.truncate(size)
+            self.map = mmap.mmap(self.file.fileno(), size)
+
+        self.map[self.used:self.used + len(entry)] = entry
+        position = self.used + len(entry) - 8
+        self.used += len(entry)
+        struct.pack_into("<I", self.map, 0, self.used)
+        self.positions[key] = position
+        return position
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+
+def read_file(path):
+    """
+    {key: value} of a metrics file written by any process.
+    """
+    with open(path, "rb") as metrics_file:
+        data = metrics_file.read()
+    if len(data) < HEADER_SIZE:
+        return {}
+    used = min(struct.unpack_from("<I", data, 0)[0], len(data))
+    return {key: value for key, value, _ in entries(data, used)}
+
+
+def entries(data, used):
+    position = HEADER_SIZE
+    while position < used:
+        length = struct.unpack_from("<I", data, position)[0]
+        key = bytes(data[position + 4:position + 4 + length]).decode()
+        position += 4 + length + (-(4 + length) % 8)
+        yield key, struct.unpack_from("<d", data, position)[0], position
+        position += 8
@@ -0,0 +1,147 @@
+import shutil
+import tempfile
+from unittest import mock
+from pathlib import Path
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from apps.categories.models import Category
+from apps.comments.models import Comment
+from apps.posts.models import Post
+from apps.tags.models import Tag
+from apps.users.models import User
+from .inspection import QueryInspector, RepeatedQueries
+from .registry import REQUESTS, sample_key
+from .store import MetricsFile, read_file
+
+
+class MetricsFileTests(TestCase):
+    def test_values_survive_growth_and_reopening(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = Path(directory) / "1.db"
+        store = MetricsFile(path)
+        for i in range(5000):
+            store.inc(f"key-{i}", i)
+        store.inc("key-1", 0.5)
+        store.close()
+
+        reopened = MetricsFile(path)
+        reopened.inc("key-2")
+
+        values = read_file(path)
+        self.assertEqual(len(values), 5000)
+        self.assertEqual(values["key-1"], 1.5)
+        self.assertEqual(values["key-2"], 3.0)
+        self.assertEqual(values["key-4999"], 4999.0)
+
+
+class MetricsEndpointTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        override = override_settings(METRICS_DIR=self.directory)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_processes_are_summed_per_route(self):
+        # A request counted by another worker process
+        other = MetricsFile(Path(self.directory) / "99999.db")
+        labels = [["route", "api/posts/"], ["method", "GET"], ["status", "200"]]
+        other.inc(sample_key(REQUESTS, "", labels), 3)
+
+        self.client.get("/api/posts/")
+        body = self.client.get("/metrics").content.decode()
+
+        self.assertIn('http_requests_total{route="api/posts/",method="GET",status="200"} 4', body)
+        self.assertIn('http_request_duration_seconds_count{route="api/posts/",method="GET"} 1', body)
+        self.assertIn('http_request_duration_seconds_bucket{route="api/posts/",method="GET",le="+Inf"} 1', body)
+
+    def test_cache_lookups_are_counted(self):
+        user = User.objects.create_user(username="user1", email="user1@example.com", password="Newx123!")
+        token = AccessToken.for_user(user)
+
+        for _ in range(2):
+            self.client.get(f"/api/users/{user.pk}/", HTTP_AUTHORIZATION=f"Bearer {token}")
+        body = self.client.get("/metrics").content.decode()
+
+        self.assertIn('cache_requests_total{route="api/users/<int:pk>/",cache="auth_user",result="hit"} 1', body)
+        self.assertIn('cache_requests_total{route="api/users/<int:pk>/",cache="auth_user",result="miss"} 1', body)
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_token_is_required_when_set(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 401)
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, 200)
+
+
+class QueryInspectionTests(TestCase):
+    # The test runner fails any request repeating a query shape
+    # more than QUERY_REPEAT_THRESHOLD times
+
+    def setUp(self):
+        cache.clear()
+        tags = [Tag.objects.create(name=f"tag{i}", slug=f"tag{i}") for i in range(3)]
+        for i in range(8):
+            author = User.objects.create_user(
+                username=f"user{i}", email=f"user{i}@example.com", password="Newx123!"
+            )
+            category = Category.objects.create(name=f"cat{i}", slug=f"cat{i}")
+            post = Post.objects.create(
+                title=f"Post {i}", content="...", author=author, category=category,
+                status=Post.Status.PUBLISHED,
+            )
+            post.tags.set(tags)
+        self.post = post
+
+        for i in range(8):
+            parent = None
+            for depth in range(3):
+                parent = Comment.objects.create(
+                    post=post, author=author, content=f"{i}.{depth}", parent=parent
+                )
+
+    def test_list_endpoints_have_no_n_plus_one(self):
+        for url in (
+            "/api/posts/",
+            f"/api/posts/{self.post.slug}/",
+            f"/api/posts/{self.post.slug}/comments/",
+            "/api/async/posts/",
+            f"/api/async/posts/{self.post.slug}/comments/",
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_repeated_shape_is_reported_with_its_stack(self):
+        inspector = QueryInspector(track_repeats=True)
+        for size in range(1, 8):
+            inspector.track("SELECT * FROM t WHERE id IN (" + ", ".join(["%s"] * size) + ")")
+        inspector.track("SELECT * FROM t WHERE id = 1")
+
+        [(shape, count, stack)] = inspector.repeated()
+        self.assertEqual((shape, count), ("SELECT * FROM t WHERE id IN (%s, ...)", 6))
+        self.assertTrue(any("apps/metrics/tests.py" in frame for frame in stack))
+
+        with self.assertLogs("apps.metrics.queries", "WARNING"), self.assertRaises(RepeatedQueries):
+            inspector.report(RequestFactory().get("/"))
+
+    @override_settings(SLOW_QUERY_MS=1e-9, SLOW_QUERY_EXPLAIN_SAMPLE_RATE=1.0)
+    def test_slow_queries_are_logged_with_their_plan(self):
+        with self.assertLogs("apps.metrics.queries", "WARNING") as logs:
+            self.client.get("/api/posts/")
+
+        self.assertIn("Slow query", logs.output[0])
+        self.assertIn("Plan:", logs.output[0])
+        self.assertNotIn("EXPLAIN failed", "".join(logs.output))
+        # Only the slowest query of the request is explained
+        self.assertEqual(sum("(not sampled)" not in line for line in logs.output), 1)
+
+    @override_settings(SLOW_QUERY_MS=1e-9, SLOW_QUERY_EXPLAIN_SAMPLE_RATE=0)
+    def test_unsampled_slow_queries_skip_explain(self):
+        with mock.patch("apps.metrics.inspection.explain") as explain:
+            with self.assertLogs("apps.metrics.queries", "WARNING") as logs:
+                self.client.get("/api/posts/")
+
+        explain.assert_not_called()
+        self.assertIn("(not sampled)", logs.output[0])
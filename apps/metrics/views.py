@@ -0,0 +1,22 @@
+import hmac
+from django.conf import settings
+from django.http import HttpResponse
+from django.views import View
+from .registry import render
+
+
+class MetricsView(View):
+    """
+    GET - every process' metrics in the Prometheus text format.
+    With METRICS_TOKEN set, scrapers send it as a Bearer token.
+    """
+
+    http_method_names = ["get"]
+
+    def get(self, request):
+        if settings.METRICS_TOKEN:
+            expected = f"Bearer {settings.METRICS_TOKEN}"
+            if not hmac.compare_digest(request.headers.get("Authorization", ""), expected):
+                return HttpResponse(status=401, headers={"WWW-Authenticate": "Bearer"})
+
+        return HttpResponse(render(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -3,13 +3,11 @@ from .models import Post
 
 @admin.action(description="Soft Delete Selected Posts")
 def soft_delete_posts(modeladmin, request, queryset):
-    for post in queryset:
-        post.soft_delete()
+    queryset.soft_delete()
 
 @admin.action(description="Restore Selected Posts")
 def restore_posts(modeladmin, request, queryset):
-    for post in queryset:
-        post.restore()
+    queryset.restore()
 
 
 @admin.register(Post)
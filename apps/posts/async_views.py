@@ -0,0 +1,69 @@
+from apps.core.async_api import AsyncAPIView, AsyncPageNumberPagination, error_response, json_response
+from apps.core.timing import timed
+from .filters import filter_post_list
+from .models import Post
+from .serializers import PostListSerializer, PostDetailSerializer, post_queryset
+
+
+class AsyncPostPagination(AsyncPageNumberPagination):
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 50
+
+
+class AsyncPostListView(AsyncAPIView):
+    """
+    GET (Public) - async PostListCreateAPIView.get
+    """
+
+    async def get(self, request):
+        queryset = post_queryset().order_by("id")
+
+        if request.GET.get("status") == Post.Status.DRAFT:
+            if not request.user.is_authenticated:
+                return error_response(
+                    "Authentication required to view drafts", status=403
+                )
+            queryset = queryset.filter(status=Post.Status.DRAFT)
+        else:
+            queryset = queryset.filter(status=Post.Status.PUBLISHED)
+
+        queryset = filter_post_list(queryset, request.GET)
+
+        paginator = AsyncPostPagination()
+        page = await paginator.paginate_queryset(queryset, request)
+        serializer = PostListSerializer(page, many=True)
+
+        with timed("serialize"):
+            data = serializer.data
+
+        return json_response(paginator.get_paginated_data(data))
+
+
+class AsyncPostDetailView(AsyncAPIView):
+    """
+    GET (Public) - async PostDetailAPIView.get
+    """
+
+    async def get(self, request, **kwargs):
+        try:
+            post = await post_queryset().aget(**kwargs)
+        except Post.DoesNotExist:
+            return error_response("No Post matches the given query.", status=404)
+
+        # Protect draft
+        if post.status == Post.Status.DRAFT:
+            if not request.user.is_authenticated:
+                return error_response(
+                    "Authentication required to view draft posts", status=403
+                )
+
+            if not (request.user.pk == post.author_id or request.user.is_staff):
+                return error_response(
+                    "You do not have permission to view this draft", status=403
+                )
+
+        with timed("serialize"):
+            data = PostDetailSerializer(post).data
+
+        return json_response(data)
@@ -1,4 +1,5 @@
 import django_filters # type: ignore
+from django.db.models import Q
 from .models import Post
 
 
@@ -11,3 +12,32 @@ class PostFilter(django_filters.FilterSet):
     class Meta:
         model = Post
         fields = ["category", "tag", "author", "status"]
+
+
+POST_LIST_ORDERING = ["id", "title", "created_at"]
+
+
+def filter_post_list(queryset, params):
+    """
+    Search, filters and ordering shared by the post list endpoints.
+    """
+    # Search
+    search = params.get("search")
+    if search:
+        queryset = queryset.filter(
+            Q(title__icontains=search) |
+            Q(content__icontains=search)
+        )
+
+    # Filter
+    filterset = PostFilter(params, queryset=queryset)
+    queryset = filterset.qs
+
+    # Ordering
+    ordering = params.get("ordering")
+    if ordering:
+        field = ordering.lstrip("-")
+        if field in POST_LIST_ORDERING:
+            queryset = queryset.order_by(ordering)
+
+    return queryset
@@ -0,0 +1,150 @@
+import hashlib
+from io import BytesIO
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.tasks import task
+
+
+VARIANT_LOCK_KEY = "posts:image-variants:{post_id}"
+VARIANT_LOCK_TIMEOUT = 120
+
+# EXIF orientations that swap width and height (rotated 90 or 270 degrees)
+ORIENTATION_TAG = 0x0112
+ROTATED_ORIENTATIONS = {5, 6, 7, 8}
+
+def variants_ready(post):
+    return bool(post.image) and post.image_variants.get("source") == post.image.name
+
+
+def schedule_variants(post_id):
+    """
+    Queue variant generation once the current transaction commits.
+    """
+    transaction.on_commit(lambda: generate_post_variants.enqueue(post_id))
+
+
+@task
+def generate_post_variants(post_id):
+    ensure_variants(post_id)
+
+
+def ensure_variants(post_id):
+    """
+    Variants of the post's current image, generated now if missing.
+    Returns None when the post has no image or another worker holds
+    the lock.
+    """
+    from .models import Post  #local import - Avoid Circular Import
+
+    post = Post.all_objects.filter(pk=post_id).first()
+    if post is None or not post.image:
+        return None
+    if variants_ready(post):
+        return post.image_variants
+
+    lock = VARIANT_LOCK_KEY.format(post_id=post_id)
+    if not cache.add(lock, 1, timeout=VARIANT_LOCK_TIMEOUT):
+        return None
+
+    try:
+        variants = generate_variants(post.image)
+        updated = Post.all_objects.filter(pk=post.pk, image=post.image.name).update(
+            image_variants=variants
+        )
+        if not updated:
+            # Image replaced meanwhile; these variants belong to no one
+            delete_variants(variants)
+            return None
+
+        delete_variants(post.image_variants)
+        return variants
+    finally:
+        cache.delete(lock)
+
+
+def generate_variants(image_file):
+    """
+    Decode the original once and write one WebP per configured width
+    (never upscaled). JPEGs are decoded at a reduced scale when the
+    largest variant allows it.
+    """
+    from PIL import Image, ImageOps  # local import - Pillow loads on first use, not at boot
+
+    widths = sorted(set(settings.IMAGE_VARIANT_WIDTHS))
+    digest = hashlib.sha256(image_file.name.encode()).hexdigest()[:12]
+
+    with image_file.open("rb") as f, Image.open(f) as image:
+        # Before draft(), which shrinks image.size to the reduced decode
+        original_width, height = image.size
+        if image.getexif().get(ORIENTATION_TAG) in ROTATED_ORIENTATIONS:
+            original_width = height
+
+        image.draft("RGB", (widths[-1], widths[-1]))
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            has_alpha = image.mode in ("LA", "PA") or "transparency" in image.info
+            image = image.convert("RGBA" if has_alpha else "RGB")
+
+        files = {}
+        variants = {}
+        for width in widths:
+            target = min(width, original_width)
+            if target not in files:
+                files[target] = _save_variant(image, target, digest)
+            variants[str(width)] = files[target]
+
+    return {
+        "source": image_file.name,
+        "width": original_width,
+        "variants": variants,
+    }
+
+
+def _save_variant(image, width, digest):
+    from PIL import Image  # local import - Pillow loads on first use, not at boot
+
+    if width < image.width:
+        height = max(1, round(image.height * width / image.width))
+        image = image.resize((width, height), Image.LANCZOS, reducing_gap=2.0)
+
+    buffer = BytesIO()
+    image.save(buffer, "WEBP", quality=settings.IMAGE_VARIANT_QUALITY, method=4)
+    return default_storage.save(
+        f"posts/images/variants/{digest}-{width}.webp",
+        ContentFile(buffer.getvalue()),
+    )
+
+
+def delete_variants(variants):
+    for name in set(variants.get("variants", {}).values()):
+        default_storage.delete(name)
+
+
+def variant_url(post, width):
+    """
+    Media URL of a generated variant, or None.
+    """
+    if not variants_ready(post):
+        return None
+    name = post.image_variants["variants"].get(str(width))
+    return default_storage.url(name) if name else None
+
+
+def variant_blob_names():
+    """
+    Media files referenced by image_variants of live, soft-deleted and
+    archived posts (MEDIA_BLOB_REFERENCES collector).
+    """
+    from apps.core.models import ArchivedRecord  #local import - Avoid Circular Import
+    from .models import Post  #local import - Avoid Circular Import
+
+    live = Post._base_manager.values_list("image_variants", flat=True)
+    archived = ArchivedRecord.objects.filter(
+        model_label=Post._meta.label_lower
+    ).values_list("payload__fields__image_variants", flat=True)
+
+    for variants in (*live.iterator(), *archived.iterator()):
+        yield from (variants or {}).get("variants", {}).values()
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from apps.posts.uploads import prune_upload_sessions
+
+
+class Command(BaseCommand):
+    help = "Delete expired resumable image upload sessions and their part files."
+
+    def handle(self, *args, **options):
+        count = prune_upload_sessions()
+        self.stdout.write(f"Pruned {count} upload sessions")
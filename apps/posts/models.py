@@ -1,10 +1,22 @@
+import uuid
+from pathlib import Path
 from django.conf import settings
-from django.db import models, transaction
+from django.db import models
 from apps.core.base import BaseModel
 from apps.categories.models import Category
 from apps.tags.models import Tag
+from apps.comments.cache import invalidate_threads
+from apps.users.stats import (
+    apply_author_deltas,
+    comment_deltas,
+    counter_change,
+    merge_deltas,
+    post_counter,
+    post_deltas,
+    refresh_top_tags,
+)
+from .images import schedule_variants, variants_ready
 from django.utils.text import slugify
-from django.utils import timezone
 
 
 class Post(BaseModel):
@@ -34,6 +46,9 @@ class Post(BaseModel):
         blank=True
     )
 
+    # Written only by apps.posts.images (queryset update), never by save()
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
+
     category = models.ForeignKey(
         Category,
         on_delete=models.SET_NULL,
@@ -58,43 +73,52 @@ class Post(BaseModel):
     def __str__(self):
         return self.title
 
-    def soft_delete(self):
+    @classmethod
+    def soft_delete_rows(cls, pks, deleted_at):
         """
-        Soft-delete the post and all related comments.
+        Soft-delete the posts and all related comments.
         """
-        with transaction.atomic():
-            if self.is_deleted:
-                return
+        from apps.comments.models import Comment  #local import - Avoid Circular Import
 
-            deleted_at = timezone.now()
+        posts = cls._base_manager.filter(pk__in=pks, is_deleted=False)
+        comments = Comment.objects.filter(post_id__in=pks)
+        deltas = merge_deltas(post_deltas(posts, -1), comment_deltas(comments, -1))
 
-            self.is_deleted = True
-            self.deleted_at = deleted_at
-            self.save(update_fields=["is_deleted", "deleted_at"])
+        count = super().soft_delete_rows(pks, deleted_at)
 
-            self.comments.update(
-                is_deleted=True,
-                deleted_at=deleted_at,
-            )
+        comments.update(
+            is_deleted=True,
+            deleted_at=deleted_at,
+        )
+        invalidate_threads(*pks)
+        apply_author_deltas(deltas)
+        refresh_top_tags(*deltas)
+        return count
 
-    def restore(self):
+    @classmethod
+    def restore_rows(cls, pks):
         """
-        Restore the post and all related comments.
+        Restore the posts and all related comments.
         """
         from apps.comments.models import Comment  #local import - Avoid Circular Import
 
-        with transaction.atomic():
-            if not self.is_deleted:
-                return
+        posts = cls._base_manager.filter(pk__in=pks, is_deleted=True)
+        comments = Comment.all_objects.filter(post_id__in=pks, is_deleted=True)
+        deltas = merge_deltas(post_deltas(posts, 1), comment_deltas(comments, 1))
+
+        count = super().restore_rows(pks)
 
-            self.is_deleted = False
-            self.deleted_at = None
-            self.save(update_fields=["is_deleted", "deleted_at"])
+        comments.update(
+            is_deleted=False,
+            deleted_at=None,
+        )
+        invalidate_threads(*pks)
+        apply_author_deltas(deltas)
+        refresh_top_tags(*deltas)
+        return count
 
-            Comment.all_objects.filter(post=self).update(
-                is_deleted=False,
-                deleted_at=None,
-            )
+    def stats_counter(self):
+        return None if self.is_deleted else post_counter(self.status)
 
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -108,4 +132,61 @@ class Post(BaseModel):
 
             self.slug = slug
 
+        # Never overwrite variants a background worker stored meanwhile
+        if not self._state.adding and kwargs.get("update_fields") is None and not kwargs.get("force_insert"):
+            kwargs["update_fields"] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "image_variants"
+            ]
+
+        # The rollup counter this post counted in before the write
+        before = None
+        if not self._state.adding:
+            row = Post._base_manager.filter(pk=self.pk).values("status", "is_deleted").first()
+            if row is not None and not row["is_deleted"]:
+                before = post_counter(row["status"])
+
         super().save(*args, **kwargs)
+
+        after = self.stats_counter()
+        apply_author_deltas(counter_change(self.author_id, before, after), active={self.author_id: self.updated_at})
+        if before != after and "published_posts" in (before, after):
+            refresh_top_tags(self.author_id)
+
+        if self.image and not variants_ready(self):
+            schedule_variants(self.pk)
+
+
+class ImageUpload(models.Model):
+    """
+    Resumable upload session for a post image. Chunks are appended to
+    a part file under IMAGE_UPLOAD_SESSION_DIR; on completion the image
+    is validated and stored in `image`, ready to attach to a post.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="image_uploads"
+    )
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0)
+    image = models.FileField(upload_to="posts/images/", blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        ordering = ("created_at",)
+
+    @property
+    def part_path(self):
+        return Path(settings.IMAGE_UPLOAD_SESSION_DIR) / f"{self.pk}.part"
+
+    @property
+    def is_complete(self):
+        return bool(self.image)
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
@@ -1,13 +1,60 @@
+import os
+from django.conf import settings
+from django.urls import reverse
+from django.utils.text import get_valid_filename
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
-from .models import Post
+from django.core.exceptions import SuspiciousFileOperation, ValidationError as DjangoValidationError
+from .images import variant_url
+from . import uploads
+from .models import ImageUpload, Post
 from apps.categories.models import Category
 from apps.tags.models import Tag
+from apps.users.stats import refresh_top_tags
+
+
+@extend_schema_field({
+    "type": "object",
+    "additionalProperties": {"type": "string", "format": "uri"},
+})
+class ImageVariantsField(serializers.Field):
+    """
+    {width: url} of the post image's WebP variants. Until they exist the
+    URLs point at the endpoint that generates them on first request.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs["source"] = "*"
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, post):
+        if not post.image:
+            return {}
+
+        urls = {}
+        for width in settings.IMAGE_VARIANT_WIDTHS:
+            url = variant_url(post, width) or reverse(
+                "post-image-variant", kwargs={"id": post.id, "width": width}
+            )
+            urls[str(width)] = url
+        return urls
+
+
+def post_queryset():
+    # Everything the post serializers read
+    return (
+        Post.objects
+        .select_related("author", "category")
+        .prefetch_related("tags")
+    )
 
 
 class PostListSerializer(serializers.ModelSerializer):
     author = serializers.StringRelatedField()
     category = serializers.StringRelatedField()
     tags = serializers.StringRelatedField(many=True)
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Post
@@ -19,6 +66,7 @@ class PostListSerializer(serializers.ModelSerializer):
             "category",
             "tags",
             "status",
+            "image_variants",
             "created_at",
         )
 
@@ -27,6 +75,7 @@ class PostDetailSerializer(serializers.ModelSerializer):
     author = serializers.StringRelatedField()
     category = serializers.StringRelatedField()
     tags = serializers.StringRelatedField(many=True)
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Post
@@ -58,6 +107,16 @@ class PostCreateUpdateSerializer(serializers.ModelSerializer):
         required=False
     )
 
+    # Plain FileField: the image is checked from its headers only
+    image = serializers.FileField(required=False, allow_null=True)
+
+    # Completed resumable upload, used instead of `image`
+    image_upload = serializers.PrimaryKeyRelatedField(
+        queryset=ImageUpload.objects.exclude(image=""),
+        required=False,
+        write_only=True
+    )
+
     class Meta:
         model = Post
         fields = (
@@ -66,11 +125,95 @@ class PostCreateUpdateSerializer(serializers.ModelSerializer):
             "status",
             "category",
             "tags",
+            "image",
+            "image_upload",
         )
 
+    def validate_image(self, image):
+        if image is None:
+            return None
+        try:
+            return uploads.validate_image_upload(image)
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError(exc.messages)
+
+    def validate_image_upload(self, upload):
+        request = self.context.get("request")
+        if request is None or upload.owner_id != request.user.pk:
+            raise serializers.ValidationError("Upload not found.")
+        return upload
+
+    def validate(self, attrs):
+        if attrs.get("image") and attrs.get("image_upload"):
+            raise serializers.ValidationError("Send either image or image_upload, not both.")
+        return attrs
+
+    def create(self, validated_data):
+        upload = validated_data.pop("image_upload", None)
+        image = validated_data.get("image")
+        post = super().create(validated_data)
+        self.close_image(image)
+        if upload is not None:
+            uploads.attach_upload(upload, post)
+
+        # Tags are set after Post.save(); top tags need them
+        refresh_top_tags(post.author_id)
+        return post
+
     def update(self, instance, validated_data):
         request = self.context.get("request")
         if request:
             instance.updated_by = request.user
 
-        return super().update(instance, validated_data)
+        upload = validated_data.pop("image_upload", None)
+        image = validated_data.get("image")
+        tags_changed = "tags" in validated_data
+        post = super().update(instance, validated_data)
+        self.close_image(image)
+        if upload is not None:
+            uploads.attach_upload(upload, post)
+
+        if tags_changed:
+            refresh_top_tags(post.author_id)
+        return post
+
+    def close_image(self, image):
+        # The stripped copy is not in request.FILES, so Django won't close
+        # (and clean up) its temporary file at the end of the request
+        if image is not None:
+            image.close()
+
+
+class ImageUploadSerializer(serializers.ModelSerializer):
+    complete = serializers.BooleanField(source="is_complete", read_only=True)
+    image = serializers.FileField(read_only=True, use_url=True)
+
+    class Meta:
+        model = ImageUpload
+        fields = (
+            "id",
+            "filename",
+            "size",
+            "offset",
+            "complete",
+            "image",
+            "expires_at",
+        )
+        read_only_fields = ("id", "offset", "expires_at")
+
+    def validate_filename(self, filename):
+        # Stored as the image name on completion: clean it up front
+        try:
+            return get_valid_filename(os.path.basename(filename))
+        except SuspiciousFileOperation:
+            raise serializers.ValidationError("Enter a valid file name.")
+
+    def validate_size(self, size):
+        max_bytes = settings.IMAGE_UPLOAD_MAX_BYTES
+        if not 0 < size <= max_bytes:
+            raise serializers.ValidationError(f"Image files may be at most {max_bytes} bytes.")
+        return size
+
+
+class ImageUploadCompleteSerializer(serializers.Serializer):
+    post = serializers.IntegerField(required=False, allow_null=True, min_value=1)
@@ -0,0 +1,68 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from apps.users.models import User
+from apps.comments.models import Comment
+from apps.posts.models import Post
+
+
+class AsyncReadViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="author", email="author@example.com", password="Newx123!"
+        )
+        self.post = Post.objects.create(
+            title="Published", content="...", author=self.user,
+            status=Post.Status.PUBLISHED,
+        )
+        self.draft = Post.objects.create(title="Draft", content="...", author=self.user)
+
+        parent = None
+        for depth in range(4):
+            parent = Comment.objects.create(
+                post=self.post, author=self.user, content=f"depth {depth}", parent=parent
+            )
+
+        self.auth = {"Authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+
+    async def test_post_list_matches_sync_endpoint(self):
+        response = await self.async_client.get("/api/async/posts/?ordering=-id")
+        expected = await self.async_client.get("/api/posts/?ordering=-id")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["results"], expected.json()["results"])
+        self.assertEqual(response.json()["count"], 1)
+
+    async def test_drafts_keep_their_visibility_rules(self):
+        response = await self.async_client.get("/api/async/posts/?status=draft")
+        self.assertEqual(response.status_code, 403)
+
+        url = f"/api/async/posts/{self.draft.slug}/"
+        self.assertEqual((await self.async_client.get(url)).status_code, 403)
+
+        response = await self.async_client.get(url, headers=self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["title"], "Draft")
+
+    async def test_comment_thread_is_fully_prefetched(self):
+        response = await self.async_client.get(
+            f"/api/async/posts/{self.post.slug}/comments/"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        thread = response.json()["results"][0]
+        for depth in range(3):
+            thread = thread["replies"][0]
+        self.assertEqual(thread["content"], "depth 3")
+
+    async def test_tag_and_category_lists(self):
+        for url in ("/api/async/tags/", "/api/async/categories/"):
+            response = await self.async_client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["count"], 0)
+
+    async def test_invalid_page_is_not_found(self):
+        response = await self.async_client.get("/api/async/tags/?page=5")
+
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,84 @@
+import tempfile
+from io import BytesIO
+from unittest import mock
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+from apps.users.models import User
+from apps.posts import images
+from apps.posts.models import Post
+from apps.posts.serializers import PostDetailSerializer
+
+
+def png(width, height):
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), "red").save(buffer, "PNG")
+    return SimpleUploadedFile("hero.png", buffer.getvalue(), content_type="image/png")
+
+
+@override_settings(IMAGE_VARIANT_WIDTHS=[320, 640, 1280])
+class ImageVariantTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        override = self.settings(MEDIA_ROOT=media_root.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.user = User.objects.create_user(
+            username="author", email="author@example.com", password="Newx123!"
+        )
+        self.post = Post.objects.create(
+            title="Hero", content="...", author=self.user,
+            status=Post.Status.PUBLISHED, image=png(800, 400),
+        )
+
+    def test_variants_come_from_a_single_decode(self):
+        with mock.patch.object(Image, "open", wraps=Image.open) as image_open:
+            variants = images.ensure_variants(self.post.id)
+
+        self.assertEqual(image_open.call_count, 1)
+        self.assertEqual(variants["width"], 800)
+
+        # 1280 is never upscaled past the 800px original
+        names = variants["variants"]
+        with Image.open(self.post.image.storage.open(names["320"])) as variant:
+            self.assertEqual((variant.format, variant.size), ("WEBP", (320, 160)))
+        with Image.open(self.post.image.storage.open(names["1280"])) as variant:
+            self.assertEqual(variant.size, (800, 400))
+
+    def test_width_is_the_original_not_the_draft_decode(self):
+        buffer = BytesIO()
+        exif = Image.Exif()
+        exif[0x0112] = 6  # rotated 90 degrees: 2800 wide once upright
+        Image.new("RGB", (5600, 2800), "red").save(buffer, "JPEG", exif=exif.tobytes())
+        self.post.image = SimpleUploadedFile("tall.jpg", buffer.getvalue(), content_type="image/jpeg")
+        self.post.save()
+
+        variants = images.ensure_variants(self.post.id)
+
+        # draft() decodes at half scale: 1400 wide once upright
+        self.assertEqual(variants["width"], 2800)
+        with Image.open(self.post.image.storage.open(variants["variants"]["1280"])) as variant:
+            self.assertEqual(variant.size, (1280, 2560))
+
+    def test_variant_urls_are_lazy_until_generated(self):
+        urls = PostDetailSerializer(self.post).data["image_variants"]
+        self.assertEqual(urls["640"], f"/api/posts/{self.post.id}/image/640/")
+
+        response = self.client.get(urls["640"])
+        self.assertEqual(response.status_code, 302)
+
+        self.post.refresh_from_db()
+        urls = PostDetailSerializer(self.post).data["image_variants"]
+        self.assertEqual(response["Location"], urls["640"])
+        self.assertTrue(urls["640"].startswith("/media/posts/images/variants/"))
+
+    def test_save_keeps_variants_stored_meanwhile(self):
+        images.ensure_variants(self.post.id)
+
+        self.post.title = "Renamed"
+        self.post.save()
+
+        self.post.refresh_from_db()
+        self.assertTrue(images.variants_ready(self.post))
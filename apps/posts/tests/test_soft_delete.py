@@ -0,0 +1,58 @@
+from unittest import mock
+from django.test import TestCase
+from apps.users.models import User
+from apps.comments.models import Comment
+from apps.posts.models import Post
+
+
+class SetBasedSoftDeleteTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="author", email="author@example.com", password="Newx123!"
+        )
+        self.posts = [
+            Post.objects.create(title=f"Post {i}", content="...", author=self.user)
+            for i in range(5)
+        ]
+        for post in self.posts:
+            Comment.objects.create(post=post, author=self.user, content="hi")
+
+    def test_soft_delete_cascades_to_comments(self):
+        count = Post.all_objects.filter(
+            pk__in=[p.pk for p in self.posts[:3]]
+        ).soft_delete()
+
+        self.assertEqual(count, 3)
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertEqual(Comment.objects.count(), 2)
+
+    def test_restore_cascades_to_comments(self):
+        Post.all_objects.all().soft_delete()
+        count = Post.all_objects.all().restore()
+
+        self.assertEqual(count, 5)
+        self.assertEqual(Comment.objects.count(), 5)
+
+    def test_soft_delete_runs_in_chunks(self):
+        with mock.patch("apps.core.base.SOFT_DELETE_CHUNK_SIZE", 2):
+            # 3 chunks x (pk select + savepoint + post deltas + comment deltas
+            # + post update + comment update + stats insert + stats update
+            # + release) + 1 terminating pk select
+            with self.assertNumQueries(28):
+                Post.all_objects.all().soft_delete()
+
+        self.assertEqual(Post.objects.count(), 0)
+
+    def test_comment_restore_skips_deleted_posts(self):
+        post = self.posts[0]
+        post.soft_delete()
+
+        self.assertEqual(Comment.all_objects.filter(post=post).restore(), 0)
+        self.assertEqual(Comment.objects.filter(post=post).count(), 0)
+
+    def test_user_soft_delete_deactivates(self):
+        User.all_objects.filter(pk=self.user.pk).soft_delete()
+        user = User.all_objects.get(pk=self.user.pk)
+
+        self.assertTrue(user.is_deleted)
+        self.assertFalse(user.is_active)
@@ -0,0 +1,249 @@
+import struct
+import tempfile
+import zlib
+from datetime import timedelta
+from io import BytesIO
+from unittest import mock
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from PIL import Image
+from rest_framework_simplejwt.tokens import AccessToken
+from apps.users.models import User
+from apps.posts.models import ImageUpload, Post
+from apps.posts.uploads import UploadConflict, append_chunk, strip_metadata
+
+
+def jpeg_with_exif(orientation=6):
+    exif = Image.Exif()
+    exif[0x0112] = orientation
+    exif[0x010F] = "CameraMaker"  # Make
+    buffer = BytesIO()
+    Image.new("RGB", (40, 20), "blue").save(buffer, "JPEG", exif=exif.tobytes())
+    return buffer.getvalue()
+
+
+def png_claiming(width, height):
+    buffer = BytesIO()
+    Image.new("RGB", (1, 1)).save(buffer, "PNG")
+    data = bytearray(buffer.getvalue())
+    ihdr = struct.pack(">II", width, height) + bytes(data[24:29])
+    data[16:29] = ihdr
+    data[29:33] = struct.pack(">I", zlib.crc32(b"IHDR" + ihdr))
+    return bytes(data)
+
+
+class ImageUploadTests(TestCase):
+    url = "/api/posts/"
+
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        override = self.settings(MEDIA_ROOT=media_root.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        user = User.objects.create_user(
+            username="author", email="author@example.com", password="Newx123!"
+        )
+        self.auth = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(user)}"}
+
+    def upload(self, name, content):
+        return self.client.post(
+            self.url,
+            {
+                "title": "With image",
+                "content": "...",
+                "image": SimpleUploadedFile(name, content),
+            },
+            **self.auth,
+        )
+
+    def test_exif_is_stripped_but_orientation_kept(self):
+        response = self.upload("photo.jpg", jpeg_with_exif())
+        self.assertEqual(response.status_code, 201)
+
+        post = Post.objects.get()
+        with Image.open(post.image.path) as image:
+            exif = image.getexif()
+            self.assertEqual(exif.get(0x0112), 6)
+            self.assertNotIn(0x010F, exif)
+            image.load()
+
+    def test_pixel_limit_is_checked_from_the_header(self):
+        with self.settings(IMAGE_UPLOAD_MAX_PIXELS=1_000_000):
+            response = self.upload("bomb.png", png_claiming(20_000, 20_000))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("pixels", response.json()["image"][0])
+
+    def test_byte_limit_stops_the_upload(self):
+        with self.settings(IMAGE_UPLOAD_MAX_BYTES=100):
+            response = self.upload("photo.jpg", jpeg_with_exif())
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("bytes", response.json()["image"][0])
+
+    def test_webp_metadata_chunks_are_removed(self):
+        buffer = BytesIO()
+        exif = Image.Exif()
+        exif[0x010F] = "CameraMaker"
+        Image.new("RGB", (8, 8)).save(buffer, "WEBP", exif=exif.tobytes())
+        upload = SimpleUploadedFile("a.webp", buffer.getvalue())
+
+        cleaned = strip_metadata(upload, "WEBP")
+
+        with Image.open(cleaned) as image:
+            self.assertNotIn(0x010F, image.getexif())
+            image.load()
+
+
+class ResumableUploadTests(TestCase):
+    url = "/api/uploads/images/"
+
+    def setUp(self):
+        for setting in ("MEDIA_ROOT", "IMAGE_UPLOAD_SESSION_DIR"):
+            directory = tempfile.TemporaryDirectory()
+            self.addCleanup(directory.cleanup)
+            override = self.settings(**{setting: directory.name})
+            override.enable()
+            self.addCleanup(override.disable)
+
+        self.user = User.objects.create_user(
+            username="author", email="author@example.com", password="Newx123!"
+        )
+        self.auth = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(self.user)}"}
+        self.content = jpeg_with_exif()
+
+    def start(self, content):
+        response = self.client.post(
+            self.url, {"filename": "photo.jpg", "size": len(content)}, **self.auth
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.json()["id"]
+
+    def send(self, upload_id, offset, chunk):
+        return self.client.patch(
+            f"{self.url}{upload_id}/",
+            chunk,
+            content_type="application/offset+octet-stream",
+            HTTP_UPLOAD_OFFSET=str(offset),
+            **self.auth,
+        )
+
+    def send_all(self, upload_id, content, chunk_size=100):
+        for offset in range(0, len(content), chunk_size):
+            response = self.send(upload_id, offset, content[offset:offset + chunk_size])
+            self.assertEqual(response.status_code, 200)
+
+    def test_chunks_resume_and_attach_to_a_new_post(self):
+        upload_id = self.start(self.content)
+        self.send(upload_id, 0, self.content[:100])
+
+        # A retried chunk is rejected with the offset to resume from
+        response = self.send(upload_id, 0, self.content[:100])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response["Upload-Offset"], "100")
+
+        response = self.send(upload_id, 100, self.content[100:])
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post(f"{self.url}{upload_id}/complete/", **self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["complete"])
+
+        response = self.client.post(
+            "/api/posts/",
+            {"title": "With image", "content": "...", "image_upload": upload_id},
+            **self.auth,
+        )
+        self.assertEqual(response.status_code, 201)
+
+        post = Post.objects.get()
+        with Image.open(post.image.path) as image:
+            self.assertNotIn(0x010F, image.getexif())
+        self.assertFalse(ImageUpload.objects.exists())
+
+    def test_complete_attaches_to_an_existing_post(self):
+        post = Post.objects.create(title="Post", content="...", author=self.user)
+        upload_id = self.start(self.content)
+        self.send_all(upload_id, self.content)
+
+        response = self.client.post(
+            f"{self.url}{upload_id}/complete/", {"post": post.id}, **self.auth
+        )
+
+        self.assertEqual(response.status_code, 200)
+        post.refresh_from_db()
+        self.assertTrue(post.image.name.startswith("posts/images/"))
+
+    def test_chunk_that_lost_the_race_is_rejected(self):
+        upload_id = self.start(self.content)
+        stale = ImageUpload.objects.get(pk=upload_id)
+        self.send(upload_id, 0, self.content[:100])
+
+        # The body is read before the offset is checked under the lock
+        with self.assertRaises(UploadConflict):
+            append_chunk(stale, BytesIO(b"x" * 100), 0, 100)
+
+        upload = ImageUpload.objects.get(pk=upload_id)
+        self.assertEqual(upload.offset, 100)
+        self.assertEqual(upload.part_path.read_bytes(), self.content[:100])
+
+    def test_invalid_post_is_rejected(self):
+        upload_id = self.start(self.content)
+        self.send_all(upload_id, self.content)
+
+        response = self.client.post(
+            f"{self.url}{upload_id}/complete/", {"post": "abc"}, **self.auth
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("post", response.json())
+        self.assertFalse(ImageUpload.objects.get(pk=upload_id).is_complete)
+
+    def test_filename_is_cleaned_when_the_session_starts(self):
+        response = self.client.post(
+            self.url, {"filename": "../../etc/my photo.jpg", "size": 10}, **self.auth
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["filename"], "my_photo.jpg")
+
+        for filename in ("..", "dir/", "???"):
+            with self.subTest(filename=filename):
+                response = self.client.post(
+                    self.url, {"filename": filename, "size": 10}, **self.auth
+                )
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("filename", response.json())
+
+    def test_uploads_are_private_to_their_owner(self):
+        upload_id = self.start(self.content)
+        other = User.objects.create_user(
+            username="other", email="other@example.com", password="Newx123!"
+        )
+        auth = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(other)}"}
+
+        response = self.client.get(f"{self.url}{upload_id}/", **auth)
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_invalid_image_ends_the_session(self):
+        content = b"not an image" * 10
+        upload_id = self.start(content)
+        self.send_all(upload_id, content)
+
+        response = self.client.post(f"{self.url}{upload_id}/complete/", **self.auth)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ImageUpload.objects.exists())
+
+    def test_expired_sessions_are_pruned(self):
+        upload_id = self.start(self.content)
+        upload = ImageUpload.objects.get(pk=upload_id)
+        ImageUpload.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        call_command("prune_image_uploads", stdout=mock.Mock())
+
+        self.assertFalse(ImageUpload.objects.exists())
+        self.assertFalse(upload.part_path.exists())
@@ -0,0 +1,343 @@
+import mimetypes
+import shutil
+import struct
+import tempfile
+from datetime import timedelta
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import TemporaryUploadedFile, UploadedFile
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.db import transaction
+from django.http import UnreadablePostError
+from django.utils import timezone
+from .models import ImageUpload
+
+
+COPY_CHUNK_SIZE = 64 * 1024
+
+# JPEG segments dropped when stripping metadata:
+# APP1 (Exif / XMP), APP13 (IPTC) and comments
+JPEG_DROP_MARKERS = {0xE1, 0xED, 0xFE}
+JPEG_ORIENTATION_TAG = 0x0112
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+PNG_DROP_CHUNKS = {b"eXIf", b"tEXt", b"zTXt", b"iTXt", b"tIME"}
+
+WEBP_DROP_CHUNKS = {b"EXIF", b"XMP "}
+WEBP_VP8X_METADATA_FLAGS = 0x08 | 0x04
+
+
+class LimitedTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    """
+    Stream every uploaded file to a temporary file, never to memory.
+    Bytes past IMAGE_UPLOAD_MAX_BYTES are discarded and the file is
+    flagged, so an oversized upload costs neither memory nor disk.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+        self.file.upload_truncated = False
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > settings.IMAGE_UPLOAD_MAX_BYTES:
+            self.file.upload_truncated = True
+            return None
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        return super().file_complete(min(file_size, settings.IMAGE_UPLOAD_MAX_BYTES))
+
+
+def validate_image_upload(upload):
+    """
+    Check size, format and dimensions from the file header (no pixel
+    decode), then return a copy stripped of EXIF and text metadata.
+    """
+    from PIL import Image  #local import - Pillow loads on first use, not at boot
+
+    max_bytes = settings.IMAGE_UPLOAD_MAX_BYTES
+    if getattr(upload, "upload_truncated", False) or upload.size > max_bytes:
+        raise ValidationError(f"Image files may be at most {max_bytes} bytes.")
+
+    upload.seek(0)
+    try:
+        with Image.open(upload) as image:
+            image_format = image.format
+            width, height = image.size
+            orientation = (
+                image.getexif().get(JPEG_ORIENTATION_TAG)
+                if image_format == "JPEG" else None
+            )
+    except Image.DecompressionBombError:
+        width = height = None
+        image_format = None
+    except OSError:
+        raise ValidationError("Upload a valid image.")
+
+    max_pixels = settings.IMAGE_UPLOAD_MAX_PIXELS
+    if width is None or width * height > max_pixels:
+        raise ValidationError(f"Images may have at most {max_pixels} pixels.")
+
+    if image_format not in settings.IMAGE_UPLOAD_FORMATS:
+        raise ValidationError(
+            f"Unsupported image format. Use one of: {', '.join(settings.IMAGE_UPLOAD_FORMATS)}."
+        )
+
+    return strip_metadata(upload, image_format, orientation)
+
+
+def strip_metadata(upload, image_format, orientation=None):
+    """
+    Losslessly rewrite the container without metadata, streaming in
+    chunks. JPEGs keep their orientation in a minimal EXIF block.
+    """
+    cleaned = TemporaryUploadedFile(
+        upload.name, upload.content_type, 0, upload.charset, upload.content_type_extra
+    )
+    upload.seek(0)
+
+    if image_format == "JPEG":
+        _strip_jpeg(upload, cleaned, orientation)
+    elif image_format == "PNG":
+        _strip_png(upload, cleaned)
+    elif image_format == "WEBP":
+        _strip_webp(upload, cleaned)
+    else:
+        _copy(upload, cleaned)
+
+    cleaned.size = cleaned.tell()
+    cleaned.seek(0)
+    return cleaned
+
+
+class UploadConflict(Exception):
+    """
+    The request does not match the upload session's current state.
+    """
+
+
+def create_upload_session(owner, filename, size):
+    upload = ImageUpload.objects.create(
+        owner=owner,
+        filename=filename,
+        size=size,
+        expires_at=timezone.now() + timedelta(hours=settings.IMAGE_UPLOAD_SESSION_TTL_HOURS),
+    )
+    upload.part_path.parent.mkdir(parents=True, exist_ok=True)
+    upload.part_path.touch(exist_ok=False)
+    return upload
+
+
+def append_chunk(upload, stream, offset, length):
+    """
+    Append `length` bytes read from `stream` at `offset`. The body is
+    streamed to a scratch file next to the part file with no
+    transaction open; the session row is then locked only to check the
+    offset is unchanged, copy the scratch file in and advance the
+    offset. Bytes received before a client disconnect are kept:
+    returns (upload, chunk_complete).
+    """
+    _check_chunk(upload, offset, length)
+
+    written = 0
+    with tempfile.TemporaryFile(dir=upload.part_path.parent) as scratch:
+        try:
+            while written < length:
+                chunk = stream.read(min(COPY_CHUNK_SIZE, length - written))
+                if not chunk:
+                    break
+                scratch.write(chunk)
+                written += len(chunk)
+        except (OSError, UnreadablePostError):
+            pass
+        scratch.seek(0)
+
+        with transaction.atomic():
+            upload = ImageUpload.objects.select_for_update().get(pk=upload.pk)
+            # Another chunk may have landed while this one was read
+            _check_chunk(upload, offset, length)
+
+            with open(upload.part_path, "r+b") as part:
+                # Drop any tail left by a write that was never recorded
+                part.truncate(offset)
+                part.seek(offset)
+                shutil.copyfileobj(scratch, part, COPY_CHUNK_SIZE)
+
+            upload.offset = offset + written
+            upload.save(update_fields=["offset"])
+
+    return upload, written == length
+
+
+def complete_upload_session(upload):
+    """
+    Validate the assembled file like a direct upload and store it.
+    Completing twice is a no-op; an invalid image ends the session.
+    """
+    try:
+        with transaction.atomic():
+            upload = ImageUpload.objects.select_for_update().get(pk=upload.pk)
+            if upload.is_complete:
+                return upload
+            if upload.offset != upload.size:
+                raise UploadConflict(f"Only {upload.offset} of {upload.size} bytes were received.")
+
+            content_type = mimetypes.guess_type(upload.filename)[0] or "application/octet-stream"
+            with open(upload.part_path, "rb") as part:
+                assembled = UploadedFile(part, upload.filename, content_type, upload.size)
+                cleaned = validate_image_upload(assembled)
+
+            try:
+                upload.image.save(upload.filename, cleaned, save=False)
+            finally:
+                cleaned.close()
+            upload.save(update_fields=["image"])
+    except ValidationError:
+        discard_upload_session(upload)
+        raise
+
+    upload.part_path.unlink(missing_ok=True)
+    return upload
+
+
+def attach_upload(upload, post, user=None):
+    """
+    Make a completed upload the post's image and end the session.
+    """
+    post.image = upload.image.name
+    if user is not None:
+        post.updated_by = user
+    post.save()
+    upload.delete()
+    return post
+
+
+def discard_upload_session(upload):
+    upload.part_path.unlink(missing_ok=True)
+    ImageUpload.objects.filter(pk=upload.pk).delete()
+
+
+def prune_upload_sessions(now=None):
+    """
+    Delete expired sessions and their part files. Images of completed
+    but never attached sessions are left to gc_media_blobs.
+    """
+    expired = ImageUpload.objects.filter(expires_at__lt=now or timezone.now())
+    count = 0
+    for upload in expired.iterator():
+        discard_upload_session(upload)
+        count += 1
+    return count
+
+
+def _check_chunk(upload, offset, length):
+    if upload.is_complete:
+        raise UploadConflict("Upload is already complete.")
+    if offset != upload.offset:
+        raise UploadConflict(f"Upload-Offset must be {upload.offset}.")
+    if offset + length > upload.size:
+        raise UploadConflict("Chunk extends past the declared upload size.")
+
+
+def _copy(src, dst, length=None):
+    while length is None or length > 0:
+        chunk = src.read(COPY_CHUNK_SIZE if length is None else min(COPY_CHUNK_SIZE, length))
+        if not chunk:
+            if length:
+                raise ValidationError("Upload a valid image.")
+            return
+        dst.write(chunk)
+        if length is not None:
+            length -= len(chunk)
+
+
+def _read_exact(src, size):
+    data = src.read(size)
+    if len(data) != size:
+        raise ValidationError("Upload a valid image.")
+    return data
+
+
+def _strip_jpeg(src, dst, orientation):
+    from PIL import Image  #local import - Pillow loads on first use, not at boot
+
+    dst.write(_read_exact(src, 2))  # SOI
+
+    if orientation not in (None, 1):
+        exif = Image.Exif()
+        exif[JPEG_ORIENTATION_TAG] = orientation
+        payload = exif.tobytes()
+        dst.write(b"\xff\xe1" + struct.pack(">H", len(payload) + 2) + payload)
+
+    while True:
+        marker = _read_exact(src, 2)
+        if marker[0] != 0xFF:
+            raise ValidationError("Upload a valid image.")
+        if marker[1] == 0xFF:
+            # Fill byte: re-read from the second 0xFF
+            src.seek(-1, 1)
+            continue
+
+        length = struct.unpack(">H", _read_exact(src, 2))[0]
+        if marker[1] in JPEG_DROP_MARKERS:
+            src.seek(length - 2, 1)
+            continue
+
+        dst.write(marker + struct.pack(">H", length))
+        if marker[1] == 0xDA:
+            # Start of scan: entropy-coded data and the rest follow as-is
+            _copy(src, dst)
+            return
+        _copy(src, dst, length - 2)
+
+
+def _strip_png(src, dst):
+    dst.write(_read_exact(src, len(PNG_SIGNATURE)))
+
+    while True:
+        header = src.read(8)
+        if len(header) < 8:
+            raise ValidationError("Upload a valid image.")
+        length, chunk_type = struct.unpack(">I4s", header)
+
+        if chunk_type in PNG_DROP_CHUNKS:
+            src.seek(length + 4, 1)  # data + CRC
+            continue
+
+        dst.write(header)
+        _copy(src, dst, length + 4)
+        if chunk_type == b"IEND":
+            return
+
+
+def _strip_webp(src, dst):
+    header = _read_exact(src, 12)
+    if header[:4] != b"RIFF" or header[8:] != b"WEBP":
+        raise ValidationError("Upload a valid image.")
+
+    # First pass: offsets of the chunks to keep, to size the new RIFF
+    chunks = []
+    while True:
+        chunk_header = src.read(8)
+        if len(chunk_header) < 8:
+            break
+        fourcc, size = struct.unpack("<4sI", chunk_header)
+        padded = size + (size & 1)
+        if fourcc not in WEBP_DROP_CHUNKS:
+            chunks.append((fourcc, src.tell(), size, padded))
+        src.seek(padded, 1)
+
+    riff_size = 4 + sum(8 + padded for _, _, _, padded in chunks)
+    dst.write(b"RIFF" + struct.pack("<I", riff_size) + b"WEBP")
+
+    for fourcc, offset, size, padded in chunks:
+        src.seek(offset)
+        dst.write(struct.pack("<4sI", fourcc, size))
+        if fourcc == b"VP8X":
+            flags = _read_exact(src, 1)[0] & ~WEBP_VP8X_METADATA_FLAGS
+            dst.write(bytes([flags]))
+            _copy(src, dst, padded - 1)
+        else:
+            _copy(src, dst, padded)
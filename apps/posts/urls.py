@@ -1,8 +1,27 @@
 from django.urls import path
-from .views import PostListCreateAPIView, PostDetailAPIView
+from .views import (
+    PostListCreateAPIView,
+    PostDetailAPIView,
+    PostImageVariantAPIView,
+    ImageUploadCreateAPIView,
+    ImageUploadDetailAPIView,
+    ImageUploadCompleteAPIView,
+)
+from .async_views import AsyncPostListView, AsyncPostDetailView
 
 urlpatterns = [
     path("posts/", PostListCreateAPIView.as_view()),
     path("posts/<int:id>/", PostDetailAPIView.as_view()),
+    path("posts/<int:id>/image/<int:width>/", PostImageVariantAPIView.as_view(), name="post-image-variant"),
     path("posts/<slug:slug>/", PostDetailAPIView.as_view()),
+
+    # Resumable image uploads
+    path("uploads/images/", ImageUploadCreateAPIView.as_view()),
+    path("uploads/images/<uuid:pk>/", ImageUploadDetailAPIView.as_view()),
+    path("uploads/images/<uuid:pk>/complete/", ImageUploadCompleteAPIView.as_view()),
+
+    # Async (ASGI) read endpoints
+    path("async/posts/", AsyncPostListView.as_view()),
+    path("async/posts/<int:id>/", AsyncPostDetailView.as_view()),
+    path("async/posts/<slug:slug>/", AsyncPostDetailView.as_view()),
 ]
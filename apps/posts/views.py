@@ -2,18 +2,33 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from django.conf import settings
+from django.http import HttpResponseRedirect
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
-from rest_framework.pagination import PageNumberPagination
+from django.core.exceptions import ValidationError as DjangoValidationError
+from apps.core.pagination import PageNumberPagination
+from apps.core.timing import timed
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse
-from .models import Post
+from .models import ImageUpload, Post
 from .serializers import (
     PostListSerializer,
     PostDetailSerializer,
     PostCreateUpdateSerializer,
+    ImageUploadSerializer,
+    ImageUploadCompleteSerializer,
+    post_queryset,
 )
 from .permissions import IsAuthorOrAdmin
-from .filters import PostFilter
+from .images import ensure_variants, variant_url
+from .uploads import (
+    UploadConflict,
+    append_chunk,
+    attach_upload,
+    complete_upload_session,
+    create_upload_session,
+    discard_upload_session,
+)
+from .filters import filter_post_list
 
 
 class PostPagination(PageNumberPagination):
@@ -72,7 +87,7 @@ class PostListCreateAPIView(APIView):
 
     def get(self, request):
 
-        queryset = Post.objects.order_by("id") # .filter(is_deleted=False)
+        queryset = post_queryset().order_by("id") # .filter(is_deleted=False)
 
         # Status 
         status_param = request.query_params.get("status")
@@ -87,33 +102,17 @@ class PostListCreateAPIView(APIView):
         else:
             queryset = queryset.filter(status=Post.Status.PUBLISHED)
 
-        # Search
-        search = request.query_params.get("search")
-        if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(content__icontains=search)
-            )
-
-        # Filter
-        filterset = PostFilter(request.GET, queryset=queryset)
-        queryset = filterset.qs
-
-        # Ordering
-        ordering = request.query_params.get("ordering")
-        allowed_ordering = ["id", "title", "created_at"]
-
-        if ordering:
-            field = ordering.lstrip("-")
-            if field in allowed_ordering:
-                queryset = queryset.order_by(ordering)
+        queryset = filter_post_list(queryset, request.query_params)
 
         # Pagination
         paginator = PostPagination()
         paginated_queryset = paginator.paginate_queryset(queryset, request)
         serializer = PostListSerializer(paginated_queryset, many=True)
 
-        return paginator.get_paginated_response(serializer.data)
+        with timed("serialize"):
+            data = serializer.data
+
+        return paginator.get_paginated_response(data)
 
     @extend_schema(
         summary="Create a post",
@@ -131,7 +130,10 @@ class PostListCreateAPIView(APIView):
     )
 
     def post(self, request):
-        serializer = PostCreateUpdateSerializer(data=request.data)
+        serializer = PostCreateUpdateSerializer(
+            data=request.data,
+            context={"request": request},
+        )
         serializer.is_valid(raise_exception=True)
 
         try:
@@ -204,7 +206,10 @@ class PostDetailAPIView(APIView):
                     status=status.HTTP_403_FORBIDDEN,
                 )
 
-        return Response(PostDetailSerializer(post).data)
+        with timed("serialize"):
+            data = PostDetailSerializer(post).data
+
+        return Response(data)
 
 
     # Swagger
@@ -270,3 +275,249 @@ class PostDetailAPIView(APIView):
 
         post.soft_delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class PostImageVariantAPIView(APIView):
+    """
+    GET (Public)
+    """
+
+    permission_classes = [AllowAny]
+
+    @extend_schema(
+        summary="Post image variant",
+        description=(
+            "Redirect to a resized WebP variant of the post image. "
+            "Variants are generated on first request if the background "
+            "job has not produced them yet. "
+            "Draft posts follow the post detail visibility rules."
+        ),
+        responses={
+            302: OpenApiResponse(description="Redirect to the variant (or the original while it is being generated)"),
+            403: OpenApiResponse(description="Not allowed to view draft post"),
+            404: OpenApiResponse(description="Post, image or width not found"),
+        },
+    )
+
+    def get(self, request, id, width):
+        post = get_object_or_404(Post, id=id, is_deleted=False)
+
+        if width not in settings.IMAGE_VARIANT_WIDTHS or not post.image:
+            return Response(
+                {"detail": "Image variant not found"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        # Protect draft
+        if post.status == Post.Status.DRAFT:
+            if not (
+                request.user.is_authenticated
+                and (request.user == post.author or request.user.is_staff)
+            ):
+                return Response(
+                    {"detail": "You do not have permission to view this draft"},
+                    status=status.HTTP_403_FORBIDDEN,
+                )
+
+        url = variant_url(post, width)
+        if url is None:
+            variants = ensure_variants(post.id)
+            if variants is not None:
+                post.image_variants = variants
+                url = variant_url(post, width)
+
+        # Another worker is generating them: serve the original meanwhile
+        response = HttpResponseRedirect(url or post.image.url)
+        if url:
+            response["Cache-Control"] = f"public, max-age={settings.MEDIA_MAX_AGE}"
+        return response
+
+
+UPLOAD_CHUNK_CONTENT_TYPES = ("application/offset+octet-stream", "application/octet-stream")
+
+
+class ImageUploadCreateAPIView(APIView):
+    """
+    POST (Authenticated)
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="Start a resumable image upload",
+        description=(
+            "Open an upload session for a post image of `size` bytes. "
+            "Send the bytes in chunks with PATCH, then complete the session "
+            "and attach it to a post (or pass its id as `image_upload` "
+            "when creating or updating a post)."
+        ),
+        request=ImageUploadSerializer,
+        responses={
+            201: ImageUploadSerializer,
+            400: OpenApiResponse(description="Invalid filename or size"),
+            401: OpenApiResponse(description="Authentication required"),
+        },
+    )
+
+    def post(self, request):
+        serializer = ImageUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        upload = create_upload_session(request.user, **serializer.validated_data)
+        response = Response(
+            ImageUploadSerializer(upload, context={"request": request}).data,
+            status=status.HTTP_201_CREATED,
+        )
+        response["Upload-Offset"] = upload.offset
+        return response
+
+
+class ImageUploadDetailAPIView(APIView):
+    """
+    GET    (Owner)
+    PATCH  (Owner)
+    DELETE (Owner)
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get_upload(self, request, pk):
+        return get_object_or_404(ImageUpload, pk=pk, owner=request.user)
+
+    def upload_response(self, request, upload, status_code=status.HTTP_200_OK):
+        response = Response(
+            ImageUploadSerializer(upload, context={"request": request}).data,
+            status=status_code,
+        )
+        response["Upload-Offset"] = upload.offset
+        return response
+
+    @extend_schema(
+        summary="Upload session status",
+        description="Bytes received so far (`offset`): resume a broken upload from there.",
+        responses={
+            200: ImageUploadSerializer,
+            404: OpenApiResponse(description="Upload not found"),
+        },
+    )
+
+    def get(self, request, pk):
+        return self.upload_response(request, self.get_upload(request, pk))
+
+    @extend_schema(
+        summary="Upload a chunk",
+        description=(
+            "Append the raw request body to the upload. "
+            "The `Upload-Offset` header must equal the session's current offset. "
+            "If a chunk is cut short, the bytes received are kept: "
+            "check the offset and resume from there."
+        ),
+        request={"application/offset+octet-stream": {"type": "string", "format": "binary"}},
+        parameters=[
+            OpenApiParameter("Upload-Offset", int, OpenApiParameter.HEADER, required=True),
+        ],
+        responses={
+            200: ImageUploadSerializer,
+            400: OpenApiResponse(description="Missing headers or incomplete chunk"),
+            404: OpenApiResponse(description="Upload not found"),
+            409: OpenApiResponse(description="Offset mismatch or upload already complete"),
+            413: OpenApiResponse(description="Chunk too large"),
+            415: OpenApiResponse(description="Body must be application/offset+octet-stream"),
+        },
+    )
+
+    def patch(self, request, pk):
+        upload = self.get_upload(request, pk)
+
+        if request.content_type.split(";")[0].strip() not in UPLOAD_CHUNK_CONTENT_TYPES:
+            return Response(
+                {"detail": "Chunks must be sent as application/offset+octet-stream"},
+                status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            )
+
+        try:
+            offset = int(request.headers["Upload-Offset"])
+            length = int(request.headers["Content-Length"])
+        except (KeyError, ValueError):
+            return Response(
+                {"detail": "Upload-Offset and Content-Length headers are required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if length > settings.IMAGE_UPLOAD_CHUNK_MAX_BYTES:
+            return Response(
+                {"detail": f"Chunks may be at most {settings.IMAGE_UPLOAD_CHUNK_MAX_BYTES} bytes"},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+
+        try:
+            upload, complete = append_chunk(upload, request.stream, offset, length)
+        except UploadConflict as exc:
+            response = Response({"detail": str(exc)}, status=status.HTTP_409_CONFLICT)
+            response["Upload-Offset"] = self.get_upload(request, pk).offset
+            return response
+
+        if not complete:
+            return self.upload_response(request, upload, status.HTTP_400_BAD_REQUEST)
+        return self.upload_response(request, upload)
+
+    @extend_schema(
+        summary="Cancel an upload",
+        responses={
+            204: OpenApiResponse(description="Upload cancelled"),
+            404: OpenApiResponse(description="Upload not found"),
+        },
+    )
+
+    def delete(self, request, pk):
+        discard_upload_session(self.get_upload(request, pk))
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ImageUploadCompleteAPIView(APIView):
+    """
+    POST (Owner)
+    """
+
+    permission_classes = [IsAuthenticated, IsAuthorOrAdmin]
+
+    @extend_schema(
+        summary="Complete an upload",
+        description=(
+            "Validate and store the uploaded image. "
+            "With `post`, the image is attached to that post right away; "
+            "otherwise pass the upload id as `image_upload` when creating "
+            "or updating a post."
+        ),
+        request=ImageUploadCompleteSerializer,
+        responses={
+            200: OpenApiResponse(description="The completed upload, or the updated post when `post` is given"),
+            400: OpenApiResponse(description="Invalid `post`, or not a valid image (the upload is discarded)"),
+            403: OpenApiResponse(description="Not allowed to edit the post"),
+            404: OpenApiResponse(description="Upload or post not found"),
+            409: OpenApiResponse(description="Upload is not complete yet"),
+        },
+    )
+
+    def post(self, request, pk):
+        upload = get_object_or_404(ImageUpload, pk=pk, owner=request.user)
+        serializer = ImageUploadCompleteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        post = None
+        if serializer.validated_data.get("post") is not None:
+            post = get_object_or_404(Post, id=serializer.validated_data["post"], is_deleted=False)
+            self.check_object_permissions(request, post)
+
+        try:
+            upload = complete_upload_session(upload)
+        except UploadConflict as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_409_CONFLICT)
+        except DjangoValidationError as exc:
+            return Response({"detail": exc.messages}, status=status.HTTP_400_BAD_REQUEST)
+
+        if post is None:
+            return Response(ImageUploadSerializer(upload, context={"request": request}).data)
+
+        post = attach_upload(upload, post, user=request.user)
+        return Response(PostDetailSerializer(post).data)
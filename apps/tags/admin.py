@@ -4,14 +4,12 @@ from .models import Tag
 
 @admin.action(description="Soft Delete Selected Tags")
 def soft_delete_tags(modeladmin, request, queryset):
-    for tag in queryset:
-        tag.soft_delete()
+    queryset.soft_delete()
 
 
 @admin.action(description="Restore Selected Tags")
 def restore_tags(modeladmin, request, queryset):
-    for tag in queryset:
-        tag.restore()
+    queryset.restore()
 
 
 @admin.register(Tag)
@@ -0,0 +1,30 @@
+from apps.core.async_api import AsyncAPIView, AsyncPageNumberPagination, json_response
+from apps.core.timing import timed
+from .filters import TagFilter
+from .models import Tag
+from .serializers import TagListSerializer
+
+
+class AsyncTagPagination(AsyncPageNumberPagination):
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 50
+
+
+class AsyncTagListView(AsyncAPIView):
+    """
+    GET (Public) - async TagListAPIView.get
+    """
+
+    async def get(self, request):
+        filterset = TagFilter(request.GET, queryset=Tag.objects.order_by("id"))
+        queryset = filterset.qs
+
+        paginator = AsyncTagPagination()
+        page = await paginator.paginate_queryset(queryset, request)
+        serializer = TagListSerializer(page, many=True)
+
+        with timed("serialize"):
+            data = serializer.data
+
+        return json_response(paginator.get_paginated_data(data))
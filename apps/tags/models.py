@@ -1,6 +1,6 @@
-from django.db import models, transaction
-from django.utils import timezone
+from django.db import models
 from apps.core.base import BaseModel
+from apps.users.stats import refresh_top_tags
 
 
 class Tag(BaseModel):
@@ -10,30 +10,37 @@ class Tag(BaseModel):
     class Meta:
         ordering = ("id",)
 
-    def soft_delete(self):
-        """
-        Soft delete this tag only.
-        Does NOT cascade to posts.
-        """
-        with transaction.atomic():
-            if self.is_deleted:
-                return
+    def __str__(self):
+        return self.name
+
+    @classmethod
+    def soft_delete_rows(cls, pks, deleted_at):
+        count = super().soft_delete_rows(pks, deleted_at)
+        refresh_top_tags(*cls._author_ids(pks))
+        return count
 
-            self.is_deleted = True
-            self.deleted_at = timezone.now()
-            self.save(update_fields=["is_deleted", "deleted_at"])
+    @classmethod
+    def restore_rows(cls, pks):
+        count = super().restore_rows(pks)
+        refresh_top_tags(*cls._author_ids(pks))
+        return count
 
-    def restore(self):
+    @classmethod
+    def _author_ids(cls, pks):
         """
-        Restore this tag only.
+        Authors whose top tags may include these tags.
         """
-        with transaction.atomic():
-            if not self.is_deleted:
-                return
-
-            self.is_deleted = False
-            self.deleted_at = None
-            self.save(update_fields=["is_deleted", "deleted_at"])
-
-    def __str__(self):
-        return self.name
+        from apps.posts.models import Post  #local import - Avoid Circular Import
+
+        return (
+            Post.objects.filter(tags__in=pks, status=Post.Status.PUBLISHED)
+            .values_list("author_id", flat=True)
+            .distinct()
+        )
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if not adding:
+            # Top tags store the name and slug
+            refresh_top_tags(*type(self)._author_ids([self.pk]))
@@ -5,11 +5,15 @@ from .views import (
     TagCreateAPIView,
     TagUpdateDeleteAPIView,
 )
+from .async_views import AsyncTagListView
 
 urlpatterns = [
     path("tags/", TagListAPIView.as_view()),
     path("tags/create/", TagCreateAPIView.as_view()),
     path("tags/<slug:slug>/", TagDetailAPIView.as_view()),
     path("tags/<slug:slug>/manage/", TagUpdateDeleteAPIView.as_view()),
+
+    # Async (ASGI) read endpoints
+    path("async/tags/", AsyncTagListView.as_view()),
 ]
 
@@ -7,7 +7,8 @@ from .serializers import TagListSerializer
 from rest_framework.permissions import IsAdminUser
 from .serializers import TagCreateUpdateSerializer
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse
-from rest_framework.pagination import PageNumberPagination
+from apps.core.pagination import PageNumberPagination
+from apps.core.timing import timed
 from .filters import TagFilter
 
 
@@ -49,7 +50,10 @@ class TagListAPIView(APIView):
         page = paginator.paginate_queryset(queryset, request)
         serializer = TagListSerializer(page, many=True)
 
-        return paginator.get_paginated_response(serializer.data)
+        with timed("serialize"):
+            data = serializer.data
+
+        return paginator.get_paginated_response(data)
 
 
 
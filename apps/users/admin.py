@@ -5,14 +5,12 @@ from .models import User
 
 @admin.action(description="Soft Delete Selected Users")
 def soft_delete_users(modeladmin, request, queryset):
-    for user in queryset:
-        user.soft_delete()
+    queryset.soft_delete()
 
 
 @admin.action(description="Restore Selected Users")
 def restore_users(modeladmin, request, queryset):
-    for user in queryset:
-        user.restore()
+    queryset.restore()
 
 
 @admin.register(User)
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from apps.metrics.registry import record_cache_lookup
+
+
+AUTH_USER_KEY = "users:auth-user:{user_id}"
+
+
+def get_cached_user(user_id):
+    user = cache.get(AUTH_USER_KEY.format(user_id=user_id))
+    record_cache_lookup("auth_user", user is not None)
+    return user
+
+
+def set_cached_user(user):
+    cache.set(
+        AUTH_USER_KEY.format(user_id=user.pk),
+        user,
+        timeout=settings.AUTH_USER_CACHE_TIMEOUT,
+    )
+
+
+def invalidate_users(*user_ids):
+    """
+    Drop cached authentication users once the current transaction commits
+    (immediately in autocommit mode).
+    """
+    keys = [AUTH_USER_KEY.format(user_id=user_id) for user_id in set(user_ids)]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
@@ -0,0 +1,137 @@
+import asyncio
+import json
+import threading
+import weakref
+from contextlib import asynccontextmanager
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import aauthenticate
+from django.contrib.auth.models import update_last_login
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from .models import User
+from .throttles import LoginRateThrottle
+
+
+class PoolSaturated(Exception):
+    pass
+
+
+class BoundedHashPool:
+    """
+    Admission control for password hashing.
+    At most `workers` logins hash at once and `queue_size` wait; anything
+    beyond that is rejected immediately instead of queueing without bound.
+    """
+
+    def __init__(self, workers, queue_size):
+        self._workers = workers
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        # asyncio semaphores belong to one event loop
+        self._running = weakref.WeakKeyDictionary()
+        self._running_lock = threading.Lock()
+
+    @asynccontextmanager
+    async def slot(self):
+        if not self._slots.acquire(blocking=False):
+            raise PoolSaturated
+
+        try:
+            with self._running_lock:
+                running = self._running.setdefault(
+                    asyncio.get_running_loop(), asyncio.Semaphore(self._workers)
+                )
+            async with running:
+                yield
+        finally:
+            self._slots.release()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_hash_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BoundedHashPool(
+                settings.LOGIN_HASH_WORKERS,
+                settings.LOGIN_HASH_QUEUE_SIZE,
+            )
+        return _pool
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncLoginView(View):
+    """
+    POST (Public)
+    Drop-in replacement for simplejwt's TokenObtainPairView that bounds
+    concurrent password checks; returns 503 when the pool is saturated.
+    """
+
+    throttle_classes = [LoginRateThrottle]
+
+    async def post(self, request):
+        for throttle in [throttle() for throttle in self.throttle_classes]:
+            if not await sync_to_async(throttle.allow_request)(request, self):
+                wait = int(throttle.wait() or 0) + 1
+                response = JsonResponse(
+                    {"detail": f"Request was throttled. Expected available in {wait} seconds."},
+                    status=429,
+                )
+                response["Retry-After"] = str(wait)
+                return response
+
+        credentials = self.get_credentials(request)
+        errors = {
+            field: ["This field is required."]
+            for field in (User.USERNAME_FIELD, "password")
+            if not credentials.get(field)
+        }
+        if errors:
+            return JsonResponse(errors, status=400)
+
+        # Backends, user_login_failed and hash upgrades as in authenticate()
+        try:
+            async with get_hash_pool().slot():
+                user = await aauthenticate(
+                    request,
+                    username=credentials[User.USERNAME_FIELD],
+                    password=credentials["password"],
+                )
+        except PoolSaturated:
+            response = JsonResponse(
+                {"detail": "Login is temporarily overloaded, please retry."},
+                status=503,
+            )
+            response["Retry-After"] = "1"
+            return response
+
+        if user is None:
+            return JsonResponse(
+                {"detail": "No active account found with the given credentials"},
+                status=401,
+            )
+
+        if api_settings.UPDATE_LAST_LOGIN:
+            await sync_to_async(update_last_login)(None, user)
+
+        refresh = RefreshToken.for_user(user)
+        return JsonResponse({
+            "refresh": str(refresh),
+            "access": str(refresh.access_token),
+        })
+
+    def get_credentials(self, request):
+        if request.content_type == "application/json":
+            try:
+                data = json.loads(request.body or b"{}")
+            except ValueError:
+                return {}
+            return data if isinstance(data, dict) else {}
+        return request.POST
@@ -0,0 +1,38 @@
+import csv
+from django.core.management.base import BaseCommand, CommandError
+from apps.users.provisioning import provision_users
+
+
+class Command(BaseCommand):
+    help = (
+        "Create users from a CSV file with a header row "
+        "(username, email, password, first_name, last_name)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--workers", type=int, help="Hashing processes.")
+        parser.add_argument("--batch-size", type=int, help="Rows per insert.")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["path"], newline="", encoding="utf-8") as f:
+                rows = list(csv.DictReader(f))
+        except OSError as exc:
+            raise CommandError(exc)
+
+        created, failures = provision_users(
+            rows,
+            workers=options["workers"],
+            batch_size=options["batch_size"],
+        )
+
+        for failure in failures:
+            # +2: header line and 1-based line numbers
+            errors = "; ".join(
+                f"{field}: {' '.join(map(str, messages))}"
+                for field, messages in failure["errors"].items()
+            )
+            self.stderr.write(f"Line {failure['row'] + 2}: {errors}")
+
+        self.stdout.write(f"Created {created} users, {len(failures)} failed")
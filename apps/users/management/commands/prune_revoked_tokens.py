@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from apps.users.models import RevokedToken
+
+
+class Command(BaseCommand):
+    help = "Delete revocation rows whose tokens have expired anyway."
+
+    def handle(self, *args, **options):
+        count, _ = RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+        self.stdout.write(f"Pruned {count} revoked tokens")
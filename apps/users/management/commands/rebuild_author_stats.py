@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from apps.users.models import User
+from apps.users.stats import compute_author_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-author stats rollup for every user, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Authors per batch.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        user_ids = User.all_objects.order_by("id").values_list("id", flat=True)
+
+        total = 0
+        last_id = 0
+        while True:
+            batch = list(user_ids.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+
+            compute_author_stats(batch)
+            total += len(batch)
+            last_id = batch[-1]
+
+        self.stdout.write(f"Rebuilt stats for {total} users")
@@ -0,0 +1,21 @@
+# Generated by Django 6.0 on 2026-10-19 03:08
+
+import apps.core.base
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_alter_user_managers'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='user',
+            managers=[
+                ('objects', apps.core.base.ActiveUserManager()),
+                ('all_objects', apps.core.base.SoftDeleteUserManager()),
+            ],
+        ),
+    ]
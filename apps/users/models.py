@@ -1,39 +1,103 @@
-from django.db import models, transaction
+from django.conf import settings
+from django.db import models
 from django.utils import timezone
-from django.contrib.auth.models import AbstractUser, UserManager
-from apps.core.base import ActiveUserManager, BaseModel
+from django.contrib.auth.models import AbstractUser
+from apps.core.base import ActiveUserManager, SoftDeleteUserManager, BaseModel
+from .cache import invalidate_users
 
 
 class User(AbstractUser, BaseModel):
     email = models.EmailField(unique=True)
 
     objects = ActiveUserManager()
-    all_objects = UserManager()
+    all_objects = SoftDeleteUserManager()
 
-    def soft_delete(self):
+    @classmethod
+    def soft_delete_rows(cls, pks, deleted_at):
         """
-        Soft Delete the user and mark as deleted.
+        Soft Delete the users and mark them inactive.
         """
-        with transaction.atomic():
-            if self.is_deleted:
-                return
+        count = cls._base_manager.filter(pk__in=pks).update(
+            is_active=False,
+            is_deleted=True,
+            deleted_at=deleted_at,
+        )
+        invalidate_users(*pks)
 
-            self.is_active = False
-            self.is_deleted = True
-            self.deleted_at = timezone.now()
-            self.save(update_fields=["is_active", "is_deleted", "deleted_at"])
+        from .revocation import revoke_user_tokens  #local import - Avoid Circular Import
+        revoke_user_tokens(pks)
+        return count
 
-    def restore(self):
-        """
-        Restore user account
-        """
-        with transaction.atomic():
-            if not self.is_deleted:
-                return
+    @classmethod
+    def restore_rows(cls, pks):
+        count = super().restore_rows(pks)
+        invalidate_users(*pks)
+        return count
+
+    def soft_delete(self):
+        super().soft_delete()
+        if self.is_deleted:
+            self.is_active = False
 
-            self.is_deleted = False
-            self.deleted_at = None
-            self.save(update_fields=["is_deleted", "deleted_at"])
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        invalidate_users(self.pk)
 
     def __str__(self):
         return self.username
+
+
+class RevokedToken(models.Model):
+    """
+    A revoked JWT (by `jti`), or with no `jti` every token of `user`
+    issued up to `revoked_at`.
+    Rows are only needed until `expires_at`, when the tokens they cover
+    have expired on their own.
+    """
+
+    jti = models.CharField(max_length=255, unique=True, null=True, blank=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="revoked_tokens"
+    )
+    revoked_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        ordering = ("id",)
+        indexes = [
+            models.Index(fields=["user", "revoked_at"]),
+        ]
+
+    def __str__(self):
+        return self.jti or f"All tokens of user #{self.user_id}"
+
+
+class AuthorStats(models.Model):
+    """
+    Per-author rollup behind /api/users/<id>/profile/.
+    Maintained by apps.users.stats on post and comment writes;
+    `manage.py rebuild_author_stats` recomputes it from scratch.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stats"
+    )
+    published_posts = models.PositiveIntegerField(default=0)
+    draft_posts = models.PositiveIntegerField(default=0)
+    comments = models.PositiveIntegerField(default=0)
+    top_tags = models.JSONField(default=list, blank=True)
+    last_activity_at = models.DateTimeField(null=True, blank=True)
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "author stats"
+
+    def __str__(self):
+        return f"Stats of user #{self.user_id}"
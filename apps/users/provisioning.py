@@ -0,0 +1,179 @@
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.db import IntegrityError, transaction
+from rest_framework import serializers
+from .models import User
+
+
+class UserProvisionSerializer(serializers.Serializer):
+    """
+    Field validation only; uniqueness is checked per batch, not per row.
+    """
+
+    username = serializers.CharField(max_length=150, validators=[UnicodeUsernameValidator()])
+    email = serializers.EmailField(max_length=254)
+    password = serializers.CharField(write_only=True)
+    first_name = serializers.CharField(max_length=150, required=False, allow_blank=True)
+    last_name = serializers.CharField(max_length=150, required=False, allow_blank=True)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_provision_pool(workers):
+    """
+    This process' hashing pool of `workers` processes, started once and
+    reused by every call. Workers are spawned, not forked, so a threaded
+    web worker holding database connections is never copied.
+    """
+    key = (os.getpid(), workers)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                # Workers unpickle Django functions: set the app registry up first
+                initializer=django.setup,
+            )
+            _pools[key] = pool
+        return pool
+
+
+def _discard_pool(workers):
+    # A worker died: the next call starts a fresh pool
+    with _pools_lock:
+        _pools.pop((os.getpid(), workers), None)
+
+
+def provision_users(rows, created_by=None, workers=None, batch_size=None):
+    """
+    Validate, hash and insert users in batches.
+    Returns (created_count, failures) where each failure is
+    {"row": <index in rows>, "errors": {...}}.
+    """
+    workers = workers or settings.USER_PROVISION_WORKERS
+    batch_size = batch_size or settings.USER_PROVISION_BATCH_SIZE
+    rows = list(rows)
+    created = 0
+    failures = []
+    pool = get_provision_pool(workers)
+
+    for start in range(0, len(rows), batch_size):
+        batch = list(enumerate(rows[start:start + batch_size], start=start))
+        valid, errors = _validate_batch(batch)
+        failures.extend(errors)
+
+        chunksize = max(1, math.ceil(len(valid) / (workers * 4)))
+        try:
+            hashes = list(pool.map(
+                make_password,
+                [data["password"] for _, data in valid],
+                chunksize=chunksize,
+            ))
+        except BrokenProcessPool:
+            _discard_pool(workers)
+            raise
+
+        users = []
+        for (index, data), password in zip(valid, hashes):
+            data = dict(data, password=password)
+            users.append((index, User(created_by=created_by, **data)))
+
+        count, errors = _insert_batch(users)
+        created += count
+        failures.extend(errors)
+
+    failures.sort(key=lambda failure: failure["row"])
+    return created, failures
+
+
+def _validate_batch(batch):
+    valid = []
+    failures = []
+
+    for index, row in batch:
+        serializer = UserProvisionSerializer(data=row)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+        else:
+            failures.append({"row": index, "errors": serializer.errors})
+
+    valid, duplicates = _check_unique(valid)
+    return valid, failures + duplicates
+
+
+def _check_unique(valid):
+    """
+    One query per unique field for the whole batch.
+    Deleted users still hold their username / email.
+    """
+    usernames = set(
+        User.all_objects.filter(
+            username__in=[data["username"] for _, data in valid]
+        ).values_list("username", flat=True)
+    )
+    emails = set(
+        User.all_objects.filter(
+            email__in=[data["email"] for _, data in valid]
+        ).values_list("email", flat=True)
+    )
+
+    unique = []
+    failures = []
+    for index, data in valid:
+        errors = {}
+        if data["username"] in usernames:
+            errors["username"] = ["A user with that username already exists."]
+        if data["email"] in emails:
+            errors["email"] = ["user with this email already exists."]
+
+        if errors:
+            failures.append({"row": index, "errors": errors})
+        else:
+            unique.append((index, data))
+
+        # Later rows of the same file collide with this one
+        usernames.add(data["username"])
+        emails.add(data["email"])
+
+    return unique, failures
+
+
+def _insert_batch(users):
+    if not users:
+        return 0, []
+
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create([user for _, user in users])
+        return len(users), []
+    except IntegrityError:
+        pass
+
+    # Lost a race with another writer: re-check and retry once
+    rows = [(index, {"username": user.username, "email": user.email}) for index, user in users]
+    unique, failures = _check_unique(rows)
+    remaining = {index for index, _ in unique}
+    users = [(index, user) for index, user in users if index in remaining]
+
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create([user for _, user in users])
+    except IntegrityError:
+        # Lost the race again: the rest of the batch is reported, not created
+        failures.extend(
+            {"row": index, "errors": {"non_field_errors": ["Conflicts with a user created concurrently."]}}
+            for index, _ in users
+        )
+        return 0, failures
+    return len(users), failures
@@ -0,0 +1,168 @@
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from .models import RevokedToken
+
+
+class BloomFilter:
+    """
+    Fixed-size bloom filter: no false negatives, false positives at
+    about `error_rate` once `capacity` items are added.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        # Double hashing: k positions from one 128-bit digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+def jti_key(jti):
+    return f"jti:{jti}"
+
+
+def user_key(user_id):
+    return f"user:{user_id}"
+
+
+class RevocationIndex:
+    """
+    Per-process bloom filter over the RevokedToken table.
+    Refreshed incrementally (rows with a higher id) at most every
+    TOKEN_REVOCATION_REFRESH_INTERVAL seconds. Rebuilt every
+    TOKEN_REVOCATION_REBUILD_INTERVAL seconds, sized for twice the live
+    rows (at least TOKEN_REVOCATION_FILTER_CAPACITY), which drops expired
+    rows and picks up rows committed out of id order.
+    Only filter hits are confirmed against the database.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter = None
+        self._last_id = 0
+        self._refreshed_at = 0.0
+        self._built_at = 0.0
+
+    def _rebuild(self):
+        self._built_at = time.monotonic()
+        live = RevokedToken.objects.filter(expires_at__gt=timezone.now())
+        # Room for the live rows to double before the next rebuild
+        self._filter = BloomFilter(
+            max(settings.TOKEN_REVOCATION_FILTER_CAPACITY, 2 * live.count()),
+            settings.TOKEN_REVOCATION_FILTER_ERROR_RATE,
+        )
+        self._last_id = 0
+        self._load(live)
+
+    def _load(self, queryset):
+        rows = queryset.order_by("id").values_list("id", "jti", "user_id")
+        for row_id, jti, user_id in rows.iterator():
+            self._filter.add(jti_key(jti) if jti else user_key(user_id))
+            self._last_id = max(self._last_id, row_id)
+        self._refreshed_at = time.monotonic()
+
+    def get_filter(self):
+        with self._lock:
+            now = time.monotonic()
+            if (
+                self._filter is None
+                or now - self._built_at >= settings.TOKEN_REVOCATION_REBUILD_INTERVAL
+            ):
+                self._rebuild()
+            elif now - self._refreshed_at >= settings.TOKEN_REVOCATION_REFRESH_INTERVAL:
+                self._load(RevokedToken.objects.filter(id__gt=self._last_id))
+            return self._filter
+
+    def add(self, key):
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(key)
+
+    def reset(self):
+        with self._lock:
+            self._filter = None
+
+
+revocation_index = RevocationIndex()
+
+
+def is_revoked(token):
+    bloom = revocation_index.get_filter()
+
+    jti = token.get(api_settings.JTI_CLAIM)
+    user_id = token.get(api_settings.USER_ID_CLAIM)
+
+    candidates = Q()
+    if jti and jti_key(jti) in bloom:
+        candidates |= Q(jti=jti)
+
+    if user_id is not None and user_key(user_id) in bloom:
+        user_revocations = Q(user_id=user_id, jti__isnull=True)
+        if "iat" in token:
+            issued_at = datetime.fromtimestamp(token["iat"], tz=dt_timezone.utc)
+            user_revocations &= Q(revoked_at__gte=issued_at)
+        candidates |= user_revocations
+
+    if not candidates:
+        return False
+
+    return RevokedToken.objects.filter(candidates).exists()
+
+
+def revoke_token(token):
+    """
+    Revoke a single validated token until it expires.
+    """
+    jti = token[api_settings.JTI_CLAIM]
+    RevokedToken.objects.get_or_create(
+        jti=jti,
+        defaults={
+            "user_id": token.get(api_settings.USER_ID_CLAIM),
+            "expires_at": datetime.fromtimestamp(token["exp"], tz=dt_timezone.utc),
+        },
+    )
+    revocation_index.add(jti_key(jti))
+
+
+def revoke_user_tokens(user_ids):
+    """
+    Revoke every token issued so far to the given users, in bulk.
+    """
+    now = timezone.now()
+    expires_at = now + max(
+        api_settings.ACCESS_TOKEN_LIFETIME,
+        api_settings.REFRESH_TOKEN_LIFETIME,
+    )
+    RevokedToken.objects.bulk_create(
+        [
+            RevokedToken(user_id=user_id, revoked_at=now, expires_at=expires_at)
+            for user_id in user_ids
+        ]
+    )
+    for user_id in user_ids:
+        revocation_index.add(user_key(user_id))
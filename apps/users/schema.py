@@ -0,0 +1,9 @@
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    """
+    Keep documenting the API with the simplejwt bearer scheme.
+    """
+
+    target_class = "apps.users.authentication.CachedJWTAuthentication"
@@ -1,5 +1,9 @@
 from rest_framework import serializers
-from .models import User
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from .models import User, AuthorStats
+from .revocation import is_revoked
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -17,6 +21,34 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ("id", "created_at", "updated_at")
 
 
+class TopTagSerializer(serializers.Serializer):
+    slug = serializers.CharField()
+    name = serializers.CharField()
+    count = serializers.IntegerField()
+
+
+class UserProfileSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source="user.id")
+    username = serializers.CharField(source="user.username")
+    first_name = serializers.CharField(source="user.first_name")
+    last_name = serializers.CharField(source="user.last_name")
+    top_tags = TopTagSerializer(many=True)
+
+    class Meta:
+        model = AuthorStats
+        fields = (
+            "id",
+            "username",
+            "first_name",
+            "last_name",
+            "published_posts",
+            "draft_posts",
+            "comments",
+            "top_tags",
+            "last_activity_at",
+        )
+
+
 class UserCreateSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
 
@@ -37,3 +69,18 @@ class UserCreateSerializer(serializers.ModelSerializer):
         user.set_password(password)
         user.save()
         return user
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    """
+    Refuse to refresh revoked refresh tokens.
+    """
+
+    def validate(self, attrs):
+        if is_revoked(RefreshToken(attrs["refresh"])):
+            raise InvalidToken("Token is revoked")
+        return super().validate(attrs)
+
+
+class LogoutSerializer(serializers.Serializer):
+    refresh = serializers.CharField(required=False)
@@ -0,0 +1,200 @@
+from collections import defaultdict
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Max
+from django.tasks import task
+from django.utils import timezone
+from .models import AuthorStats
+
+
+STATS_FIELDS = (
+    "published_posts",
+    "draft_posts",
+    "comments",
+    "top_tags",
+    "last_activity_at",
+    "refreshed_at",
+)
+
+
+def post_counter(status):
+    """
+    The rollup counter a live post of this status counts in.
+    """
+    from apps.posts.models import Post  #local import - Avoid Circular Import
+
+    return "published_posts" if status == Post.Status.PUBLISHED else "draft_posts"
+
+
+def post_deltas(posts, sign):
+    """
+    {author_id: {counter: change}} for adding (sign=1) or removing
+    (sign=-1) the posts of this queryset; one grouped query over them.
+    """
+    deltas = defaultdict(lambda: defaultdict(int))
+    for row in posts.values("author_id", "status").annotate(count=Count("id")).order_by():
+        deltas[row["author_id"]][post_counter(row["status"])] += sign * row["count"]
+    return deltas
+
+
+def comment_deltas(comments, sign):
+    deltas = defaultdict(lambda: defaultdict(int))
+    for row in comments.values("author_id").annotate(count=Count("id")).order_by():
+        deltas[row["author_id"]]["comments"] += sign * row["count"]
+    return deltas
+
+
+def counter_change(user_id, before, after):
+    """
+    Deltas for one row moving from counter `before` to `after`
+    (None: not counted, i.e. new or deleted).
+    """
+    changes = defaultdict(int)
+    if before is not None:
+        changes[before] -= 1
+    if after is not None:
+        changes[after] += 1
+    return {user_id: changes}
+
+
+def merge_deltas(*deltas):
+    merged = defaultdict(lambda: defaultdict(int))
+    for delta in deltas:
+        for user_id, changes in delta.items():
+            for counter, change in changes.items():
+                merged[user_id][counter] += change
+    return merged
+
+
+def apply_author_deltas(deltas, active=None):
+    """
+    Add `deltas` ({user_id: {counter: change}}) to the authors' rollup
+    rows with F() increments, inside the current transaction. `active`
+    ({user_id: written_at}) also moves last_activity_at.
+    """
+    active = active or {}
+    changed = {user_id for user_id, changes in deltas.items() if any(changes.values())}
+    user_ids = sorted((changed | set(active)) - {None})
+    if not user_ids:
+        return
+
+    AuthorStats.objects.bulk_create(
+        [AuthorStats(user_id=user_id) for user_id in user_ids],
+        ignore_conflicts=True,
+    )
+    # In user id order, so concurrent writers lock rows in the same order
+    for user_id in user_ids:
+        updates = {
+            counter: F(counter) + change
+            for counter, change in deltas.get(user_id, {}).items()
+            if change
+        }
+        if user_id in active:
+            updates["last_activity_at"] = active[user_id]
+        AuthorStats.objects.filter(user_id=user_id).update(**updates)
+
+
+def refresh_top_tags(*user_ids):
+    """
+    Queue a recompute of these authors' top tags once the current
+    transaction commits (immediately in autocommit mode).
+    """
+    user_ids = sorted({user_id for user_id in user_ids if user_id is not None})
+    if user_ids:
+        transaction.on_commit(lambda: update_top_tags.enqueue(user_ids))
+
+
+@task
+def update_top_tags(user_ids):
+    top = _top_tags(user_ids)
+    for user_id in user_ids:
+        AuthorStats.objects.filter(user_id=user_id).update(top_tags=top.get(user_id, []))
+
+
+def compute_author_stats(user_ids):
+    """
+    Full recompute for `manage.py rebuild_author_stats`: a handful of
+    grouped queries scoped to `user_ids` (indexed by author), then one
+    upsert. Writes keep the rows current with apply_author_deltas().
+    """
+    from apps.posts.models import Post  #local import - Avoid Circular Import
+    from apps.comments.models import Comment  #local import - Avoid Circular Import
+
+    user_ids = list(user_ids)
+    rows = {
+        user_id: AuthorStats(user_id=user_id, refreshed_at=timezone.now())
+        for user_id in user_ids
+    }
+
+    posts = (
+        Post.objects.filter(author_id__in=user_ids)
+        .values("author_id", "status")
+        .annotate(count=Count("id"), last=Max("updated_at"))
+        .order_by()
+    )
+    for row in posts:
+        stats = rows[row["author_id"]]
+        if row["status"] == Post.Status.PUBLISHED:
+            stats.published_posts = row["count"]
+        else:
+            stats.draft_posts = row["count"]
+        stats.last_activity_at = _latest(stats.last_activity_at, row["last"])
+
+    comments = (
+        Comment.objects.filter(author_id__in=user_ids)
+        .values("author_id")
+        .annotate(count=Count("id"), last=Max("updated_at"))
+        .order_by()
+    )
+    for row in comments:
+        stats = rows[row["author_id"]]
+        stats.comments = row["count"]
+        stats.last_activity_at = _latest(stats.last_activity_at, row["last"])
+
+    for user_id, tags in _top_tags(user_ids).items():
+        rows[user_id].top_tags = tags
+
+    AuthorStats.objects.bulk_create(
+        rows.values(),
+        update_conflicts=True,
+        unique_fields=["user"],
+        update_fields=STATS_FIELDS,
+    )
+
+
+def _top_tags(user_ids):
+    """
+    Most used tags on each author's published posts.
+    """
+    from apps.posts.models import Post  #local import - Avoid Circular Import
+
+    counts = (
+        Post.tags.through.objects.filter(
+            post__author_id__in=user_ids,
+            post__is_deleted=False,
+            post__status=Post.Status.PUBLISHED,
+            tag__is_deleted=False,
+        )
+        .values("post__author_id", "tag__slug", "tag__name")
+        .annotate(count=Count("id"))
+        .order_by("post__author_id", "-count", "tag__slug")
+    )
+
+    top = defaultdict(list)
+    for row in counts:
+        tags = top[row["post__author_id"]]
+        if len(tags) < settings.AUTHOR_TOP_TAGS:
+            tags.append({
+                "slug": row["tag__slug"],
+                "name": row["tag__name"],
+                "count": row["count"],
+            })
+    return top
+
+
+def _latest(current, other):
+    if current is None:
+        return other
+    if other is None:
+        return current
+    return max(current, other)
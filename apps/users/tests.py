@@ -1,3 +1,308 @@
-from django.test import TestCase
+from unittest import mock
+from django.contrib.auth.signals import user_login_failed
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.test import TestCase, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from .authentication import CachedJWTAuthentication
+from .login import BoundedHashPool, PoolSaturated
+from apps.comments.models import Comment
+from apps.core.tasks import Worker
+from apps.posts.models import Post
+from apps.tags.models import Tag
+from .models import AuthorStats, User
+from .provisioning import provision_users
+from .revocation import BloomFilter, is_revoked, revocation_index, revoke_user_tokens
 
-# Create your tests here.
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        revocation_index.reset()
+        self.user = User.objects.create_user(
+            username="user1", email="user1@example.com", password="Newx123!"
+        )
+        token = AccessToken.for_user(self.user)
+        self.request = RequestFactory().get(
+            "/api/posts/", HTTP_AUTHORIZATION=f"Bearer {token}"
+        )
+        self.auth = CachedJWTAuthentication()
+
+    def test_user_is_resolved_from_cache(self):
+        self.auth.authenticate(self.request)
+
+        with self.assertNumQueries(0):
+            user, _ = self.auth.authenticate(self.request)
+
+        self.assertEqual(user.pk, self.user.pk)
+
+    def test_soft_delete_invalidates_cached_user(self):
+        self.auth.authenticate(self.request)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.soft_delete()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate(self.request)
+
+    def test_deactivation_invalidates_cached_user(self):
+        self.auth.authenticate(self.request)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate(self.request)
+
+
+class AsyncLoginViewTests(TestCase):
+    url = "/api/auth/login/"
+
+    def setUp(self):
+        User.objects.create_user(
+            username="user1", email="user1@example.com", password="Newx123!"
+        )
+
+    async def test_login_returns_token_pair(self):
+        response = await self.async_client.post(
+            self.url,
+            {"username": "user1", "password": "Newx123!"},
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()), {"access", "refresh"})
+
+    async def test_wrong_password_is_rejected(self):
+        response = await self.async_client.post(
+            self.url,
+            {"username": "user1", "password": "wrong"},
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 401)
+
+    async def test_failed_login_goes_through_authenticate(self):
+        failures = []
+
+        def receiver(credentials, **kwargs):
+            failures.append(credentials["username"])
+
+        user_login_failed.connect(receiver)
+        self.addCleanup(user_login_failed.disconnect, receiver)
+
+        response = await self.async_client.post(
+            self.url,
+            {"username": "user1", "password": "wrong"},
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(failures, ["user1"])
+
+    async def test_saturated_pool_returns_503(self):
+        with mock.patch.object(BoundedHashPool, "slot", side_effect=PoolSaturated):
+            response = await self.async_client.post(
+                self.url,
+                {"username": "user1", "password": "Newx123!"},
+                content_type="application/json",
+            )
+
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("Retry-After", response)
+
+
+class TokenRevocationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        revocation_index.reset()
+        self.user = User.objects.create_user(
+            username="user1", email="user1@example.com", password="Newx123!"
+        )
+        self.refresh = RefreshToken.for_user(self.user)
+        self.auth_header = f"Bearer {self.refresh.access_token}"
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"jti:{i}")
+
+        self.assertTrue(all(f"jti:{i}" in bloom for i in range(1000)))
+        false_positives = sum(f"other:{i}" in bloom for i in range(1000))
+        self.assertLess(false_positives, 50)
+
+    def test_unrevoked_token_needs_no_revocation_query(self):
+        revocation_index.get_filter()
+
+        with self.assertNumQueries(0):
+            self.assertFalse(is_revoked(self.refresh.access_token))
+
+    @override_settings(TOKEN_REVOCATION_FILTER_CAPACITY=2)
+    def test_filter_is_sized_from_the_live_rows(self):
+        revoke_user_tokens([self.user.pk] * 5)
+
+        bloom = revocation_index.get_filter()
+        self.assertEqual(bloom.capacity, 10)
+
+        # Past the configured capacity, no rebuild on every request
+        with self.assertNumQueries(0):
+            self.assertIs(revocation_index.get_filter(), bloom)
+
+    def test_logout_revokes_access_and_refresh_tokens(self):
+        response = self.client.post(
+            "/api/auth/logout/",
+            {"refresh": str(self.refresh)},
+            content_type="application/json",
+            HTTP_AUTHORIZATION=self.auth_header,
+        )
+        self.assertEqual(response.status_code, 204)
+
+        response = self.client.post(
+            "/api/auth/logout/", HTTP_AUTHORIZATION=self.auth_header
+        )
+        self.assertEqual(response.status_code, 401)
+
+        response = self.client.post(
+            "/api/auth/refresh/",
+            {"refresh": str(self.refresh)},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 401)
+
+    def test_soft_delete_revokes_outstanding_tokens(self):
+        User.all_objects.filter(pk=self.user.pk).soft_delete()
+
+        self.assertTrue(is_revoked(self.refresh))
+        self.assertTrue(is_revoked(self.refresh.access_token))
+
+
+class ProvisionUsersTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_valid_rows_are_created_and_bad_rows_reported(self):
+        User.objects.create_user(
+            username="taken", email="taken@example.com", password="Newx123!"
+        )
+        rows = [
+            {"username": "new1", "email": "new1@example.com", "password": "Newx123!"},
+            {"username": "taken", "email": "other@example.com", "password": "Newx123!"},
+            {"username": "new2", "email": "not-an-email", "password": "Newx123!"},
+            {"username": "new1", "email": "dup@example.com", "password": "Newx123!"},
+            {"username": "new3", "email": "new3@example.com", "password": "Newx123!"},
+        ]
+
+        created, failures = provision_users(rows, workers=1, batch_size=2)
+
+        self.assertEqual(created, 2)
+        self.assertEqual([failure["row"] for failure in failures], [1, 2, 3])
+        self.assertTrue(User.objects.get(username="new3").check_password("Newx123!"))
+
+    def test_repeated_insert_conflict_is_reported(self):
+        rows = [{"username": "new1", "email": "new1@example.com", "password": "Newx123!"}]
+
+        with mock.patch.object(User.objects, "bulk_create", side_effect=IntegrityError):
+            created, failures = provision_users(rows, workers=1)
+
+        self.assertEqual(created, 0)
+        self.assertEqual(failures[0]["row"], 0)
+        self.assertIn("non_field_errors", failures[0]["errors"])
+
+    @override_settings(USER_BULK_MAX_ROWS=2)
+    def test_bulk_endpoint_is_capped(self):
+        admin = User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="Newx123!"
+        )
+        rows = [
+            {"username": f"new{i}", "email": f"new{i}@example.com", "password": "Newx123!"}
+            for i in range(3)
+        ]
+
+        response = self.client.post(
+            "/api/users/bulk/", rows, content_type="application/json",
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(admin)}",
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(User.objects.filter(username__startswith="new").exists())
+
+
+class AuthorStatsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="author", email="author@example.com", password="Newx123!"
+        )
+        self.url = f"/api/users/{self.user.pk}/profile/"
+        self.tag = Tag.objects.create(name="Django", slug="django")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post = Post.objects.create(
+                title="Published", content="...", author=self.user,
+                status=Post.Status.PUBLISHED,
+            )
+            self.post.tags.add(self.tag)
+            Post.objects.create(title="Draft", content="...", author=self.user)
+            Comment.objects.create(post=self.post, author=self.user, content="hi")
+        Worker(burst=True).run()
+
+    def test_profile_is_a_single_row_read(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+
+        # Throttle state aside, a single read of the rollup table
+        selects = [
+            q["sql"] for q in queries.captured_queries
+            if q["sql"].startswith("SELECT") and "throttlestate" not in q["sql"]
+        ]
+        self.assertEqual(len(selects), 1)
+        self.assertIn("users_authorstats", selects[0])
+
+        data = response.json()
+        self.assertEqual(data["published_posts"], 1)
+        self.assertEqual(data["draft_posts"], 1)
+        self.assertEqual(data["comments"], 1)
+        self.assertEqual(data["top_tags"], [{"slug": "django", "name": "Django", "count": 1}])
+        self.assertIsNotNone(data["last_activity_at"])
+
+    def test_soft_delete_and_restore_update_the_rollup(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.soft_delete()
+        Worker(burst=True).run()
+
+        stats = AuthorStats.objects.get(user=self.user)
+        self.assertEqual((stats.published_posts, stats.comments, stats.top_tags), (0, 0, []))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.restore()
+        Worker(burst=True).run()
+
+        stats.refresh_from_db()
+        self.assertEqual((stats.published_posts, stats.comments), (1, 1))
+
+    def test_status_change_moves_the_counters(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.status = Post.Status.DRAFT
+            self.post.save()
+        Worker(burst=True).run()
+
+        stats = AuthorStats.objects.get(user=self.user)
+        self.assertEqual((stats.published_posts, stats.draft_posts, stats.top_tags), (0, 2, []))
+
+    def test_tag_soft_delete_refreshes_top_tags(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tag.soft_delete()
+        Worker(burst=True).run()
+
+        self.assertEqual(AuthorStats.objects.get(user=self.user).top_tags, [])
+
+    def test_rebuild_matches_incremental_rollup(self):
+        expected = self.client.get(self.url).json()
+        AuthorStats.objects.all().delete()
+
+        call_command("rebuild_author_stats", stdout=mock.Mock())
+
+        self.assertEqual(self.client.get(self.url).json(), expected)
@@ -1,11 +1,18 @@
-from rest_framework.throttling import AnonRateThrottle
-from rest_framework.throttling import ScopedRateThrottle
+from apps.core.throttling import AnonRateThrottle
+from apps.core.throttling import ScopedRateThrottle
 from rest_framework.views import APIView
 
 
 class LoginRateThrottle(AnonRateThrottle):
     scope = "login"
 
+    def get_cache_key(self, request, view):
+        # Login attempts are throttled per client, authenticated or not
+        return self.cache_format % {
+            "scope": self.scope,
+            "ident": self.get_ident(request),
+        }
+
 
 class LoginAPIView(APIView):
     throttle_classes = [ScopedRateThrottle]
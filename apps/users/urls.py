@@ -1,9 +1,11 @@
 from django.urls import path
-from .views import UserListCreateAPIView, UserDetailAPIView
+from .views import UserListCreateAPIView, UserDetailAPIView, UserBulkCreateAPIView, UserProfileAPIView
 
 urlpatterns = [
     path("users/", UserListCreateAPIView.as_view(), name="user-list-create"),
+    path("users/bulk/", UserBulkCreateAPIView.as_view(), name="user-bulk-create"),
     path("users/<int:pk>/", UserDetailAPIView.as_view(), name="user-detail"),
+    path("users/<int:pk>/profile/", UserProfileAPIView.as_view(), name="user-profile"),
 ]
 
 
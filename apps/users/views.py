@@ -1,12 +1,19 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
+from django.conf import settings
 from django.shortcuts import get_object_or_404
 from drf_spectacular.utils import extend_schema, OpenApiResponse
-from .models import User
-from .serializers import UserSerializer, UserCreateSerializer
-from rest_framework.pagination import PageNumberPagination
+from .models import User, AuthorStats
+from .serializers import UserSerializer, UserCreateSerializer, LogoutSerializer, UserProfileSerializer
+from apps.core.pagination import PageNumberPagination
+from apps.core.timing import timed
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
 from .filters import UserFilter
+from .revocation import revoke_token
+from .provisioning import UserProvisionSerializer, provision_users
 
 
 class UserPagination(PageNumberPagination):
@@ -46,7 +53,10 @@ class UserListCreateAPIView(APIView):
         page = paginator.paginate_queryset(queryset, request)
         serializer = UserSerializer(page, many=True)
 
-        return paginator.get_paginated_response(serializer.data)
+        with timed("serialize"):
+            data = serializer.data
+
+        return paginator.get_paginated_response(data)
 
     @extend_schema(
         summary="Register user",
@@ -165,4 +175,124 @@ class UserDetailAPIView(APIView):
             return Response(status=status.HTTP_204_NO_CONTENT)
 
         user.soft_delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UserProfileAPIView(APIView):
+    """
+    GET (Public)
+    """
+
+    permission_classes = [permissions.AllowAny]
+
+    @extend_schema(
+        summary="Retrieve user profile",
+        description=(
+            "Post and comment counts, top tags and last activity of a user. "
+            "Served from a per-author rollup maintained on writes."
+        ),
+        responses={
+            200: UserProfileSerializer,
+            404: OpenApiResponse(description="User not found"),
+        },
+    )
+
+    def get(self, request, pk):
+        stats = (
+            AuthorStats.objects.select_related("user")
+            .filter(user_id=pk, user__is_deleted=False)
+            .first()
+        )
+
+        # No rollup row yet: the user has never written anything
+        if stats is None:
+            stats = AuthorStats(user=get_object_or_404(User.objects, pk=pk))
+
+        return Response(UserProfileSerializer(stats).data)
+
+
+class UserBulkCreateAPIView(APIView):
+    """
+    POST (Admin)
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(
+        summary="Bulk create users",
+        description=(
+            "Create up to `USER_BULK_MAX_ROWS` (100) users in one request; "
+            "import larger sets with `manage.py import_users`. "
+            "Rows are validated in batches and passwords are hashed in parallel. "
+            "Invalid rows are skipped and reported by their index."
+        ),
+        request=UserProvisionSerializer(many=True),
+        responses={
+            200: OpenApiResponse(description="Number of users created and per-row failures"),
+            400: OpenApiResponse(description="Body is not a list or is too large"),
+            403: OpenApiResponse(description="Admin privileges required"),
+        },
+    )
+
+    def post(self, request):
+        rows = request.data
+        if not isinstance(rows, list):
+            return Response(
+                {"detail": "Expected a list of users"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if len(rows) > settings.USER_BULK_MAX_ROWS:
+            return Response(
+                {"detail": f"At most {settings.USER_BULK_MAX_ROWS} users per request"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        created, failures = provision_users(rows, created_by=request.user)
+        return Response({"created": created, "failed": failures})
+
+
+class LogoutAPIView(APIView):
+    """
+    POST (Authenticated)
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(
+        summary="Logout",
+        description=(
+            "Revoke the access token used for this request and, "
+            "when given, the refresh token of the same session."
+        ),
+        request=LogoutSerializer,
+        responses={
+            204: OpenApiResponse(description="Tokens revoked"),
+            400: OpenApiResponse(description="Invalid refresh token"),
+            401: OpenApiResponse(description="Authentication required"),
+        },
+    )
+
+    def post(self, request):
+        serializer = LogoutSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        refresh = serializer.validated_data.get("refresh")
+        if refresh:
+            try:
+                refresh_token = RefreshToken(refresh)
+            except TokenError:
+                return Response(
+                    {"detail": "Invalid refresh token"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            if str(refresh_token.get(api_settings.USER_ID_CLAIM)) != str(request.user.pk):
+                return Response(
+                    {"detail": "Invalid refresh token"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            revoke_token(refresh_token)
+
+        revoke_token(request.auth)
+        return Response(status=status.HTTP_204_NO_CONTENT)
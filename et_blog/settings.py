@@ -9,6 +9,8 @@ https://docs.djangoproject.com/en/6.0/topics/settings/
 For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
+import os
+import tempfile
 from pathlib import Path
 import environ # type: ignore
 
@@ -36,33 +38,62 @@ ALLOWED_HOSTS = env.list("ALLOWED_HOSTS", default=["localhost", "127.0.0.1"])
 # Application definition
 
 INSTALLED_APPS = [
-    'django.contrib.admin',
+    # Admin modules are discovered lazily, see et_blog/admin_urls.py
+    'django.contrib.admin.apps.SimpleAdminConfig',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'rest_framework',
+    'apps.core',
     'apps.users',
     'apps.posts',
     'apps.comments',
     'apps.categories',
     'apps.tags',
+    'apps.metrics',
     'django_filters',
     'drf_spectacular',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    # Static and media requests are answered here, before sessions,
+    # auth and URL resolution
+    "whitenoise.middleware.WhiteNoiseMiddleware",
+    'apps.core.middleware.MediaMiddleware',
+    'apps.metrics.middleware.MetricsMiddleware',
+    'apps.core.middleware.ServerTimingMiddleware',
+    'apps.core.middleware.ReplicaRoutingMiddleware',
     'django.middleware.common.CommonMiddleware',
+    # The rest depends on the path, see MIDDLEWARE_BY_PATH
+    'apps.core.middleware.PathMiddlewareDispatcher',
+]
+
+SESSION_MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    "whitenoise.middleware.WhiteNoiseMiddleware",
 ]
 
+# (path prefix, middleware), first match wins. The API authenticates
+# with JWT on each request: no sessions, CSRF, auth or messages.
+# The admin and the docs pages keep the full stack
+MIDDLEWARE_BY_PATH = [
+    ("/api/docs/", SESSION_MIDDLEWARE),
+    ("/api/redoc/", SESSION_MIDDLEWARE),
+    ("/api/", []),
+    ("/metrics", []),
+    ("/", SESSION_MIDDLEWARE),
+]
+
+# The admin's middleware checks only look at MIDDLEWARE; the
+# core.E001 check verifies MIDDLEWARE_BY_PATH for /admin/ instead
+SILENCED_SYSTEM_CHECKS = ["admin.E408", "admin.E409", "admin.E410"]
+
 ROOT_URLCONF = 'et_blog.urls'
 
 TEMPLATES = [
@@ -98,8 +129,88 @@ DATABASES = {
     }
 }
 
+# psycopg 3 connection pool, one per worker process. Size it so that
+# workers x DB_POOL_MAX_SIZE stays under the server's max_connections.
+# Django requires CONN_MAX_AGE = 0 (the default) with a pool, and passes
+# its own `check` to the pool: with CONN_HEALTH_CHECKS it is
+# ConnectionPool.check_connection, so broken connections are replaced
+# on checkout.
+if env.bool("DB_POOL", default=True):
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": env.int("DB_POOL_MIN_SIZE", default=2),
+            "max_size": env.int("DB_POOL_MAX_SIZE", default=10),
+            "timeout": env.float("DB_POOL_TIMEOUT", default=10.0),
+            "max_idle": env.float("DB_POOL_MAX_IDLE", default=300.0),
+            "max_lifetime": env.float("DB_POOL_MAX_LIFETIME", default=3600.0),
+        },
+    }
+
+# Optional streaming replica for safe-method requests (DB_REPLICA_HOST).
+# Clients are pinned to the primary for PRIMARY_PIN_SECONDS after a write.
+READ_REPLICA = None
+
+if env("DB_REPLICA_HOST", default=""):
+    READ_REPLICA = "replica"
+    DATABASES[READ_REPLICA] = {
+        **DATABASES["default"],
+        "HOST": env("DB_REPLICA_HOST"),
+        "PORT": env("DB_REPLICA_PORT", default=DATABASES["default"]["PORT"]),
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["apps.core.routers.ReplicaRouter"]
+PRIMARY_PIN_SECONDS = env.int("PRIMARY_PIN_SECONDS", default=5)
+PRIMARY_PIN_COOKIE = "primary_pin"
+
+
+
+
+# Cache
+# Shared backend in production (e.g. CACHE_URL=rediscache://...),
+# otherwise a per-process LocMemCache. Invalidations must reach every
+# worker: `check --deploy` rejects the LocMemCache outside DEBUG (core.E002).
+CACHES = {
+    "default": env.cache("CACHE_URL", default="locmemcache://"),
+}
+
+# Rendered comment thread pages, invalidated per post on comment writes
+# (a version bump in the shared cache).
+COMMENT_THREAD_CACHE_TIMEOUT = env.int("COMMENT_THREAD_CACHE_TIMEOUT", default=300)
 
 
+# Authenticated users resolved from JWTs are cached this many seconds.
+# Deactivation and soft delete drop the entry from the shared cache.
+AUTH_USER_CACHE_TIMEOUT = env.int("AUTH_USER_CACHE_TIMEOUT", default=60)
+
+# JWT revocation: per-process bloom filter over users.RevokedToken.
+TOKEN_REVOCATION_FILTER_CAPACITY = env.int("TOKEN_REVOCATION_FILTER_CAPACITY", default=100_000)
+TOKEN_REVOCATION_FILTER_ERROR_RATE = env.float("TOKEN_REVOCATION_FILTER_ERROR_RATE", default=0.001)
+TOKEN_REVOCATION_REFRESH_INTERVAL = env.int("TOKEN_REVOCATION_REFRESH_INTERVAL", default=5)
+TOKEN_REVOCATION_REBUILD_INTERVAL = env.int("TOKEN_REVOCATION_REBUILD_INTERVAL", default=300)
+
+# Login password hashing pool: concurrent hashes and queued logins per
+# process before /api/auth/login/ answers 503.
+LOGIN_HASH_WORKERS = env.int("LOGIN_HASH_WORKERS", default=2)
+LOGIN_HASH_QUEUE_SIZE = env.int("LOGIN_HASH_QUEUE_SIZE", default=8)
+
+# Tags listed per author on /api/users/<id>/profile/
+AUTHOR_TOP_TAGS = env.int("AUTHOR_TOP_TAGS", default=5)
+
+# Bulk user provisioning (`manage.py import_users`, /api/users/bulk/).
+# Each password hash takes most of a second of CPU, so the HTTP endpoint
+# takes at most USER_BULK_MAX_ROWS rows to finish well inside the proxy
+# and gunicorn timeouts; larger imports go through import_users.
+USER_PROVISION_WORKERS = env.int("USER_PROVISION_WORKERS", default=4)
+USER_PROVISION_BATCH_SIZE = env.int("USER_PROVISION_BATCH_SIZE", default=1000)
+USER_BULK_MAX_ROWS = env.int("USER_BULK_MAX_ROWS", default=100)
+
+# Soft-delete archival (`manage.py archive_deleted`)
+
+ARCHIVE_AFTER_DAYS = env.int("ARCHIVE_AFTER_DAYS", default=30)
+ARCHIVE_BATCH_SIZE = env.int("ARCHIVE_BATCH_SIZE", default=500)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -138,6 +249,18 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
+# collectstatic writes content-hashed copies plus .gz and .br variants;
+# hashed files are served with far-future immutable Cache-Control.
+STORAGES = {
+    # Media is stored by content hash; identical uploads share one file
+    "default": {
+        "BACKEND": "apps.core.storage.ContentAddressedStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
+    },
+}
+
 
 AUTH_USER_MODEL = 'users.User'
 
@@ -149,7 +272,7 @@ from datetime import timedelta
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "apps.users.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
@@ -165,8 +288,8 @@ REST_FRAMEWORK = {
         "PAGE_SIZE": 10,
 
     "DEFAULT_THROTTLE_CLASSES": (
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "apps.core.throttling.AnonRateThrottle",
+        "apps.core.throttling.UserRateThrottle",
     ),
 
     "DEFAULT_THROTTLE_RATES": {
@@ -185,6 +308,8 @@ SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("Bearer",),
     "AUTH_TOKEN_CLASSES": ("rest_framework_simplejwt.tokens.AccessToken",),
 
+    "TOKEN_REFRESH_SERIALIZER": "apps.users.serializers.TokenRefreshSerializer",
+
     "ROTATE_REFRESH_TOKENS": False,      
     "BLACKLIST_AFTER_ROTATION": True,   #False
 }
@@ -193,12 +318,107 @@ SIMPLE_JWT = {
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Media is served by apps.core.middleware.MediaMiddleware. Behind nginx,
+# set MEDIA_ACCEL_REDIRECT to its internal location (see deploy/nginx.conf)
+# so nginx sends the file; otherwise Django streams it via sendfile.
+MEDIA_ACCEL_REDIRECT = env("MEDIA_ACCEL_REDIRECT", default="")
+# Cache lifetime of media not named by content; content-addressed blobs
+# are sent as immutable for a year.
+MEDIA_MAX_AGE = env.int("MEDIA_MAX_AGE", default=60 * 60 * 24)
+
+# `manage.py gc_media_blobs`: blobs not uploaded (or re-uploaded, when
+# deduplicated) for this long and referenced by no
+# row (live, soft-deleted or archived) nor by these collectors are removed.
+MEDIA_BLOB_GRACE_HOURS = env.int("MEDIA_BLOB_GRACE_HOURS", default=24)
+MEDIA_BLOB_REFERENCES = ["apps.posts.images.variant_blob_names"]
+
+# Uploads stream to temporary files (never memory); bytes past
+# IMAGE_UPLOAD_MAX_BYTES are dropped. Post images are then checked from
+# their headers against the limits below before anything decodes them.
+FILE_UPLOAD_HANDLERS = ["apps.posts.uploads.LimitedTemporaryFileUploadHandler"]
+IMAGE_UPLOAD_MAX_BYTES = env.int("IMAGE_UPLOAD_MAX_BYTES", default=10 * 1024 * 1024)
+IMAGE_UPLOAD_MAX_PIXELS = env.int("IMAGE_UPLOAD_MAX_PIXELS", default=24_000_000)
+IMAGE_UPLOAD_FORMATS = ["JPEG", "PNG", "WEBP", "GIF"]
+
+# Resumable uploads (/api/uploads/images/): part files live outside
+# MEDIA_ROOT until completed; expired sessions are removed by
+# `manage.py prune_image_uploads`
+IMAGE_UPLOAD_SESSION_DIR = env("IMAGE_UPLOAD_SESSION_DIR", default=str(BASE_DIR / "uploads"))
+IMAGE_UPLOAD_SESSION_TTL_HOURS = env.int("IMAGE_UPLOAD_SESSION_TTL_HOURS", default=24)
+IMAGE_UPLOAD_CHUNK_MAX_BYTES = env.int("IMAGE_UPLOAD_CHUNK_MAX_BYTES", default=5 * 1024 * 1024)
+
+# WebP variants of Post.image, generated after upload by a background
+# task (or on first request of a variant URL).
+IMAGE_VARIANT_WIDTHS = env.list("IMAGE_VARIANT_WIDTHS", cast=int, default=[320, 640, 1280])
+IMAGE_VARIANT_QUALITY = env.int("IMAGE_VARIANT_QUALITY", default=80)
+
+# Background tasks (django.tasks): queued in the database and run by
+# `manage.py run_task_worker`. Failed tasks are retried with exponential
+# backoff; finished ones are removed by `manage.py prune_tasks`.
+TASKS = {
+    "default": {
+        "BACKEND": "apps.core.tasks.DatabaseBackend",
+        "OPTIONS": {
+            "MAX_ATTEMPTS": env.int("TASK_MAX_ATTEMPTS", default=3),
+            "RETRY_BACKOFF": env.int("TASK_RETRY_BACKOFF", default=10),
+            "STALE_AFTER": env.int("TASK_STALE_AFTER", default=60 * 60),
+        },
+    },
+}
+TASK_RESULT_RETENTION_DAYS = env.int("TASK_RESULT_RETENTION_DAYS", default=7)
+
+
+# Serve openapi/openapi.yaml (generated at build time and kept in sync by
+# `manage.py check_openapi_schema`) rather than introspecting per request
+OPENAPI_SCHEMA_FILE = BASE_DIR / "openapi" / "openapi.yaml"
+OPENAPI_STATIC_SCHEMA = env.bool("OPENAPI_STATIC_SCHEMA", default=not env.bool("DEBUG"))
+
+# Share of requests timed by ServerTimingMiddleware (0 to 1): SQL,
+# pagination, serialization and render times in a Server-Timing header
+# and an "apps.core.timing" log line
+SERVER_TIMING_SAMPLE_RATE = env.float("SERVER_TIMING_SAMPLE_RATE", default=0.01)
+SERVER_TIMING_HEADER = env.bool("SERVER_TIMING_HEADER", default=True)
+
+# Prometheus metrics at /metrics. Each process writes METRICS_DIR/<pid>.db
+# and /metrics sums them, so the directory must be shared by the workers
+# of a host. Clear it when (re)deploying to reset the counters.
+METRICS_DIR = env("METRICS_DIR", default=os.path.join(tempfile.gettempdir(), "et_blog_metrics"))
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Bearer token required by /metrics when set
+METRICS_TOKEN = env("METRICS_TOKEN", default="")
+
+# Query inspection (apps.metrics.inspection). Queries slower than
+# SLOW_QUERY_MS (0: off) are logged; on SLOW_QUERY_EXPLAIN_SAMPLE_RATE of
+# the requests, the slowest one with its EXPLAIN plan, which runs before
+# the response is returned. On a sample of requests, a query shape run
+# more than QUERY_REPEAT_THRESHOLD times is logged as an N+1 with its
+# stack; the test runner inspects every request and fails the test
+# instead
+SLOW_QUERY_MS = env.float("SLOW_QUERY_MS", default=200)
+SLOW_QUERY_EXPLAIN_SAMPLE_RATE = env.float("SLOW_QUERY_EXPLAIN_SAMPLE_RATE", default=0.01)
+QUERY_INSPECTION_SAMPLE_RATE = env.float("QUERY_INSPECTION_SAMPLE_RATE", default=0.0)
+QUERY_REPEAT_THRESHOLD = env.int("QUERY_REPEAT_THRESHOLD", default=5)
+QUERY_INSPECTION_RAISE = False
+TEST_RUNNER = "apps.metrics.runner.QueryInspectionRunner"
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "apps.core.timing": {"handlers": ["console"], "level": "INFO", "propagate": False},
+        "apps.metrics.queries": {"handlers": ["console"], "level": "WARNING", "propagate": False},
+    },
+}
 
 SPECTACULAR_SETTINGS = {
     "TITLE": "ET Blog API",
     "DESCRIPTION": "API documentation for the ET Blog platform",
     "VERSION": "1.0.0",
     "SERVE_INCLUDE_SCHEMA": False,
+    "DEFAULT_GENERATOR_CLASS": "apps.core.openapi.SchemaGenerator",
     "COMPONENT_SPLIT_REQUEST": True,
     "SECURITY": [{"bearerAuth": []}],
     "SWAGGER_UI_SETTINGS": {
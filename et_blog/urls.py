@@ -26,27 +26,22 @@ Including another URLconf
 
 """
 
-from django.contrib import admin
-from django.urls import path, include
 from django.conf import settings
-from django.conf.urls.static import static
-from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
-    TokenRefreshView,
-)
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularSwaggerView,
-    SpectacularRedocView,
-)
+from django.urls import path, include
+from rest_framework_simplejwt.views import TokenRefreshView
+from apps.users.login import AsyncLoginView
+from apps.users.views import LogoutAPIView
+from apps.core.views import OpenAPISchemaView, lazy_view
 
 
 urlpatterns = [
-    path("admin/", admin.site.urls),
+    # (urlconf module, app_name, namespace): imported on first use
+    path("admin/", ("et_blog.admin_urls", "admin", "admin")),
 
     # JWT
-    path("api/auth/login/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
+    path("api/auth/login/", AsyncLoginView.as_view(), name="token_obtain_pair"),
     path("api/auth/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path("api/auth/logout/", LogoutAPIView.as_view(), name="token_logout"),
 
     # APIs
     path("api/", include("apps.users.urls")),
@@ -54,20 +49,23 @@ urlpatterns = [
     path("api/", include("apps.comments.urls")),
     path("api/", include("apps.categories.urls")),
     path("api/", include("apps.tags.urls")),
+    path("api/", include("apps.core.urls")),
+
+    # Prometheus
+    path("", include("apps.metrics.urls")),
 
-    # OpenAPI schema
-    path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
+    # OpenAPI schema: pre-generated (see check_openapi_schema) or live.
+    # drf-spectacular views are loaded lazily, on their first request
+    path(
+        "api/schema/",
+        OpenAPISchemaView.as_view() if settings.OPENAPI_STATIC_SCHEMA
+        else lazy_view("drf_spectacular.views.SpectacularAPIView"),
+        name="schema",
+    ),
 
     # Swagger UI
-    path("api/docs/",SpectacularSwaggerView.as_view(url_name="schema"), name="swagger-ui"),
+    path("api/docs/", lazy_view("drf_spectacular.views.SpectacularSwaggerView", url_name="schema"), name="swagger-ui"),
 
     # ReDoc
-    path("api/redoc/",SpectacularRedocView.as_view(url_name="schema"),name="redoc"),
+    path("api/redoc/", lazy_view("drf_spectacular.views.SpectacularRedocView", url_name="schema"), name="redoc"),
 ]
-
-
-if settings.DEBUG:
-    urlpatterns += static(
-        settings.MEDIA_URL,
-        document_root=settings.MEDIA_ROOT
-    )